@@ -4,7 +4,6 @@ Handles conversation memory management.
 """
 
 from typing import Dict, Any, List, Optional
-from datetime import datetime
 
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import HumanMessage, SystemMessage
@@ -12,13 +11,17 @@ from langchain_core.messages import HumanMessage, SystemMessage
 from app.memory.long_term import (
     save_message,
     get_session_messages,
-    get_session_summary,
+    get_context_history,
     update_session_summary
 )
+from app.db.repository import MessageRepository
 from app.config import settings
 from app.utils.logger import logger
 
 
+_messages = MessageRepository()
+
+
 SUMMARIZATION_PROMPT = """Summarize this legal aid conversation concisely.
 Focus on:
 1. The main legal issue discussed
@@ -104,18 +107,9 @@ class MemoryAgent:
         """
         try:
             limit = limit or self.max_messages
-            messages = await get_session_messages(session_id, limit=limit)
             
-            # Get summary if available
-            summary = await get_session_summary(session_id)
-            
-            if summary:
-                # Prepend summary as context
-                messages.insert(0, {
-                    "role": "system",
-                    "content": f"Previous conversation summary: {summary}",
-                    "created_at": datetime.utcnow().isoformat()
-                })
+            # Newest messages plus summary, in one query
+            messages = await get_context_history(session_id, limit=limit)
             
             return messages
             
@@ -180,12 +174,8 @@ class MemoryAgent:
     async def clear_session(self, session_id: str) -> bool:
         """Clear all messages from a session."""
         try:
-            from app.db.supabase import get_supabase_client
-            client = get_supabase_client()
-            
-            client.table("chat_messages").delete().eq(
-                "session_id", session_id
-            ).execute()
+            # The repository raises on failure, unlike delete_session_messages
+            await _messages.delete_for_session(session_id)
             
             return True
             
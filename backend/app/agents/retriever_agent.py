@@ -5,8 +5,10 @@ Handles retrieval of relevant legal documents.
 
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+import asyncio
 
 from app.db.vector import VectorStore
+from app.rag.reranker import candidate_count, rerank_documents
 from app.utils.logger import logger
 
 
@@ -47,13 +49,15 @@ class RetrieverAgent:
             # Build enhanced query
             enhanced_query = self._build_query(query, domain, sub_domain)
             
-            # Retrieve from vector store
-            documents = await self.vector_store.similarity_search(
+            # Retrieve with the configured mode (vector by default),
+            # over-fetching when a reranker will pick the best k
+            documents = await self.vector_store.search(
                 query=enhanced_query,
-                k=k,
+                k=candidate_count(k),
                 filter_domain=domain,
                 threshold=0.5
             )
+            documents = await rerank_documents(query, documents, k)
             
             # Format results
             formatted_docs = self._format_documents(documents)
@@ -112,7 +116,8 @@ class RetrieverAgent:
                 "content": doc.get("content", ""),
                 "source_url": doc.get("source_url", ""),
                 "domain": doc.get("domain", ""),
-                "relevance_score": doc.get("score", 0.0)
+                "relevance_score": doc.get("score", 0.0),
+                "rerank_score": doc.get("rerank_score")
             })
         
         return formatted
@@ -133,20 +138,30 @@ class RetrieverAgent:
             List of section contents
         """
         try:
-            sections = []
+            # One keyed lookup for every section
+            pairs = [(act_name, section) for section in section_numbers]
+            found = await self.vector_store.lookup_sections(pairs)
             
-            for section in section_numbers:
-                query = f"{act_name} section {section}"
-                results = await self.vector_store.similarity_search(
-                    query=query,
-                    k=1,
-                    threshold=0.7
-                )
-                
-                if results:
-                    sections.append(results[0])
+            # Search only for sections the key lookup missed
+            misses = [pair for pair in pairs if pair not in found]
+            if misses:
+                logger.info(f"Section lookup missed {len(misses)} of {len(pairs)}, searching")
+                results = await asyncio.gather(*[
+                    self.vector_store.search(
+                        query=f"{act} section {section}",
+                        k=1,
+                        threshold=0.7,
+                        # Vector mode applies the threshold to every result
+                        # and can be served by the local index
+                        mode="vector"
+                    )
+                    for act, section in misses
+                ])
+                for pair, result in zip(misses, results):
+                    if result:
+                        found[pair] = result[0]
             
-            return sections
+            return [found[pair] for pair in pairs if pair in found]
             
         except Exception as e:
             logger.error(f"Section retrieval error: {str(e)}")
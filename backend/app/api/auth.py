@@ -3,14 +3,14 @@ Authentication API Endpoints
 Handles user authentication via Supabase Auth.
 """
 
-import time
 from datetime import datetime
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Header
 from pydantic import BaseModel, EmailStr
 
-from app.db.supabase import get_supabase_client
+from app.api.token_verifier import InvalidTokenError, get_token_verifier
+from app.db.supabase import get_supabase_client, get_async_supabase_client
 from app.utils.logger import logger
 
 
@@ -46,11 +46,11 @@ class UserResponse(BaseModel):
     created_at: str
 
 
-def get_current_user(authorization: str = Header(...)) -> dict:
+async def get_current_user(authorization: str = Header(...)) -> dict:
     """
     Dependency to get current authenticated user from JWT.
-    Validates the Supabase JWT token.
-    Uses sync def to run in threadpool as Supabase client is synchronous.
+    Verifies the Supabase JWT locally and caches the result; Supabase Auth
+    is only consulted periodically to catch revoked sessions.
     """
     if not authorization.startswith("Bearer "):
         raise HTTPException(
@@ -60,42 +60,14 @@ def get_current_user(authorization: str = Header(...)) -> dict:
     
     token = authorization.replace("Bearer ", "")
     
-    # Retry mechanism for Supabase connection (SSL handshake timeouts)
-    max_retries = 3
-    last_exception = None
-    
-    for attempt in range(max_retries):
-        try:
-            client = get_supabase_client()
-            # client.auth.get_user creates a network request using httpx (sync)
-            user_response = client.auth.get_user(token)
-            
-            if not user_response or not user_response.user:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid or expired token"
-                )
-            
-            return {
-                "id": user_response.user.id,
-                "email": user_response.user.email,
-                "full_name": user_response.user.user_metadata.get("full_name")
-            }
-        except HTTPException:
-            # If it's an HTTP exception (e.g. 401 from supabase), re-raise immediately
-            raise
-        except Exception as e:
-            last_exception = e
-            # Log warning and retry if it's a network error
-            if attempt < max_retries - 1:
-                logger.warning(f"Authentication attempt {attempt + 1}/{max_retries} failed: {str(e)}")
-                time.sleep(0.5)  # Short backoff
-    
-    logger.error(f"Authentication final error: {str(last_exception)}")
-    raise HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Authentication failed"
-    )
+    try:
+        return await get_token_verifier().verify(token)
+    except InvalidTokenError as e:
+        logger.debug(f"Token rejected: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token"
+        )
 
 
 @router.post("/signup", response_model=AuthResponse)
@@ -172,14 +144,20 @@ def login(request: LoginRequest):
 
 
 @router.post("/logout")
-def logout(user: dict = Depends(get_current_user)):
+async def logout(
+    authorization: str = Header(...),
+    user: dict = Depends(get_current_user)
+):
     """
     Logout current user.
-    Invalidates the current session.
+    Invalidates the caller's session and its cached verification.
     """
+    token = authorization.replace("Bearer ", "")
+    get_token_verifier().forget(token)
+    
     try:
-        client = get_supabase_client()
-        client.auth.sign_out()
+        client = await get_async_supabase_client()
+        await client.auth.admin.sign_out(token)
         return {"message": "Logged out successfully"}
     except Exception as e:
         logger.error(f"Logout error: {str(e)}")
@@ -4,23 +4,25 @@ Main chat endpoint for the legal triage agent.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
-import uuid
 
 from app.api.auth import get_current_user
 from app.agent.graph import run_agent
 from app.agent.state import create_initial_state
-from app.memory.long_term import save_message, get_session_messages
-from app.db.supabase import get_service_client
+from app.memory.long_term import build_message, save_chat_turn, with_summary
+from app.memory.write_behind import get_write_behind
+from app.db.repository import SessionRepository
+from app.db.session_cache import get_session_cache
 from app.config import settings
 from app.utils.logger import logger
 
 
 router = APIRouter()
 
+_sessions = SessionRepository()
+
 
 class ChatRequest(BaseModel):
     """Chat request schema."""
@@ -66,58 +68,57 @@ class SessionResponse(BaseModel):
     message_count: int
 
 
-def create_new_session(user_id: str) -> str:
-    """Create a new chat session for the user."""
-    try:
-        client = get_service_client()
-        session_id = str(uuid.uuid4())
-        
-        client.table("chat_sessions").insert({
-            "id": session_id,
-            "user_id": user_id,
-            "title": "New Conversation",
-            "created_at": datetime.utcnow().isoformat(),
-            "updated_at": datetime.utcnow().isoformat()
-        }).execute()
-        
-        return session_id
-    except Exception as e:
-        logger.error(f"Session creation error: {str(e)}")
-        raise
-
-
-def validate_session_ownership(session_id: str, user_id: str):
-    """Validate that the session belongs to the user."""
-    try:
-        client = get_service_client()
-        result = client.table("chat_sessions").select("user_id").eq(
-            "id", session_id
-        ).single().execute()
-        
-        if not result.data or result.data["user_id"] != user_id:
+async def load_chat_context(user_id: str, session_id: Optional[str]) -> Dict[str, Any]:
+    """
+    Validate (or create) the session and load its recent history
+    and summary in a single database call.
+    """
+    cache = get_session_cache()
+    
+    if session_id:
+        cached = await cache.peek(session_id)
+        if cached and cached["user_id"] != user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Session not found or access denied"
             )
-    except HTTPException:
-        raise
+    
+    try:
+        context = await _sessions.prepare_chat_context(
+            user_id,
+            session_id=session_id,
+            limit=settings.max_context_messages
+        )
     except Exception as e:
-        logger.error(f"Session validation error: {str(e)}")
+        logger.error(f"Chat context error: {str(e)}")
+        if not session_id:
+            # Session creation failed
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    if not context or context.get("status") == "not_found":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Session not found"
         )
 
+    if context.get("status") == "forbidden":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Session not found or access denied"
+        )
 
-def update_session_timestamp(session_id: str):
-    """Update the session's last updated timestamp."""
-    try:
-        client = get_service_client()
-        client.table("chat_sessions").update({
-            "updated_at": datetime.utcnow().isoformat()
-        }).eq("id", session_id).execute()
-    except Exception as e:
-        logger.error(f"Session update error: {str(e)}")
+    if context.get("status") == "created":
+        await cache.remember(context["session_id"], {
+            "user_id": user_id,
+            "title": "New Conversation",
+            "created_at": datetime.utcnow().isoformat()
+        })
+
+    return context
 
 
 @router.post("", response_model=ChatResponse)
@@ -127,20 +128,27 @@ async def chat(request: ChatRequest, user: dict = Depends(get_current_user)):
     Processes user message through the legal triage agent.
     """
     try:
-        # Get or create session
-        session_id = request.session_id
-        if not session_id:
-            session_id = await run_in_threadpool(create_new_session, user["id"])
+        user_message = build_message("user", request.message)
         
-        # Validate session belongs to user
-        await run_in_threadpool(validate_session_ownership, session_id, user["id"])
+        # Validate or create the session and load recent history in one call
+        context = await load_chat_context(user["id"], request.session_id)
+        session_id = context["session_id"]
+        history = context.get("messages") or []
         
-        # Get chat history for context
-        chat_history = await run_in_threadpool(
-            get_session_messages,
-            session_id, 
-            limit=settings.max_context_messages
-        )
+        # Include turns still waiting in this worker's write-behind queue.
+        # A turn can be both pending and already written (its flush is in
+        # flight), so skip IDs the database returned. Turns queued on other
+        # workers are not visible until they are flushed.
+        write_behind = get_write_behind()
+        if write_behind:
+            loaded_ids = {message.get("id") for message in history}
+            pending = [
+                message for message in write_behind.pending_for(session_id)
+                if message.get("id") not in loaded_ids
+            ]
+            history = (history + pending)[-settings.max_context_messages:]
+        
+        chat_history = with_summary(history, context.get("summary"))
         
         # Create initial agent state
         state = create_initial_state(
@@ -156,28 +164,21 @@ async def chat(request: ChatRequest, user: dict = Depends(get_current_user)):
         # Run agent graph
         result = await run_agent(state, llm_provider)
         
-        # Save messages to memory
-        await run_in_threadpool(
-            save_message,
-            session_id=session_id,
-            role="user",
-            content=request.message
-        )
-        
-        await run_in_threadpool(
-            save_message,
-            session_id=session_id,
-            role="assistant",
-            content=result["response"],
+        # Save both messages and touch the session in one transaction,
+        # or hand them to the write-behind queue
+        assistant_message = build_message(
+            "assistant",
+            result["response"],
             metadata={
                 "classification": result.get("classification"),
                 "confidence": result.get("confidence"),
                 "needs_clarification": result.get("needs_clarification", False)
             }
         )
-        
-        # Update session timestamp
-        await run_in_threadpool(update_session_timestamp, session_id)
+        if write_behind:
+            await write_behind.enqueue(session_id, [user_message, assistant_message])
+        else:
+            await save_chat_turn(session_id, [user_message, assistant_message])
         
         # Format source documents
         sources = []
@@ -204,6 +205,8 @@ async def chat(request: ChatRequest, user: dict = Depends(get_current_user)):
             sources=sources
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Chat error: {str(e)}")
         raise HTTPException(
@@ -3,12 +3,22 @@ Health Check Endpoints
 Used for monitoring and deployment verification.
 """
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Depends, status
 from pydantic import BaseModel
 from datetime import datetime
 
+from app.api.auth import get_current_user
+from app.api.token_verifier import get_token_verifier
 from app.config import settings
-from app.db.supabase import get_supabase_client
+from app.db.session_cache import get_session_cache
+from app.db.supabase import get_async_supabase_client, get_pool_stats
+from app.db.vector import VectorStore
+from app.llm.embeddings import get_embedding_cache_stats
+from app.memory.write_behind import get_write_behind
+from app.rag.bm25 import get_bm25_index
+from app.rag.local_index import get_local_index
+from app.rag.reranker import get_reranker
+from app.rag.result_cache import get_retrieval_cache
 
 
 router = APIRouter()
@@ -36,9 +46,9 @@ async def health_check():
     
     # Check Supabase connection
     try:
-        client = get_supabase_client()
+        client = await get_async_supabase_client()
         # Simple query to verify connection
-        client.table("chat_sessions").select("id").limit(1).execute()
+        await client.table("chat_sessions").select("id").limit(1).execute()
         services["database"] = "healthy"
     except Exception as e:
         services["database"] = f"unhealthy: {str(e)}"
@@ -56,6 +66,41 @@ async def health_check():
     )
 
 
+@router.get("/health/metrics")
+async def metrics(user: dict = Depends(get_current_user)):
+    """
+    Runtime metrics for monitoring dashboards: connection pools, cache hit
+    rates, write-behind lag and local index sizes. Requires a signed-in user.
+    """
+    write_behind = get_write_behind()
+    local_index = get_local_index()
+    bm25_index = get_bm25_index()
+    reranker = get_reranker()
+    
+    return {
+        "timestamp": datetime.utcnow().isoformat(),
+        "supabase_pools": get_pool_stats(),
+        "auth_token_cache": get_token_verifier().stats(),
+        "session_cache": get_session_cache().stats(),
+        "embedding_cache": get_embedding_cache_stats(),
+        "retrieval_cache": get_retrieval_cache().stats(),
+        "write_behind": write_behind.stats() if write_behind else None,
+        "local_index": local_index.stats() if local_index else None,
+        "bm25_index": bm25_index.stats() if bm25_index else None,
+        "reranker": reranker.stats() if reranker else None
+    }
+
+
+@router.get("/health/corpus")
+async def corpus_stats(user: dict = Depends(get_current_user)):
+    """
+    Legal corpus statistics for admin dashboards: chunk counts per domain
+    and act, missing embeddings and index sizes. Cached briefly, so it is
+    cheap to poll. Requires a signed-in user.
+    """
+    return await VectorStore().get_stats()
+
+
 @router.get("/", status_code=status.HTTP_200_OK)
 async def root():
     """Root endpoint returning API information."""
@@ -3,18 +3,23 @@ Session Management API Endpoints
 Handles chat session CRUD operations.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 
 from app.api.auth import get_current_user
-from app.db.supabase import get_supabase_client, get_service_client
+from app.db.pagination import NEXT_CURSOR_HEADER, decode_cursor, next_cursor
+from app.db.repository import SessionRepository, MessageRepository
+from app.db.session_cache import get_session_cache
 from app.utils.logger import logger
 
 
 router = APIRouter()
 
+_sessions = SessionRepository()
+_messages = MessageRepository()
+
 
 class SessionResponse(BaseModel):
     """Session response schema."""
@@ -41,48 +46,55 @@ class MessageResponse(BaseModel):
 
 
 @router.get("", response_model=List[SessionResponse])
-def list_sessions(user: dict = Depends(get_current_user)):
+async def list_sessions(
+    response: Response,
+    user: dict = Depends(get_current_user),
+    limit: int = Query(default=50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None
+):
     """
-    List all chat sessions for the current user.
-    Returns sessions ordered by last updated.
+    List chat sessions for the current user.
+    Returns sessions ordered by last updated, one page at a time.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    Pass since= to fetch only sessions updated after the last sync.
     """
     try:
-        client = get_service_client()
+        key = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    try:
+        # Sessions come back with message count and last message preview
+        sessions = await _sessions.list_with_stats(
+            user["id"],
+            limit=limit,
+            cursor=key,
+            since=since.isoformat() if since else None
+        )
         
-        # Get sessions
-        sessions_result = client.table("chat_sessions").select(
-            "id, title, created_at, updated_at"
-        ).eq("user_id", user["id"]).order(
-            "updated_at", desc=True
-        ).execute()
+        cursor_value = next_cursor(sessions, limit, "updated_at")
+        if cursor_value:
+            response.headers[NEXT_CURSOR_HEADER] = cursor_value
         
-        sessions = []
-        for session in sessions_result.data:
-            # Get message count and last message
-            messages_result = client.table("chat_messages").select(
-                "content"
-            ).eq("session_id", session["id"]).order(
-                "created_at", desc=True
-            ).limit(1).execute()
-            
-            message_count_result = client.table("chat_messages").select(
-                "id", count="exact"
-            ).eq("session_id", session["id"]).execute()
-            
-            last_message = None
-            if messages_result.data:
-                last_message = messages_result.data[0]["content"][:100]
-            
-            sessions.append(SessionResponse(
+        await get_session_cache().remember_many(
+            [{**session, "user_id": user["id"]} for session in sessions]
+        )
+        
+        return [
+            SessionResponse(
                 id=session["id"],
                 title=session["title"],
                 created_at=session["created_at"],
                 updated_at=session["updated_at"],
-                message_count=message_count_result.count or 0,
-                last_message=last_message
-            ))
-        
-        return sessions
+                message_count=session.get("message_count") or 0,
+                last_message=session.get("last_message")
+            )
+            for session in sessions
+        ]
         
     except Exception as e:
         logger.error(f"List sessions error: {str(e)}")
@@ -93,34 +105,39 @@ def list_sessions(user: dict = Depends(get_current_user)):
 
 
 @router.get("/{session_id}", response_model=SessionResponse)
-def get_session(session_id: str, user: dict = Depends(get_current_user)):
+async def get_session(session_id: str, user: dict = Depends(get_current_user)):
     """
     Get a specific chat session.
     """
     try:
-        client = get_service_client()
+        cache = get_session_cache()
+        cached = await cache.peek(session_id)
+        if cached and cached["user_id"] != user["id"]:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found"
+            )
         
-        result = client.table("chat_sessions").select(
-            "id, title, created_at, updated_at, user_id"
-        ).eq("id", session_id).single().execute()
+        # updated_at and message_count change every turn, so they are always read
+        session = await _sessions.get(
+            session_id,
+            columns="id, title, created_at, updated_at, user_id, message_count"
+        )
         
-        if not result.data or result.data["user_id"] != user["id"]:
+        if not session or session["user_id"] != user["id"]:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Session not found"
             )
         
-        # Get message count
-        message_count_result = client.table("chat_messages").select(
-            "id", count="exact"
-        ).eq("session_id", session_id).execute()
+        await cache.remember(session_id, session)
         
         return SessionResponse(
-            id=result.data["id"],
-            title=result.data["title"],
-            created_at=result.data["created_at"],
-            updated_at=result.data["updated_at"],
-            message_count=message_count_result.count or 0
+            id=session["id"],
+            title=session["title"],
+            created_at=session["created_at"],
+            updated_at=session["updated_at"],
+            message_count=session.get("message_count") or 0
         )
         
     except HTTPException:
@@ -134,35 +151,51 @@ def get_session(session_id: str, user: dict = Depends(get_current_user)):
 
 
 @router.get("/{session_id}/messages", response_model=List[MessageResponse])
-def get_session_messages(
-    session_id: str, 
+async def get_session_messages(
+    session_id: str,
+    response: Response,
     user: dict = Depends(get_current_user),
-    limit: int = 50,
-    offset: int = 0
+    limit: int = Query(default=50, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None
 ):
     """
-    Get messages for a specific chat session.
+    Get messages for a specific chat session in chronological order.
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    Pass since= to fetch only messages created after the last sync.
+    offset is kept for older clients and ignored when a cursor is given.
     """
     try:
-        client = get_service_client()
-        
+        key = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    try:
         # Verify session ownership
-        session_result = client.table("chat_sessions").select(
-            "user_id"
-        ).eq("id", session_id).single().execute()
+        session = await get_session_cache().get(session_id)
         
-        if not session_result.data or session_result.data["user_id"] != user["id"]:
+        if not session or session["user_id"] != user["id"]:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Session not found"
             )
         
         # Get messages
-        messages_result = client.table("chat_messages").select(
-            "id, role, content, created_at, metadata"
-        ).eq("session_id", session_id).order(
-            "created_at", desc=False
-        ).range(offset, offset + limit - 1).execute()
+        messages = await _messages.list_for_session(
+            session_id,
+            limit=limit,
+            offset=offset,
+            after=key,
+            since=since.isoformat() if since else None
+        )
+        
+        cursor_value = next_cursor(messages, limit, "created_at")
+        if cursor_value:
+            response.headers[NEXT_CURSOR_HEADER] = cursor_value
         
         return [
             MessageResponse(
@@ -172,7 +205,7 @@ def get_session_messages(
                 created_at=msg["created_at"],
                 metadata=msg.get("metadata")
             )
-            for msg in messages_result.data
+            for msg in messages
         ]
         
     except HTTPException:
@@ -186,7 +219,7 @@ def get_session_messages(
 
 
 @router.put("/{session_id}", response_model=SessionResponse)
-def update_session(
+async def update_session(
     session_id: str,
     request: SessionUpdateRequest,
     user: dict = Depends(get_current_user)
@@ -195,29 +228,26 @@ def update_session(
     Update a chat session's title.
     """
     try:
-        client = get_service_client()
-        
         # Verify session ownership
-        session_result = client.table("chat_sessions").select(
-            "user_id"
-        ).eq("id", session_id).single().execute()
+        session = await get_session_cache().get(session_id)
         
-        if not session_result.data or session_result.data["user_id"] != user["id"]:
+        if not session or session["user_id"] != user["id"]:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Session not found"
             )
         
         # Update session
-        update_result = client.table("chat_sessions").update({
+        await _sessions.update(session_id, {
             "title": request.title,
             "updated_at": datetime.utcnow().isoformat()
-        }).eq("id", session_id).execute()
+        })
+        await get_session_cache().invalidate(session_id)
         
         return SessionResponse(
             id=session_id,
             title=request.title,
-            created_at=session_result.data.get("created_at", ""),
+            created_at=session.get("created_at", ""),
             updated_at=datetime.utcnow().isoformat(),
             message_count=0
         )
@@ -233,33 +263,26 @@ def update_session(
 
 
 @router.delete("/{session_id}")
-def delete_session(session_id: str, user: dict = Depends(get_current_user)):
+async def delete_session(session_id: str, user: dict = Depends(get_current_user)):
     """
     Delete a chat session and all its messages.
     """
     try:
-        client = get_service_client()
-        
         # Verify session ownership
-        session_result = client.table("chat_sessions").select(
-            "user_id"
-        ).eq("id", session_id).single().execute()
+        session = await get_session_cache().get(session_id)
         
-        if not session_result.data or session_result.data["user_id"] != user["id"]:
+        if not session or session["user_id"] != user["id"]:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Session not found"
             )
         
         # Delete messages first (foreign key constraint)
-        client.table("chat_messages").delete().eq(
-            "session_id", session_id
-        ).execute()
+        await _messages.delete_for_session(session_id)
         
         # Delete session
-        client.table("chat_sessions").delete().eq(
-            "id", session_id
-        ).execute()
+        await _sessions.delete(session_id)
+        await get_session_cache().invalidate(session_id)
         
         return {"message": "Session deleted successfully"}
         
@@ -0,0 +1,288 @@
+"""
+Supabase JWT Verification
+Verifies access tokens locally and caches verified claims.
+
+Tokens are checked against the configured JWT secret (HS256) or the
+project's cached JWKS (RS256/ES256). Supabase Auth is only called on a
+cache miss, when the revocation interval has passed, or when no local
+key is available to verify the token.
+"""
+
+from typing import Any, Dict, Optional
+from collections import Counter
+import asyncio
+import hashlib
+import math
+import time
+
+import httpx
+from gotrue.errors import AuthApiError
+from jose import jwt, JWTError, ExpiredSignatureError
+
+from app.config import settings
+from app.db.supabase import get_async_supabase_client
+from app.utils.cache import TTLCache
+from app.utils.logger import logger
+
+
+# Placeholder secret shipped in config defaults; never trusted for verification
+DEFAULT_JWT_SECRET = "dev-secret-change-in-prod"
+
+# Minimum estimated entropy of a JWT secret trusted for local HS256
+# verification. Rejects placeholders such as the one in .env.example.
+MIN_JWT_SECRET_BITS = 128
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+# Minimum seconds between JWKS refetches triggered by an unknown key ID
+JWKS_REFETCH_INTERVAL = 60
+
+
+class InvalidTokenError(Exception):
+    """Raised when a token is malformed, expired or has a bad signature."""
+
+
+def is_trusted_jwt_secret(secret: Optional[str]) -> bool:
+    """
+    Whether a JWT secret is strong enough to verify HS256 tokens locally.
+    Entropy is estimated from the secret's own character distribution.
+    """
+    if not secret or secret == DEFAULT_JWT_SECRET:
+        return False
+
+    counts = Counter(secret)
+    per_char = -sum(
+        (n / len(secret)) * math.log2(n / len(secret))
+        for n in counts.values()
+    )
+    return per_char * len(secret) >= MIN_JWT_SECRET_BITS
+
+
+class TokenVerifier:
+    """
+    Verifies Supabase access tokens with a bounded cache of verified users.
+    Cache keys are SHA-256 hashes, so raw tokens are never held in memory.
+    """
+
+    def __init__(self):
+        self._cache = TTLCache(max_size=settings.auth_token_cache_size)
+        self._jwks: Dict[str, Dict[str, Any]] = {}
+        self._jwks_fetched_at = 0.0
+        self._jwks_lock = asyncio.Lock()
+
+        self.remote_checks = 0
+        self.remote_failures = 0
+
+        if settings.jwt_secret and not is_trusted_jwt_secret(settings.jwt_secret):
+            logger.warning(
+                "JWT_SECRET is a placeholder or too weak; HS256 tokens will be "
+                "verified by Supabase Auth on every cache miss"
+            )
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Verify a token and return the user it belongs to.
+
+        Args:
+            token: Bearer access token
+
+        Returns:
+            User dict with id, email and full_name
+
+        Raises:
+            InvalidTokenError: If the token is not valid
+        """
+        cache_key = self._cache_key(token)
+        now = time.time()
+        interval = settings.auth_revocation_check_seconds
+
+        entry = self._cache.get(cache_key)
+        if entry and now < entry["expires_at"]:
+            if interval <= 0 or now - entry["checked_at"] < interval:
+                return entry["user"]
+
+        claims = await self._verify_locally(token)
+
+        checked_at = entry["checked_at"] if entry else 0.0
+        if claims is None or (interval > 0 and now - checked_at >= interval):
+            remote_claims = await self._verify_remotely(token, verified_locally=claims is not None)
+            if remote_claims is not None:
+                claims = remote_claims
+            checked_at = now
+
+        expires_at = float(claims.get("exp", now + 60))
+        user = {
+            "id": claims["sub"],
+            "email": claims.get("email"),
+            "full_name": (claims.get("user_metadata") or {}).get("full_name")
+        }
+
+        self._cache.set(
+            cache_key,
+            {"user": user, "expires_at": expires_at, "checked_at": checked_at},
+            ttl=max(expires_at - now, 0)
+        )
+        return user
+
+    def forget(self, token: str):
+        """Drop a token's cached verification, e.g. after logout."""
+        self._cache.delete(self._cache_key(token))
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache and remote-check counters."""
+        return {
+            **self._cache.stats(),
+            "remote_checks": self.remote_checks,
+            "remote_failures": self.remote_failures,
+            "jwks_keys": len(self._jwks)
+        }
+
+    @staticmethod
+    def _cache_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    async def _verify_locally(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Check signature and expiry without a network call.
+
+        Returns:
+            Verified claims, or None if no local key can verify this token
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except JWTError:
+            raise InvalidTokenError("Malformed token")
+
+        algorithm = header.get("alg")
+
+        if algorithm == "HS256":
+            # An untrusted secret also rules out the local fallback
+            # in _verify_remotely during Auth outages
+            if not is_trusted_jwt_secret(settings.jwt_secret):
+                return None
+            key = settings.jwt_secret
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            key = await self._get_signing_key(header.get("kid"))
+            if key is None:
+                return None
+        else:
+            raise InvalidTokenError(f"Unsupported token algorithm: {algorithm}")
+
+        try:
+            return jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=settings.jwt_audience
+            )
+        except ExpiredSignatureError:
+            raise InvalidTokenError("Token expired")
+        except JWTError as e:
+            raise InvalidTokenError(f"Invalid token: {str(e)}")
+
+    async def _verify_remotely(
+        self,
+        token: str,
+        verified_locally: bool
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Ask Supabase Auth whether the token is still valid.
+
+        Returns:
+            Claims for the token, or None if the check could not be completed
+            but the token was already verified locally
+
+        Raises:
+            InvalidTokenError: If Supabase rejects the token (any 4xx), or
+            the check failed on transport or 5xx errors and there was no
+            local verification to fall back on
+        """
+        self.remote_checks += 1
+        max_retries = 3
+        last_exception = None
+
+        for attempt in range(max_retries):
+            try:
+                client = await get_async_supabase_client()
+                user_response = await client.auth.get_user(token)
+            except AuthApiError as e:
+                # 4xx: Supabase answered and rejected the token (e.g. a
+                # revoked session); only server errors are retried
+                if e.status < 500:
+                    logger.info(f"Token rejected by Supabase Auth: {str(e)}")
+                    raise InvalidTokenError("Token rejected by Supabase Auth")
+                last_exception = e
+                if attempt < max_retries - 1:
+                    logger.warning(f"Authentication attempt {attempt + 1}/{max_retries} failed: {str(e)}")
+                    await asyncio.sleep(0.5)
+                continue
+            except Exception as e:
+                last_exception = e
+                if attempt < max_retries - 1:
+                    logger.warning(f"Authentication attempt {attempt + 1}/{max_retries} failed: {str(e)}")
+                    await asyncio.sleep(0.5)
+                continue
+
+            if not user_response or not user_response.user:
+                raise InvalidTokenError("Token rejected by Supabase Auth")
+
+            claims = jwt.get_unverified_claims(token)
+            claims.update({
+                "sub": user_response.user.id,
+                "email": user_response.user.email,
+                "user_metadata": user_response.user.user_metadata or {}
+            })
+            return claims
+
+        self.remote_failures += 1
+        if verified_locally:
+            logger.warning(f"Revocation check unavailable, using local verification: {str(last_exception)}")
+            return None
+
+        logger.error(f"Authentication final error: {str(last_exception)}")
+        raise InvalidTokenError("Authentication failed")
+
+    async def _get_signing_key(self, kid: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Look up a JWKS key by ID, refreshing the key set when it is stale."""
+        if not kid:
+            return None
+
+        stale = time.time() - self._jwks_fetched_at >= settings.auth_jwks_cache_seconds
+        if kid in self._jwks and not stale:
+            return self._jwks[kid]
+
+        async with self._jwks_lock:
+            since_fetch = time.time() - self._jwks_fetched_at
+            if kid not in self._jwks or since_fetch >= settings.auth_jwks_cache_seconds:
+                if since_fetch >= JWKS_REFETCH_INTERVAL:
+                    await self._fetch_jwks()
+
+        return self._jwks.get(kid)
+
+    async def _fetch_jwks(self):
+        """Download the project's public signing keys."""
+        url = f"{settings.supabase_url}/auth/v1/.well-known/jwks.json"
+        self._jwks_fetched_at = time.time()
+
+        try:
+            async with httpx.AsyncClient(timeout=5.0) as http:
+                response = await http.get(url, headers={"apikey": settings.supabase_key})
+                response.raise_for_status()
+                keys = response.json().get("keys", [])
+        except Exception as e:
+            logger.warning(f"JWKS fetch failed: {str(e)}")
+            return
+
+        self._jwks = {key["kid"]: key for key in keys if key.get("kid")}
+        logger.info(f"Loaded {len(self._jwks)} JWKS signing keys")
+
+
+_verifier: Optional[TokenVerifier] = None
+
+
+def get_token_verifier() -> TokenVerifier:
+    """Get the process-wide token verifier."""
+    global _verifier
+    if _verifier is None:
+        _verifier = TokenVerifier()
+    return _verifier
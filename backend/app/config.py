@@ -22,6 +22,14 @@ class Settings(BaseSettings):
     supabase_url: str = Field(..., env="SUPABASE_URL")
     supabase_key: str = Field(..., env="SUPABASE_KEY")
     supabase_service_key: str = Field(..., env="SUPABASE_SERVICE_KEY")
+    # Direct Postgres connection, only needed for COPY bulk ingestion
+    database_url: str = Field(default="", env="DATABASE_URL")
+    
+    # Supabase connection pool
+    supabase_pool_size: int = Field(default=20, env="SUPABASE_POOL_SIZE")
+    supabase_pool_keepalive: int = Field(default=10, env="SUPABASE_POOL_KEEPALIVE")
+    supabase_pool_idle_timeout: float = Field(default=30.0, env="SUPABASE_POOL_IDLE_TIMEOUT")
+    supabase_http_timeout: float = Field(default=30.0, env="SUPABASE_HTTP_TIMEOUT")
     
     # LLM Providers
     llm_provider: str = Field(default="gemini", env="LLM_PROVIDER")
@@ -37,14 +45,84 @@ class Settings(BaseSettings):
         default="sentence-transformers/all-MiniLM-L6-v2",
         env="EMBEDDING_MODEL"
     )
+    # Query embeddings kept in the LRU cache
+    embedding_cache_size: int = Field(default=4096, env="EMBEDDING_CACHE_SIZE")
+    
+    # Retrieval mode ("vector", "keyword", "hybrid" or "bm25") and RRF constant;
+    # only "vector" is served from the local index when it is enabled
+    retrieval_mode: str = Field(default="vector", env="RETRIEVAL_MODE")
+    hybrid_rrf_k: int = Field(default=60, env="HYBRID_RRF_K")
+    # Latency budget (seconds) for the keyword fallback when vector search fails
+    keyword_fallback_timeout: float = Field(default=2.0, env="KEYWORD_FALLBACK_TIMEOUT")
+    
+    # Vector search ("fast", "balanced" or "accurate")
+    vector_search_accuracy: str = Field(default="balanced", env="VECTOR_SEARCH_ACCURACY")
+    # ivfflat list count of the global index (printed by manage_vector_index.py);
+    # domain-filtered searches read their partial index's count from the database
+    vector_index_lists: int = Field(default=100, env="VECTOR_INDEX_LISTS")
+    # Column searched by vector search ("float32", "halfvec" or "bit"); the
+    # quantized ones re-score this many candidates exactly (at most 1000,
+    # pgvector's hnsw.ef_search limit). Hybrid search always uses float32
+    vector_storage: str = Field(default="float32", env="VECTOR_STORAGE")
+    quantized_rescore_candidates: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        env="QUANTIZED_RESCORE_CANDIDATES"
+    )
+    
+    # In-process vector index (mirror of legal_chunks)
+    local_index_enabled: bool = Field(default=False, env="LOCAL_INDEX_ENABLED")
+    local_index_dtype: str = Field(default="float32", env="LOCAL_INDEX_DTYPE")
+    local_index_refresh_interval: float = Field(default=300.0, env="LOCAL_INDEX_REFRESH_INTERVAL")
+    local_index_snapshot_path: str = Field(default="", env="LOCAL_INDEX_SNAPSHOT_PATH")
+    
+    # Local BM25 index (written by scripts/build_bm25_index.py)
+    bm25_index_path: str = Field(default="", env="BM25_INDEX_PATH")
+    
+    # Cross-encoder reranking of retrieved chunks
+    rerank_enabled: bool = Field(default=False, env="RERANK_ENABLED")
+    rerank_model: str = Field(default="cross-encoder/ms-marco-MiniLM-L-6-v2", env="RERANK_MODEL")
+    rerank_candidates: int = Field(default=30, env="RERANK_CANDIDATES")
+    rerank_batch_size: int = Field(default=32, env="RERANK_BATCH_SIZE")
+    rerank_timeout: float = Field(default=1.0, env="RERANK_TIMEOUT")
+    rerank_cache_size: int = Field(default=8192, env="RERANK_CACHE_SIZE")
+    
+    # Seconds VectorStore.get_stats results are reused
+    corpus_stats_ttl: float = Field(default=30.0, env="CORPUS_STATS_TTL")
+    
+    # Retrieval result cache
+    retrieval_cache_size: int = Field(default=2048, env="RETRIEVAL_CACHE_SIZE")
+    retrieval_cache_ttl: float = Field(default=600.0, env="RETRIEVAL_CACHE_TTL")
+    retrieval_cache_version_check_seconds: float = Field(default=30.0, env="RETRIEVAL_CACHE_VERSION_CHECK_SECONDS")
     
     # Agent Settings
     confidence_threshold: float = Field(default=0.7, env="CONFIDENCE_THRESHOLD")
     max_clarification_loops: int = Field(default=15, env="MAX_CLARIFICATION_LOOPS")
     max_context_messages: int = Field(default=10, env="MAX_CONTEXT_MESSAGES")
     
+    # Session metadata cache ("memory" or "redis")
+    session_cache_backend: str = Field(default="memory", env="SESSION_CACHE_BACKEND")
+    session_cache_url: str = Field(default="redis://localhost:6379/0", env="SESSION_CACHE_URL")
+    session_cache_ttl: float = Field(default=300.0, env="SESSION_CACHE_TTL")
+    session_cache_size: int = Field(default=10000, env="SESSION_CACHE_SIZE")
+    
+    # Write-behind message persistence
+    write_behind_enabled: bool = Field(default=False, env="WRITE_BEHIND_ENABLED")
+    write_behind_spool_path: str = Field(
+        default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "message_spool.jsonl"),
+        env="WRITE_BEHIND_SPOOL_PATH"
+    )
+    write_behind_flush_interval: float = Field(default=1.0, env="WRITE_BEHIND_FLUSH_INTERVAL")
+    write_behind_batch_size: int = Field(default=100, env="WRITE_BEHIND_BATCH_SIZE")
+    write_behind_max_attempts: int = Field(default=10, env="WRITE_BEHIND_MAX_ATTEMPTS")
+    
     # Security
     jwt_secret: str = Field(default="dev-secret-change-in-prod", env="JWT_SECRET")
+    jwt_audience: str = Field(default="authenticated", env="JWT_AUDIENCE")
+    auth_revocation_check_seconds: int = Field(default=300, env="AUTH_REVOCATION_CHECK_SECONDS")
+    auth_jwks_cache_seconds: int = Field(default=3600, env="AUTH_JWKS_CACHE_SECONDS")
+    auth_token_cache_size: int = Field(default=10000, env="AUTH_TOKEN_CACHE_SIZE")
     cors_origins: str = Field(
         default="http://localhost:5173,http://localhost:3000",
         env="CORS_ORIGINS"
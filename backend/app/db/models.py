@@ -22,6 +22,8 @@ class ChatSession(BaseModel):
     user_id: str
     title: str = "New Conversation"
     summary: Optional[str] = None
+    message_count: int = 0
+    last_message_preview: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     
@@ -0,0 +1,99 @@
+"""
+Keyset Pagination
+Opaque cursors over (timestamp, id) sort keys.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime
+import base64
+import json
+import re
+import uuid
+
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Postgres trims trailing zeros from fractional seconds, which
+# datetime.fromisoformat only accepts from Python 3.11
+_FRACTION = re.compile(r"\.(\d{1,6})(?=$|[+-])")
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp as returned by PostgREST."""
+    normalized = _FRACTION.sub(lambda m: "." + m.group(1).ljust(6, "0"), value)
+    if normalized.endswith("Z"):
+        normalized = normalized[:-1] + "+00:00"
+    return datetime.fromisoformat(normalized)
+
+
+def encode_cursor(timestamp: str, row_id: str) -> str:
+    """
+    Encode a (timestamp, id) sort key as an opaque cursor.
+
+    Args:
+        timestamp: Value of the timestamp sort column
+        row_id: Row ID used as the tie-breaker
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = json.dumps([timestamp, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """
+    Decode a cursor produced by encode_cursor.
+    Both parts are validated, since they end up in a PostgREST filter.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        _parse_timestamp(timestamp)
+        row_id = str(uuid.UUID(row_id))
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+
+    return timestamp, row_id
+
+
+def keyset_filter(
+    column: str,
+    key: Tuple[str, str],
+    descending: bool = False
+) -> str:
+    """
+    Build a PostgREST or-filter selecting rows after a (column, id) key.
+
+    Args:
+        column: Timestamp sort column
+        key: Decoded (timestamp, id) cursor
+        descending: Whether the page is sorted newest first
+
+    Returns:
+        Filter string for the query builder's or_() method
+    """
+    timestamp, row_id = key
+    op = "lt" if descending else "gt"
+    return (
+        f'{column}.{op}."{timestamp}",'
+        f'and({column}.eq."{timestamp}",id.{op}."{row_id}")'
+    )
+
+
+def next_cursor(
+    rows: List[Dict[str, Any]],
+    limit: int,
+    column: str
+) -> Optional[str]:
+    """
+    Cursor for the page after rows, or None when this was the last page.
+    """
+    if len(rows) < limit or not rows:
+        return None
+
+    last = rows[-1]
+    return encode_cursor(last[column], last["id"])
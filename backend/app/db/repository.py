@@ -0,0 +1,442 @@
+"""
+Async Repository Layer
+Non-blocking data access for chat sessions, messages and legal chunks.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+import uuid
+
+from postgrest.types import ReturnMethod
+
+from app.db.pagination import keyset_filter
+from app.db.supabase import get_async_service_client
+
+
+class SessionRepository:
+    """Data access for the chat_sessions table."""
+
+    TABLE_NAME = "chat_sessions"
+
+    async def create(
+        self,
+        user_id: str,
+        title: str = "New Conversation",
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Create a new chat session.
+
+        Args:
+            user_id: Owner of the session
+            title: Session title
+            session_id: Optional pre-generated session ID
+
+        Returns:
+            The created session record
+        """
+        client = await get_async_service_client()
+        now = datetime.utcnow().isoformat()
+
+        record = {
+            "id": session_id or str(uuid.uuid4()),
+            "user_id": user_id,
+            "title": title,
+            "created_at": now,
+            "updated_at": now
+        }
+
+        await client.table(self.TABLE_NAME).insert(record).execute()
+        return record
+
+    async def get(
+        self,
+        session_id: str,
+        columns: str = "id, user_id, title, summary, created_at, updated_at"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a session by ID.
+
+        Returns:
+            The session record or None if it does not exist
+        """
+        client = await get_async_service_client()
+
+        result = await client.table(self.TABLE_NAME).select(columns).eq(
+            "id", session_id
+        ).limit(1).execute()
+
+        return result.data[0] if result.data else None
+
+    async def list_with_stats(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[Tuple[str, str]] = None,
+        since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List a user's sessions with message_count and last_message.
+        Uses the list_user_sessions function so it costs a single round trip.
+
+        Args:
+            user_id: Owner of the sessions
+            limit: Page size
+            cursor: Decoded (updated_at, id) key of the previous page's last row
+            since: Only return sessions updated after this timestamp
+
+        Returns:
+            One page of sessions, most recently updated first
+        """
+        client = await get_async_service_client()
+
+        params = {"p_user_id": user_id, "p_limit": limit, "p_since": since}
+        if cursor:
+            params["p_cursor_updated_at"], params["p_cursor_id"] = cursor
+
+        result = await client.rpc("list_user_sessions", params).execute()
+
+        return result.data or []
+
+    async def get_context_window(
+        self,
+        session_id: str,
+        limit: int = 10
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Load the newest messages of a session and its summary in one query.
+
+        Args:
+            session_id: Chat session ID
+            limit: Number of most recent messages to load
+
+        Returns:
+            {"summary": ..., "messages": [...]} with messages in chronological
+            order, or None if the session does not exist
+        """
+        client = await get_async_service_client()
+
+        result = await client.rpc(
+            "get_context_window",
+            {"p_session_id": session_id, "p_limit": limit}
+        ).execute()
+
+        return result.data or None
+
+    async def prepare_chat_context(
+        self,
+        user_id: str,
+        session_id: Optional[str] = None,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Check ownership of a session (or create one), and load its recent
+        messages and summary, atomically in a single round trip.
+
+        Args:
+            user_id: Requesting user
+            session_id: Existing session ID, or None to create a new session
+            limit: Number of most recent messages to load
+
+        Returns:
+            Dict with status ("ok", "created", "not_found" or "forbidden"),
+            session_id, summary and messages
+        """
+        client = await get_async_service_client()
+
+        result = await client.rpc(
+            "prepare_chat_context",
+            {"p_user_id": user_id, "p_session_id": session_id, "p_limit": limit}
+        ).execute()
+
+        return result.data
+
+    async def persist_turn(
+        self,
+        session_id: str,
+        messages: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        Insert a turn's messages and bump updated_at in one transaction.
+        Messages carry client-generated IDs, so retries do not duplicate rows.
+
+        Args:
+            session_id: Chat session ID
+            messages: Message records (id, role, content, metadata, created_at)
+
+        Returns:
+            {"inserted": ..., "message_count": ...}
+        """
+        client = await get_async_service_client()
+
+        result = await client.rpc(
+            "persist_chat_turn",
+            {"p_session_id": session_id, "p_messages": messages}
+        ).execute()
+
+        return result.data or {}
+
+    async def update(self, session_id: str, values: Dict[str, Any]):
+        """Update fields on a session."""
+        client = await get_async_service_client()
+
+        await client.table(self.TABLE_NAME).update(values).eq(
+            "id", session_id
+        ).execute()
+
+    async def touch(self, session_id: str):
+        """Bump the session's updated_at timestamp."""
+        await self.update(session_id, {"updated_at": datetime.utcnow().isoformat()})
+
+    async def delete(self, session_id: str):
+        """Delete a session."""
+        client = await get_async_service_client()
+
+        await client.table(self.TABLE_NAME).delete().eq(
+            "id", session_id
+        ).execute()
+
+
+class MessageRepository:
+    """Data access for the chat_messages table."""
+
+    TABLE_NAME = "chat_messages"
+
+    async def insert(self, record: Dict[str, Any]):
+        """Insert a single message record."""
+        client = await get_async_service_client()
+        await client.table(self.TABLE_NAME).insert(record).execute()
+
+    async def persist_batch(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        Insert messages belonging to any number of sessions in one call.
+        Each record must carry its session_id and a client-generated id.
+
+        Returns:
+            Number of messages inserted
+        """
+        client = await get_async_service_client()
+
+        result = await client.rpc(
+            "persist_chat_batch",
+            {"p_messages": messages}
+        ).execute()
+
+        return (result.data or {}).get("inserted", 0)
+
+    async def list_for_session(
+        self,
+        session_id: str,
+        limit: int = 50,
+        offset: int = 0,
+        after: Optional[Tuple[str, str]] = None,
+        since: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        List messages of a session in chronological order.
+
+        Args:
+            session_id: Chat session ID
+            limit: Page size
+            offset: Legacy offset paging, ignored when after is given
+            after: Decoded (created_at, id) key of the previous page's last row
+            since: Only return messages created after this timestamp
+
+        Returns:
+            One page of messages
+        """
+        client = await get_async_service_client()
+
+        query_builder = client.table(self.TABLE_NAME).select(
+            "id, role, content, metadata, created_at"
+        ).eq(
+            "session_id", session_id
+        )
+
+        if since:
+            query_builder = query_builder.gt("created_at", since)
+
+        if after:
+            query_builder = query_builder.or_(keyset_filter("created_at", after))
+
+        query_builder = query_builder.order(
+            "created_at", desc=False
+        ).order("id", desc=False)
+
+        if after:
+            query_builder = query_builder.limit(limit)
+        else:
+            query_builder = query_builder.range(offset, offset + limit - 1)
+
+        result = await query_builder.execute()
+
+        return result.data or []
+
+    async def count(self, session_id: str) -> int:
+        """Count the messages in a session."""
+        client = await get_async_service_client()
+
+        result = await client.table(self.TABLE_NAME).select(
+            "id", count="exact"
+        ).eq("session_id", session_id).limit(1).execute()
+
+        return result.count or 0
+
+    async def delete_for_session(self, session_id: str) -> int:
+        """Delete all messages of a session."""
+        client = await get_async_service_client()
+
+        result = await client.table(self.TABLE_NAME).delete().eq(
+            "session_id", session_id
+        ).execute()
+
+        return len(result.data) if result.data else 0
+
+
+class ChunkRepository:
+    """Data access for the legal_chunks table."""
+
+    TABLE_NAME = "legal_chunks"
+
+    async def insert(self, record: Dict[str, Any]):
+        """Insert a single chunk record."""
+        client = await get_async_service_client()
+        await client.table(self.TABLE_NAME).insert(record).execute()
+
+    async def insert_many(self, records: List[Dict[str, Any]]):
+        """
+        Insert chunk records with a single multi-row request.
+        The server does not echo the rows (and their embeddings) back.
+        """
+        client = await get_async_service_client()
+        await client.table(self.TABLE_NAME).insert(
+            records,
+            returning=ReturnMethod.minimal
+        ).execute()
+
+    async def list_page(
+        self,
+        after: Optional[Tuple[str, str]] = None,
+        limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """
+        Page through all chunks, embeddings included, oldest first.
+
+        Args:
+            after: (created_at, id) key of the previous page's last row
+            limit: Page size
+
+        Returns:
+            One page of chunk rows
+        """
+        client = await get_async_service_client()
+
+        query_builder = client.table(self.TABLE_NAME).select(
+            "id, content, embedding, act_name, section, chapter, "
+            "source_url, domain, metadata, created_at"
+        )
+
+        if after:
+            query_builder = query_builder.or_(keyset_filter("created_at", after))
+
+        result = await query_builder.order(
+            "created_at", desc=False
+        ).order("id", desc=False).limit(limit).execute()
+
+        return result.data or []
+
+    async def match(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run the match_legal_chunks similarity search function."""
+        client = await get_async_service_client()
+        result = await client.rpc("match_legal_chunks", params).execute()
+        return result.data or []
+
+    async def match_quantized(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run the match_legal_chunks_quantized prefilter-and-rescore function."""
+        client = await get_async_service_client()
+        result = await client.rpc("match_legal_chunks_quantized", params).execute()
+        return result.data or []
+
+    async def keyword_match(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run the keyword_search_legal_chunks full-text function."""
+        client = await get_async_service_client()
+        result = await client.rpc("keyword_search_legal_chunks", params).execute()
+        return result.data or []
+
+    async def hybrid_match(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run the hybrid_search_legal_chunks RRF function."""
+        client = await get_async_service_client()
+        result = await client.rpc("hybrid_search_legal_chunks", params).execute()
+        return result.data or []
+
+    async def lookup_sections(
+        self,
+        pairs: List[Tuple[str, Optional[str]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch the first chunk of each (act name, section) pair by
+        normalized key. Rows carry requested_act and requested_section.
+        """
+        client = await get_async_service_client()
+        result = await client.rpc("lookup_legal_sections", {
+            "act_names": [act_name for act_name, _ in pairs],
+            "sections": [section for _, section in pairs]
+        }).execute()
+        return result.data or []
+
+    async def delete_by_domain(self, domain: str) -> int:
+        """Delete every chunk in a domain."""
+        client = await get_async_service_client()
+
+        result = await client.table(self.TABLE_NAME).delete().eq(
+            "domain", domain
+        ).execute()
+
+        return len(result.data) if result.data else 0
+
+    async def count(self, embedded_only: bool = False) -> int:
+        """
+        Count chunks.
+
+        Args:
+            embedded_only: Count only chunks that have an embedding
+
+        Returns:
+            Number of chunks
+        """
+        client = await get_async_service_client()
+
+        query = client.table(self.TABLE_NAME).select("id", count="exact")
+        if embedded_only:
+            query = query.not_.is_("embedding", "null")
+
+        result = await query.limit(1).execute()
+        return result.count or 0
+
+    async def corpus_version(self) -> int:
+        """Current corpus version, bumped by every ingestion or deletion."""
+        client = await get_async_service_client()
+        result = await client.rpc("get_corpus_version", {}).execute()
+        return int(result.data or 0)
+
+    async def bump_corpus_version(self) -> int:
+        """Increment the corpus version and return the new value."""
+        client = await get_async_service_client()
+        result = await client.rpc("bump_corpus_version", {}).execute()
+        return int(result.data or 0)
+
+    async def stats(self) -> Dict[str, Any]:
+        """Run the legal_chunks_stats aggregation function."""
+        client = await get_async_service_client()
+        result = await client.rpc("legal_chunks_stats", {}).execute()
+        return result.data or {}
+
+    async def domain_index_lists(self) -> Dict[str, int]:
+        """ivfflat list count of each domain's partial embedding index."""
+        client = await get_async_service_client()
+        result = await client.rpc("legal_chunks_domain_index_lists", {}).execute()
+        return {
+            row["domain"]: row["lists"]
+            for row in result.data or []
+            if row.get("domain") is not None and row.get("lists")
+        }
@@ -0,0 +1,214 @@
+"""
+Session Metadata Cache
+Caches session ownership (user_id, title, created_at) to skip the
+chat_sessions lookup that guards every session endpoint.
+
+A session's owner never changes, so a stale entry can at worst show an
+old title or let a request reach a session deleted by another worker,
+where it finds no rows. Entries are refreshed on create and read and
+dropped on update and delete. The in-process backend is used by default;
+set SESSION_CACHE_BACKEND=redis to share entries between workers.
+"""
+
+from typing import Any, Dict, List, Optional
+import json
+
+from app.config import settings
+from app.db.repository import SessionRepository
+from app.utils.cache import TTLCache
+from app.utils.logger import logger
+
+
+CACHED_FIELDS = ("user_id", "title", "created_at")
+
+
+class MemorySessionCacheBackend:
+    """Per-process LRU+TTL backend."""
+
+    name = "memory"
+
+    def __init__(self, max_size: int, ttl: float):
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(session_id)
+
+    async def set(self, session_id: str, entry: Dict[str, Any]):
+        self._cache.set(session_id, entry)
+
+    async def set_many(self, entries: Dict[str, Dict[str, Any]]):
+        for session_id, entry in entries.items():
+            self._cache.set(session_id, entry)
+
+    async def delete(self, session_id: str):
+        self._cache.delete(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self._cache.stats()
+        return {"size": stats["size"], "max_size": stats["max_size"]}
+
+
+class RedisSessionCacheBackend:
+    """Redis backend shared by all workers. Requires the redis package."""
+
+    name = "redis"
+
+    def __init__(self, url: str, ttl: float, prefix: str = "session:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise ImportError(
+                "SESSION_CACHE_BACKEND=redis requires the redis package "
+                "(pip install redis)"
+            )
+
+        self._client = redis.from_url(url)
+        self._ttl = int(ttl)
+        self._prefix = prefix
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self._client.get(self._prefix + session_id)
+        return json.loads(raw) if raw else None
+
+    async def set(self, session_id: str, entry: Dict[str, Any]):
+        await self._client.set(self._prefix + session_id, json.dumps(entry), ex=self._ttl)
+
+    async def set_many(self, entries: Dict[str, Dict[str, Any]]):
+        # One round trip for the whole page
+        async with self._client.pipeline(transaction=False) as pipe:
+            for session_id, entry in entries.items():
+                pipe.set(self._prefix + session_id, json.dumps(entry), ex=self._ttl)
+            await pipe.execute()
+
+    async def delete(self, session_id: str):
+        await self._client.delete(self._prefix + session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class SessionCache:
+    """
+    Read-through cache of session ownership and metadata.
+    Backend errors are logged and treated as misses, so the database
+    stays the source of truth.
+    """
+
+    def __init__(self, backend, repository: Optional[SessionRepository] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: Storage backend with async get/set/set_many/delete and stats()
+            repository: Session repository used to load misses
+        """
+        self.backend = backend
+        self.repository = repository or SessionRepository()
+
+        self.hits = 0
+        self.misses = 0
+        self.backend_errors = 0
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a session's user_id, title and created_at.
+
+        Args:
+            session_id: Chat session ID
+
+        Returns:
+            Cached metadata, or None if the session does not exist
+        """
+        entry = await self.peek(session_id)
+        if entry is not None:
+            return entry
+
+        session = await self.repository.get(session_id, columns=", ".join(CACHED_FIELDS))
+        if session:
+            await self.remember(session_id, session)
+        return session
+
+    async def peek(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Get cached metadata without falling back to the database."""
+        try:
+            entry = await self.backend.get(session_id)
+        except Exception as e:
+            self.backend_errors += 1
+            logger.warning(f"Session cache get error: {str(e)}")
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    async def remember(self, session_id: str, session: Dict[str, Any]):
+        """Cache metadata from a session row that was just created or read."""
+        if any(session.get(field) is None for field in CACHED_FIELDS):
+            return
+
+        try:
+            await self.backend.set(session_id, {field: session[field] for field in CACHED_FIELDS})
+        except Exception as e:
+            self.backend_errors += 1
+            logger.warning(f"Session cache set error: {str(e)}")
+
+    async def remember_many(self, sessions: List[Dict[str, Any]]):
+        """Cache metadata from a page of session rows in one backend call."""
+        entries = {
+            session["id"]: {field: session[field] for field in CACHED_FIELDS}
+            for session in sessions
+            if all(session.get(field) is not None for field in CACHED_FIELDS)
+        }
+        if not entries:
+            return
+
+        try:
+            await self.backend.set_many(entries)
+        except Exception as e:
+            self.backend_errors += 1
+            logger.warning(f"Session cache set error: {str(e)}")
+
+    async def invalidate(self, session_id: str):
+        """Drop a session after it has been updated or deleted."""
+        try:
+            await self.backend.delete(session_id)
+        except Exception as e:
+            self.backend_errors += 1
+            logger.warning(f"Session cache delete error: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate counters."""
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            **self.backend.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "backend_errors": self.backend_errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+_session_cache: Optional[SessionCache] = None
+
+
+def get_session_cache() -> SessionCache:
+    """Get the process-wide session cache, creating its backend from settings."""
+    global _session_cache
+
+    if _session_cache is None:
+        if settings.session_cache_backend == "redis":
+            backend = RedisSessionCacheBackend(
+                settings.session_cache_url,
+                ttl=settings.session_cache_ttl
+            )
+        else:
+            backend = MemorySessionCacheBackend(
+                max_size=settings.session_cache_size,
+                ttl=settings.session_cache_ttl
+            )
+        _session_cache = SessionCache(backend)
+
+    return _session_cache
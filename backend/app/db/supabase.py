@@ -1,16 +1,283 @@
 """
 Supabase Client Configuration
-Singleton pattern for database connection.
+Process-wide client registry with pooled keep-alive connections.
+Provides sync clients for scripts and async clients for the request path.
 """
 
-from supabase import create_client, Client
-from typing import Optional
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from supabase import create_client, acreate_client, Client, AsyncClient
 
 from app.config import settings
 from app.utils.logger import logger
 
 
-_supabase_client: Optional[Client] = None
+ANON_ROLE = "anon"
+SERVICE_ROLE = "service"
+
+
+class _InstrumentedTransport(httpx.HTTPTransport):
+    """
+    HTTP transport that records pool usage.
+    Shared by every PostgREST session of a role so connections are reused.
+    """
+
+    def __init__(self, role: str, **kwargs):
+        super().__init__(**kwargs)
+        self.role = role
+        self._lock = threading.Lock()
+        self.requests_total = 0
+        self.errors_total = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_time_ms = 0.0
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        with self._lock:
+            self.requests_total += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+        started = time.perf_counter()
+        try:
+            return super().handle_request(request)
+        except Exception:
+            with self._lock:
+                self.errors_total += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.in_flight -= 1
+                self.total_time_ms += elapsed_ms
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage counters."""
+        connections = getattr(self._pool, "connections", [])
+        idle = sum(1 for conn in connections if conn.is_idle())
+
+        with self._lock:
+            avg_ms = self.total_time_ms / self.requests_total if self.requests_total else 0.0
+            return {
+                "requests_total": self.requests_total,
+                "errors_total": self.errors_total,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "avg_request_ms": round(avg_ms, 2),
+                "connections_open": len(connections),
+                "connections_idle": idle,
+            }
+
+
+class _InstrumentedAsyncTransport(httpx.AsyncHTTPTransport):
+    """
+    Async counterpart of _InstrumentedTransport.
+    Counters are only touched from the event loop, so no lock is needed.
+    """
+
+    def __init__(self, role: str, **kwargs):
+        super().__init__(**kwargs)
+        self.role = role
+        self.requests_total = 0
+        self.errors_total = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.total_time_ms = 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests_total += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+        started = time.perf_counter()
+        try:
+            return await super().handle_async_request(request)
+        except Exception:
+            self.errors_total += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.total_time_ms += (time.perf_counter() - started) * 1000
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of pool usage counters."""
+        connections = getattr(self._pool, "connections", [])
+        idle = sum(1 for conn in connections if conn.is_idle())
+        avg_ms = self.total_time_ms / self.requests_total if self.requests_total else 0.0
+
+        return {
+            "requests_total": self.requests_total,
+            "errors_total": self.errors_total,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "avg_request_ms": round(avg_ms, 2),
+            "connections_open": len(connections),
+            "connections_idle": idle,
+        }
+
+
+class SupabaseClientRegistry:
+    """
+    Holds one long-lived Supabase client per role.
+    Each role's PostgREST traffic goes through a single pooled transport,
+    so requests reuse keep-alive connections instead of new TLS handshakes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[str, Client] = {}
+        self._transports: Dict[str, _InstrumentedTransport] = {}
+        self._async_lock: Optional[asyncio.Lock] = None
+        self._async_clients: Dict[str, AsyncClient] = {}
+        self._async_transports: Dict[str, _InstrumentedAsyncTransport] = {}
+
+    def _role_key(self, role: str) -> str:
+        if role == ANON_ROLE:
+            return settings.supabase_key
+        if role == SERVICE_ROLE:
+            return settings.supabase_service_key
+        raise ValueError(f"Unknown Supabase role: {role}")
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=settings.supabase_pool_size,
+            max_keepalive_connections=settings.supabase_pool_keepalive,
+            keepalive_expiry=settings.supabase_pool_idle_timeout,
+        )
+
+    def _attach_pool(self, role: str, client: Client):
+        """
+        Route the client's PostgREST session through the role's pooled transport.
+        The Supabase client recreates its PostgREST client on auth events,
+        so this is re-checked on every lookup.
+        """
+        transport = self._transports.get(role)
+        if transport is None:
+            transport = _InstrumentedTransport(
+                role=role,
+                http2=True,
+                limits=self._limits(),
+            )
+            self._transports[role] = transport
+
+        postgrest = client.postgrest
+        session = postgrest.session
+        if getattr(session, "_transport", None) is transport:
+            return
+
+        postgrest.session = httpx.Client(
+            base_url=session.base_url,
+            headers=session.headers,
+            timeout=settings.supabase_http_timeout,
+            transport=transport,
+            follow_redirects=True,
+        )
+        session.close()
+
+    async def _attach_async_pool(self, role: str, client: AsyncClient):
+        """Async version of _attach_pool."""
+        transport = self._async_transports.get(role)
+        if transport is None:
+            transport = _InstrumentedAsyncTransport(
+                role=role,
+                http2=True,
+                limits=self._limits(),
+            )
+            self._async_transports[role] = transport
+
+        postgrest = client.postgrest
+        session = postgrest.session
+        if getattr(session, "_transport", None) is transport:
+            return
+
+        postgrest.session = httpx.AsyncClient(
+            base_url=session.base_url,
+            headers=session.headers,
+            timeout=settings.supabase_http_timeout,
+            transport=transport,
+            follow_redirects=True,
+        )
+        # Release the replaced session's own connection pool
+        await session.aclose()
+
+    def get(self, role: str) -> Client:
+        """
+        Get the shared client for a role, creating it on first use.
+        """
+        with self._lock:
+            client = self._clients.get(role)
+            if client is None:
+                try:
+                    client = create_client(settings.supabase_url, self._role_key(role))
+                except Exception as e:
+                    logger.error(f"Failed to initialize Supabase {role} client: {str(e)}")
+                    raise
+                self._clients[role] = client
+                logger.info(f"Supabase {role} client initialized")
+
+            self._attach_pool(role, client)
+            return client
+
+    async def get_async(self, role: str) -> AsyncClient:
+        """
+        Get the shared async client for a role, creating it on first use.
+        Creation is serialized so concurrent first requests share one client.
+        """
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+
+        async with self._async_lock:
+            client = self._async_clients.get(role)
+            if client is None:
+                try:
+                    client = await acreate_client(settings.supabase_url, self._role_key(role))
+                except Exception as e:
+                    logger.error(f"Failed to initialize async Supabase {role} client: {str(e)}")
+                    raise
+                self._async_clients[role] = client
+                logger.info(f"Async Supabase {role} client initialized")
+
+            await self._attach_async_pool(role, client)
+            return client
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool usage metrics for every role."""
+        stats = {
+            role: transport.stats()
+            for role, transport in self._transports.items()
+        }
+        for role, transport in self._async_transports.items():
+            stats[f"{role}_async"] = transport.stats()
+        return stats
+
+    async def close(self):
+        """Close all pooled connections. Called during application shutdown."""
+        with self._lock:
+            for role, transport in self._transports.items():
+                try:
+                    transport.close()
+                except Exception as e:
+                    logger.warning(f"Error closing Supabase {role} pool: {str(e)}")
+            self._transports.clear()
+            self._clients.clear()
+
+        for role, transport in self._async_transports.items():
+            try:
+                await transport.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing async Supabase {role} pool: {str(e)}")
+        self._async_transports.clear()
+        self._async_clients.clear()
+        self._async_lock = None
+
+        logger.info("Supabase connection pools closed")
+
+
+_registry = SupabaseClientRegistry()
 
 
 def init_supabase() -> Client:
@@ -18,39 +285,47 @@ def init_supabase() -> Client:
     Initialize Supabase client.
     Called once during application startup.
     """
-    global _supabase_client
-    
-    try:
-        _supabase_client = create_client(
-            settings.supabase_url,
-            settings.supabase_key
-        )
-        logger.info("Supabase client initialized successfully")
-        return _supabase_client
-    except Exception as e:
-        logger.error(f"Failed to initialize Supabase: {str(e)}")
-        raise
+    client = _registry.get(ANON_ROLE)
+    _registry.get(SERVICE_ROLE)
+    logger.info("Supabase client initialized successfully")
+    return client
 
 
 def get_supabase_client() -> Client:
     """
-    Get the Supabase client instance.
-    Initializes if not already done.
+    Get the shared Supabase client instance (anon key).
     """
-    global _supabase_client
-    
-    if _supabase_client is None:
-        return init_supabase()
-    
-    return _supabase_client
+    return _registry.get(ANON_ROLE)
 
 
 def get_service_client() -> Client:
     """
-    Get Supabase client with service role key.
+    Get the shared Supabase client with service role key.
     Used for admin operations.
     """
-    return create_client(
-        settings.supabase_url,
-        settings.supabase_service_key
-    )
\ No newline at end of file
+    return _registry.get(SERVICE_ROLE)
+
+
+async def get_async_supabase_client() -> AsyncClient:
+    """
+    Get the shared async Supabase client (anon key).
+    """
+    return await _registry.get_async(ANON_ROLE)
+
+
+async def get_async_service_client() -> AsyncClient:
+    """
+    Get the shared async Supabase client with service role key.
+    Used by the repository layer on the request path.
+    """
+    return await _registry.get_async(SERVICE_ROLE)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Get connection pool usage metrics per role."""
+    return _registry.stats()
+
+
+async def close_supabase():
+    """Close pooled Supabase connections."""
+    await _registry.close()
@@ -3,15 +3,29 @@ Vector Store Operations
 Handles pgvector operations for RAG.
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
 import json
+import time
 import uuid
 
-from app.db.supabase import get_service_client
+from app.config import settings
+from app.db.repository import ChunkRepository
+from app.db.vector_index import metadata_json, search_params, vector_literal
 from app.llm.embeddings import get_embedding
+from app.rag.bm25 import get_bm25_index
+from app.rag.local_index import get_local_index
+from app.rag.result_cache import get_retrieval_cache
+from app.utils.cache import TTLCache
 from app.utils.logger import logger
 
 
+# get_stats result, shared by every VectorStore in the process
+_stats_cache = TTLCache(max_size=1, ttl=settings.corpus_stats_ttl)
+# List counts of the per-domain partial indexes, for sizing probes
+_domain_lists_cache = TTLCache(max_size=1, ttl=settings.corpus_stats_ttl)
+
+
 class VectorStore:
     """
     Vector store for legal document embeddings.
@@ -21,57 +35,111 @@ class VectorStore:
     TABLE_NAME = "legal_chunks"
     
     def __init__(self):
-        # Use service client to bypass RLS for ingestion
-        self.client = get_service_client()
+        # Repository uses the service client to bypass RLS for ingestion
+        self.repository = ChunkRepository()
+        # Outcome of the most recent add_documents call
+        self.last_ingest_report: Dict[str, Any] = {}
     
     async def add_documents(
         self,
         documents: List[Dict[str, Any]],
-        batch_size: int = 100
+        batch_size: int = 100,
+        max_concurrency: int = 4,
+        max_retries: int = 3
     ) -> int:
         """
         Add documents to the vector store.
+        Each batch is written with one multi-row insert, with up to
+        max_concurrency batches in flight. A batch that still fails after
+        its retries is skipped and recorded in last_ingest_report.
         
         Args:
             documents: List of documents with content and metadata
-            batch_size: Number of documents to process at once
+            batch_size: Number of documents per insert request
+            max_concurrency: Maximum concurrent insert requests
+            max_retries: Attempts per batch before giving up on it
             
         Returns:
             Number of documents added
         """
-        added_count = 0
+        start_time = time.perf_counter()
         
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i:i + batch_size]
+        records = []
+        skipped = 0
+        for doc in documents:
+            # Check for existing embedding
+            if "embedding" not in doc or doc["embedding"] is None:
+                logger.warning(f"Document missing embedding, skipping: {doc.get('act_name', 'Unknown')}")
+                skipped += 1
+                continue
             
-            for doc in batch:
-                try:
-                    # Check for existing embedding
-                    if "embedding" not in doc or doc["embedding"] is None:
-                        logger.warning(f"Document missing embedding, skipping: {doc.get('act_name', 'Unknown')}")
-                        continue
-                        
-                    # Prepare record
-                    record = {
-                        "content": doc["content"],
-                        "embedding": doc["embedding"],
-                        "act_name": doc.get("act_name"),
-                        "section": doc.get("section"),
-                        "chapter": doc.get("chapter"),
-                        "source_url": doc.get("source_url"),
-                        "domain": doc.get("domain"),
-                        "metadata": json.dumps(doc.get("metadata", {}))
-                    }
-                    
-                    # Insert into database
-                    self.client.table(self.TABLE_NAME).insert(record).execute()
-                    added_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error adding document: {str(e)}")
-                    continue
+            records.append({
+                "content": doc["content"],
+                "embedding": vector_literal(doc["embedding"]),
+                "act_name": doc.get("act_name"),
+                "section": doc.get("section"),
+                "chapter": doc.get("chapter"),
+                "source_url": doc.get("source_url"),
+                "domain": doc.get("domain"),
+                # Sent as an object so jsonb stores an object, as COPY does
+                "metadata": json.loads(metadata_json(doc.get("metadata")))
+            })
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        failed_batches = []
+        
+        async def insert_batch(offset: int, batch: List[Dict[str, Any]]) -> int:
+            async with semaphore:
+                for attempt in range(max_retries):
+                    try:
+                        await self.repository.insert_many(batch)
+                        return len(batch)
+                    except Exception as e:
+                        if attempt < max_retries - 1:
+                            logger.warning(
+                                f"Insert batch at {offset} attempt {attempt + 1}/{max_retries} "
+                                f"failed: {str(e)}"
+                            )
+                            await asyncio.sleep(0.5 * (2 ** attempt))
+                        else:
+                            logger.error(f"Error adding batch at {offset}: {str(e)}")
+                            failed_batches.append({
+                                "offset": offset,
+                                "size": len(batch),
+                                "error": str(e)
+                            })
+                return 0
+        
+        results = await asyncio.gather(*[
+            insert_batch(i, records[i:i + batch_size])
+            for i in range(0, len(records), batch_size)
+        ])
+        added_count = sum(results)
+        
+        elapsed = time.perf_counter() - start_time
+        rows_per_second = added_count / elapsed if elapsed > 0 else 0.0
         
-        logger.info(f"Added {added_count} documents to vector store")
+        self.last_ingest_report = {
+            "added": added_count,
+            "skipped": skipped,
+            "failed": sum(batch["size"] for batch in failed_batches),
+            "failed_batches": sorted(failed_batches, key=lambda batch: batch["offset"]),
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(rows_per_second, 1)
+        }
+        
+        logger.info(
+            f"Added {added_count} documents to vector store "
+            f"in {elapsed:.2f}s ({rows_per_second:.1f} rows/s)"
+        )
+        if failed_batches:
+            logger.warning(
+                f"{self.last_ingest_report['failed']} documents in "
+                f"{len(failed_batches)} batches failed to insert"
+            )
+        
+        if added_count:
+            await self._bump_corpus_version()
         return added_count
     
     async def similarity_search(
@@ -79,7 +147,8 @@ class VectorStore:
         query: str,
         k: int = 5,
         filter_domain: Optional[str] = None,
-        threshold: float = 0.5
+        threshold: float = 0.5,
+        accuracy: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Perform similarity search on the vector store.
@@ -89,44 +158,63 @@ class VectorStore:
             k: Number of results to return
             filter_domain: Optional domain filter
             threshold: Minimum similarity threshold
+            accuracy: "fast", "balanced" or "accurate" (defaults to settings);
+                trades recall for latency on the approximate index
             
         Returns:
             List of matching documents with scores
         """
+        accuracy = accuracy or settings.vector_search_accuracy
+        cache = get_retrieval_cache()
+        storage = settings.vector_storage
+        cache_key = cache.key("similarity", query, filter_domain, k, threshold, accuracy, storage)
+        
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             # Generate query embedding
             query_embedding = await get_embedding(query)
             
-            # Build the RPC call for vector similarity search
-            # This uses a Supabase function for cosine similarity
-            result = self.client.rpc(
-                "match_legal_chunks",
-                {
-                    "query_embedding": query_embedding,
+            # Serve from the in-process mirror when it is loaded
+            local_index = get_local_index()
+            if local_index:
+                try:
+                    documents = local_index.search(query_embedding, k, filter_domain, threshold)
+                    await cache.set(cache_key, documents)
+                    return documents
+                except Exception as e:
+                    logger.warning(f"Local vector index search failed, using RPC: {str(e)}")
+            
+            params = await self._search_params(accuracy, filter_domain)
+            
+            if storage == "float32":
+                # Build the RPC call for vector similarity search
+                # This uses a Supabase function for cosine similarity
+                rows = await self.repository.match({
+                    "query_embedding": vector_literal(query_embedding),
                     "match_threshold": threshold,
                     "match_count": k,
-                    "filter_domain": filter_domain
-                }
-            ).execute()
-            
-            if not result.data:
-                return []
+                    "filter_domain": filter_domain,
+                    **params
+                })
+            else:
+                # Quantized index prefilter, exact cosine re-scoring in the database
+                rows = await self.repository.match_quantized({
+                    "query_embedding": vector_literal(query_embedding),
+                    "match_threshold": threshold,
+                    "match_count": k,
+                    "filter_domain": filter_domain,
+                    "storage": storage,
+                    "rescore_candidates": settings.quantized_rescore_candidates,
+                    "hnsw_ef_search": params["hnsw_ef_search"]
+                })
             
             # Format results
-            documents = []
-            for row in result.data:
-                documents.append({
-                    "id": row["id"],
-                    "content": row["content"],
-                    "score": row["similarity"],
-                    "act_name": row.get("act_name"),
-                    "section": row.get("section"),
-                    "chapter": row.get("chapter"),
-                    "source_url": row.get("source_url"),
-                    "domain": row.get("domain"),
-                    "metadata": json.loads(row.get("metadata", "{}"))
-                })
+            documents = [self._format_row(row, row["similarity"]) for row in rows]
             
+            await cache.set(cache_key, documents)
             return documents
             
         except Exception as e:
@@ -134,6 +222,173 @@ class VectorStore:
             # Fallback to basic text search if vector search fails
             return await self._fallback_search(query, k, filter_domain)
     
+    async def search(
+        self,
+        query: str,
+        k: int = 5,
+        filter_domain: Optional[str] = None,
+        threshold: float = 0.5,
+        mode: Optional[str] = None,
+        accuracy: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Search with the given retrieval mode.
+        
+        Args:
+            query: Search query
+            k: Number of results to return
+            filter_domain: Optional domain filter
+            threshold: Minimum cosine similarity (vector candidates only)
+            mode: "vector", "keyword", "hybrid" or "bm25" (defaults to settings)
+            accuracy: Vector index accuracy level
+            
+        Returns:
+            List of matching documents with scores
+        """
+        mode = mode or settings.retrieval_mode
+        
+        if mode == "vector":
+            return await self.similarity_search(query, k, filter_domain, threshold, accuracy)
+        if mode == "keyword":
+            return await self.keyword_search(query, k, filter_domain)
+        if mode == "hybrid":
+            return await self.hybrid_search(query, k, filter_domain, threshold, accuracy)
+        if mode == "bm25":
+            bm25_index = get_bm25_index()
+            if bm25_index is None:
+                raise RuntimeError("RETRIEVAL_MODE=bm25 requires BM25_INDEX_PATH")
+            return bm25_index.search(query, k, filter_domain)
+        
+        raise ValueError(f"Unknown retrieval mode: {mode}")
+    
+    async def keyword_search(
+        self,
+        query: str,
+        k: int = 5,
+        filter_domain: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Full-text search over the indexed content_tsv column.
+        Scores are cover-density ranks normalized to 0..1.
+        """
+        cache = get_retrieval_cache()
+        cache_key = cache.key("keyword", query, filter_domain, k)
+        
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            rows = await self.repository.keyword_match({
+                "query_text": query,
+                "match_count": k,
+                "filter_domain": filter_domain
+            })
+            
+            documents = [self._format_row(row, row["similarity"]) for row in rows]
+            
+            await cache.set(cache_key, documents)
+            return documents
+            
+        except Exception as e:
+            logger.error(f"Keyword search error: {str(e)}")
+            return []
+    
+    async def hybrid_search(
+        self,
+        query: str,
+        k: int = 5,
+        filter_domain: Optional[str] = None,
+        threshold: float = 0.5,
+        accuracy: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Keyword and vector search fused with reciprocal rank fusion in
+        the database. Documents are ordered by rrf_score; score remains
+        the cosine similarity, and every document (keyword-only matches
+        included) clears threshold. Always queries the database, never
+        the local index, and ranks on the float32 embedding whatever
+        VECTOR_STORAGE is. Falls back to vector search on failure.
+        """
+        accuracy = accuracy or settings.vector_search_accuracy
+        cache = get_retrieval_cache()
+        cache_key = cache.key("hybrid", query, filter_domain, k, threshold, accuracy)
+        
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            query_embedding = await get_embedding(query)
+            params = await self._search_params(accuracy, filter_domain)
+            
+            rows = await self.repository.hybrid_match({
+                "query_text": query,
+                "query_embedding": vector_literal(query_embedding),
+                "match_count": k,
+                "filter_domain": filter_domain,
+                "match_threshold": threshold,
+                "rrf_k": settings.hybrid_rrf_k,
+                **params
+            })
+            
+            documents = []
+            for row in rows:
+                document = self._format_row(row, row["similarity"])
+                document["rrf_score"] = row.get("rrf_score")
+                document["keyword_rank"] = row.get("keyword_rank")
+                document["semantic_rank"] = row.get("semantic_rank")
+                documents.append(document)
+            
+            await cache.set(cache_key, documents)
+            return documents
+            
+        except Exception as e:
+            logger.error(f"Hybrid search error: {str(e)}")
+            return await self.similarity_search(query, k, filter_domain, threshold, accuracy)
+    
+    async def lookup_sections(
+        self,
+        pairs: List[Tuple[str, Optional[str]]]
+    ) -> Dict[Tuple[str, Optional[str]], Dict[str, Any]]:
+        """
+        Exact lookup of (act name, section) pairs on normalized keys,
+        in one round trip and without embedding anything.
+        
+        Args:
+            pairs: (act name, section) pairs; a None section matches any
+                section of the act
+            
+        Returns:
+            Matched pairs mapped to their first chunk (score 1.0); misses
+            are absent
+        """
+        if not pairs:
+            return {}
+        
+        cache = get_retrieval_cache()
+        cache_key = cache.key("sections", "", *pairs)
+        
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return {(doc["requested_act"], doc["requested_section"]): doc for doc in cached}
+        
+        try:
+            rows = await self.repository.lookup_sections(pairs)
+        except Exception as e:
+            logger.error(f"Section lookup error: {str(e)}")
+            return {}
+        
+        documents = []
+        for row in rows:
+            document = self._format_row(row, 1.0)
+            document["requested_act"] = row["requested_act"]
+            document["requested_section"] = row["requested_section"]
+            documents.append(document)
+        
+        await cache.set(cache_key, documents)
+        return {(doc["requested_act"], doc["requested_section"]): doc for doc in documents}
+    
     async def _fallback_search(
         self,
         query: str,
@@ -142,35 +397,34 @@ class VectorStore:
     ) -> List[Dict[str, Any]]:
         """
         Fallback text search when vector search fails.
+        Uses the indexed full-text search under a latency budget, so
+        degraded mode never scans the table, then the local BM25 index.
         """
         try:
-            query_builder = self.client.table(self.TABLE_NAME).select(
-                "id, content, act_name, section, chapter, source_url, domain, metadata"
-            ).ilike("content", f"%{query}%").limit(k)
-            
-            if filter_domain:
-                query_builder = query_builder.eq("domain", filter_domain)
-            
-            result = query_builder.execute()
-            
-            return [
-                {
-                    "id": row["id"],
-                    "content": row["content"],
-                    "score": 0.5,  # Default score for text search
-                    "act_name": row.get("act_name"),
-                    "section": row.get("section"),
-                    "chapter": row.get("chapter"),
-                    "source_url": row.get("source_url"),
-                    "domain": row.get("domain"),
-                    "metadata": json.loads(row.get("metadata", "{}"))
-                }
-                for row in result.data
-            ]
+            rows = await asyncio.wait_for(
+                self.repository.keyword_match({
+                    "query_text": query,
+                    "match_count": k,
+                    "filter_domain": filter_domain
+                }),
+                timeout=settings.keyword_fallback_timeout
+            )
+            
+            # Default score for text search; ranks keep the order
+            return [self._format_row(row, 0.5) for row in rows]
             
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Fallback search exceeded {settings.keyword_fallback_timeout}s budget"
+            )
         except Exception as e:
             logger.error(f"Fallback search error: {str(e)}")
-            return []
+        
+        # Database unavailable: answer from the local BM25 index if present
+        bm25_index = get_bm25_index()
+        if bm25_index:
+            return bm25_index.search(query, k, filter_domain)
+        return []
     
     async def delete_by_domain(self, domain: str) -> int:
         """
@@ -183,12 +437,11 @@ class VectorStore:
             Number of documents deleted
         """
         try:
-            result = self.client.table(self.TABLE_NAME).delete().eq(
-                "domain", domain
-            ).execute()
-            
-            deleted_count = len(result.data) if result.data else 0
+            deleted_count = await self.repository.delete_by_domain(domain)
             logger.info(f"Deleted {deleted_count} documents from domain: {domain}")
+            
+            if deleted_count:
+                await self._bump_corpus_version()
             return deleted_count
             
         except Exception as e:
@@ -198,28 +451,69 @@ class VectorStore:
     async def get_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the vector store.
+        Aggregated in the database and cached for CORPUS_STATS_TTL seconds.
+        
+        Returns:
+            total_documents, missing_embeddings, avg_content_length,
+            counts per domain and per act, and table and index sizes
         """
+        cached = _stats_cache.get("stats")
+        if cached is not None:
+            return dict(cached)
+        
         try:
-            # Get total count
-            total_result = self.client.table(self.TABLE_NAME).select(
-                "id", count="exact"
-            ).execute()
-            
-            # Get counts by domain
-            domain_result = self.client.table(self.TABLE_NAME).select(
-                "domain"
-            ).execute()
-            
-            domain_counts = {}
-            for row in domain_result.data:
-                domain = row.get("domain", "unknown")
-                domain_counts[domain] = domain_counts.get(domain, 0) + 1
-            
-            return {
-                "total_documents": total_result.count or 0,
-                "domains": domain_counts
-            }
+            stats = await self.repository.stats()
+            _stats_cache.set("stats", stats)
+            return dict(stats)
             
         except Exception as e:
             logger.error(f"Get stats error: {str(e)}")
-            return {"total_documents": 0, "domains": {}}
\ No newline at end of file
+            return {"total_documents": 0, "domains": {}}
+    
+    async def _search_params(self, accuracy: str, filter_domain: Optional[str]) -> Dict[str, int]:
+        """
+        Search-time settings for the index a query will use. Probes are a
+        fraction of the list count, so a domain with its own partial index
+        is sized by that index's lists rather than VECTOR_INDEX_LISTS.
+        """
+        lists = settings.vector_index_lists
+        
+        if filter_domain is not None:
+            domain_lists = _domain_lists_cache.get("lists")
+            if domain_lists is None:
+                try:
+                    domain_lists = await self.repository.domain_index_lists()
+                except Exception as e:
+                    logger.warning(f"Domain index lookup error: {str(e)}")
+                    domain_lists = {}
+                _domain_lists_cache.set("lists", domain_lists)
+            lists = domain_lists.get(filter_domain, lists)
+        
+        return search_params(accuracy, lists)
+    
+    async def _bump_corpus_version(self):
+        """Record a corpus change so cached retrieval results are dropped."""
+        try:
+            _stats_cache.clear()
+            version = await self.repository.bump_corpus_version()
+            get_retrieval_cache().invalidate(version)
+        except Exception as e:
+            logger.error(f"Bump corpus version error: {str(e)}")
+            get_retrieval_cache().invalidate()
+    
+    def _format_row(self, row: Dict[str, Any], score: float) -> Dict[str, Any]:
+        """Shape a legal_chunks row as a retrieved document."""
+        metadata = row.get("metadata")
+        
+        return {
+            "id": row["id"],
+            "content": row["content"],
+            "score": score,
+            "act_name": row.get("act_name"),
+            "section": row.get("section"),
+            "chapter": row.get("chapter"),
+            "source_url": row.get("source_url"),
+            "domain": row.get("domain"),
+            # Rows written before ingestion stored jsonb objects may hold a JSON string
+            "metadata": json.loads(metadata) if isinstance(metadata, str) else (metadata or {})
+        }
@@ -0,0 +1,153 @@
+"""
+Vector Index Planning
+Chooses the pgvector index type and parameters for legal_chunks and maps
+per-query accuracy levels to search-time settings.
+"""
+
+from typing import Dict, Optional
+from dataclasses import dataclass
+import hashlib
+import json
+import math
+import re
+
+
+INDEX_NAME = "idx_legal_chunks_embedding"
+
+# Per-domain partial indexes are named <prefix><slug>_<hash>
+DOMAIN_INDEX_PREFIX = f"{INDEX_NAME}_d_"
+
+# Indexes on the quantized embedding copies (see QUANTIZATION_SQL)
+QUANTIZED_INDEXES = {
+    "halfvec": (
+        "idx_legal_chunks_embedding_half",
+        "USING hnsw (embedding_half halfvec_cosine_ops) WITH (m = 16, ef_construction = 64)",
+    ),
+    "bit": (
+        "idx_legal_chunks_embedding_bit",
+        "USING hnsw (embedding_bit bit_hamming_ops) WITH (m = 16, ef_construction = 64)",
+    ),
+}
+
+EMBEDDING_STORAGES = ("float32", "halfvec", "bit")
+
+# Below this many rows an ivfflat index builds in seconds and recalls well;
+# above it HNSW gives better recall at the same latency
+HNSW_MIN_ROWS = 50_000
+
+# Search-time settings per accuracy level. probes is a fraction of the
+# ivfflat list count; ef_search is the HNSW candidate list size.
+ACCURACY_LEVELS = {
+    "fast": {"probe_fraction": 0.01, "ef_search": 40},
+    "balanced": {"probe_fraction": 0.05, "ef_search": 100},
+    "accurate": {"probe_fraction": 0.15, "ef_search": 250},
+}
+
+
+@dataclass
+class IndexPlan:
+    """Index type and build parameters for a given corpus size."""
+    method: str  # ivfflat or hnsw
+    row_count: int
+    lists: Optional[int] = None
+    m: Optional[int] = None
+    ef_construction: Optional[int] = None
+
+    def with_clause(self) -> str:
+        """WITH (...) storage parameters for CREATE INDEX."""
+        if self.method == "hnsw":
+            return f"WITH (m = {self.m}, ef_construction = {self.ef_construction})"
+        return f"WITH (lists = {self.lists})"
+
+    def create_sql(
+        self,
+        index_name: str = INDEX_NAME,
+        concurrently: bool = True,
+        domain: Optional[str] = None
+    ) -> str:
+        """CREATE INDEX statement for this plan, partial if a domain is given."""
+        sql = (
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}{index_name} "
+            f"ON legal_chunks USING {self.method} (embedding vector_cosine_ops) "
+            f"{self.with_clause()}"
+        )
+        if domain is not None:
+            sql += " WHERE domain = '" + domain.replace("'", "''") + "'"
+        return sql
+
+
+def domain_index_name(domain: str) -> str:
+    """Partial index name for a domain; the hash keeps names unique and short."""
+    slug = re.sub(r"[^a-z0-9]+", "_", domain.lower()).strip("_")[:24]
+    digest = hashlib.md5(domain.encode("utf-8")).hexdigest()[:8]
+    return f"{DOMAIN_INDEX_PREFIX}{slug}_{digest}"
+
+
+def vector_literal(values) -> str:
+    """
+    pgvector text literal with 9 significant digits per value (enough to
+    round-trip float32), a little over half the size of a JSON float list.
+    """
+    return "[" + ",".join(f"{float(value):.9g}" for value in values) + "]"
+
+
+def metadata_json(metadata) -> str:
+    """
+    JSON text of a chunk's metadata, stored as a jsonb object by both
+    ingestion paths (missing metadata becomes {}, dates become strings).
+    """
+    return json.dumps(metadata or {}, default=str)
+
+
+def ivfflat_lists(row_count: int) -> int:
+    """pgvector's guidance: rows / 1000 up to 1M rows, sqrt(rows) beyond."""
+    if row_count <= 1_000_000:
+        return max(row_count // 1000, 10)
+    return int(math.sqrt(row_count))
+
+
+def plan_index(row_count: int, method: str = "auto") -> IndexPlan:
+    """
+    Choose an index for the corpus.
+
+    Args:
+        row_count: Number of rows in legal_chunks
+        method: "ivfflat", "hnsw" or "auto" (by row count)
+
+    Returns:
+        The index plan
+    """
+    if method == "auto":
+        method = "hnsw" if row_count >= HNSW_MIN_ROWS else "ivfflat"
+
+    if method == "hnsw":
+        if row_count >= 1_000_000:
+            return IndexPlan("hnsw", row_count, m=24, ef_construction=128)
+        return IndexPlan("hnsw", row_count, m=16, ef_construction=64)
+
+    if method == "ivfflat":
+        return IndexPlan("ivfflat", row_count, lists=ivfflat_lists(row_count))
+
+    raise ValueError(f"Unknown index method: {method}")
+
+
+def search_params(accuracy: str, lists: int) -> Dict[str, int]:
+    """
+    Search-time settings for match_legal_chunks.
+
+    Args:
+        accuracy: "fast", "balanced" or "accurate"
+        lists: ivfflat list count of the current index
+
+    Returns:
+        ivfflat_probes and hnsw_ef_search RPC parameters
+    """
+    if accuracy not in ACCURACY_LEVELS:
+        raise ValueError(f"Unknown search accuracy: {accuracy}")
+
+    level = ACCURACY_LEVELS[accuracy]
+
+    return {
+        "ivfflat_probes": max(1, math.ceil(lists * level["probe_fraction"])),
+        "hnsw_ef_search": level["ef_search"]
+    }
@@ -3,14 +3,22 @@ Embedding Functions
 Uses local SentenceTransformer for embeddings (unified with ingestion).
 """
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import asyncio
+
+import numpy as np
+
+from app.config import settings
 from app.rag.embedder import DocumentEmbedder
+from app.utils.cache import TTLCache
 from app.utils.logger import logger
 
 # Global instance to load model once into memory
 _global_embedder: Optional[DocumentEmbedder] = None
 
+# Query embeddings keyed by (model name, normalized text), stored as float32
+_query_cache = TTLCache(max_size=settings.embedding_cache_size)
+
 def get_embedder_instance() -> DocumentEmbedder:
     """Singleton pattern for the embedder model."""
     global _global_embedder
@@ -19,14 +27,42 @@ def get_embedder_instance() -> DocumentEmbedder:
         _global_embedder = DocumentEmbedder()
     return _global_embedder
 
+
+def _normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially different queries share a cache entry."""
+    return " ".join(text.split())
+
+
+def _cache_key(embedder: DocumentEmbedder, text: str) -> Tuple[str, str]:
+    return embedder.model_name, text
+
+
+def get_embedding_cache_stats() -> Dict[str, Any]:
+    """Hit, miss and eviction counters of the query embedding cache."""
+    return _query_cache.stats()
+
+
+def clear_embedding_cache():
+    """Drop all cached query embeddings, e.g. after switching models."""
+    _query_cache.clear()
+    logger.info("Query embedding cache cleared")
+
+
 async def get_embedding(text: str) -> List[float]:
     """
     Get embedding vector for text using local model.
+    Repeated queries are served from an LRU cache.
     """
     if not text or not text.strip():
         raise ValueError("Text cannot be empty")
     
     embedder = get_embedder_instance()
+    text = _normalize_text(text)
+    key = _cache_key(embedder, text)
+    
+    cached = _query_cache.get(key)
+    if cached is not None:
+        return cached.tolist()
     
     # Reuse the logic in DocumentEmbedder, but for a single string.
     # To keep it efficient, we wrap it in a pseudo-document structure 
@@ -46,6 +82,9 @@ async def get_embedding(text: str) -> List[float]:
         )
     )
     
+    embedding = np.asarray(embedding, dtype=np.float32)
+    _query_cache.set(key, embedding)
+    
     return embedding.tolist()
 
 
@@ -81,9 +120,19 @@ def get_embedding_sync(text: str) -> List[float]:
         raise ValueError("Text cannot be empty")
         
     embedder = get_embedder_instance()
+    text = _normalize_text(text)
+    key = _cache_key(embedder, text)
+    
+    cached = _query_cache.get(key)
+    if cached is not None:
+        return cached.tolist()
+    
     embedding = embedder.model.encode(
         text,
         convert_to_numpy=True,
         normalize_embeddings=True
     )
+    embedding = np.asarray(embedding, dtype=np.float32)
+    _query_cache.set(key, embedding)
+    
     return embedding.tolist()
\ No newline at end of file
@@ -10,7 +10,12 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.api import auth, chat, health, sessions
 from app.utils.logger import setup_logger, logger
-from app.db.supabase import init_supabase
+from app.db.supabase import init_supabase, close_supabase
+from app.db.pagination import NEXT_CURSOR_HEADER
+from app.memory.write_behind import start_write_behind, stop_write_behind
+from app.rag.bm25 import get_bm25_index
+from app.rag.local_index import start_local_index, stop_local_index
+from app.rag.reranker import start_reranker, stop_reranker
 
 
 @asynccontextmanager
@@ -23,12 +28,21 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting {settings.app_name} v{settings.api_version}")
     setup_logger()
     init_supabase()
+    await start_write_behind()
+    await start_local_index()
+    # Load the degraded-mode keyword index now rather than during an outage
+    get_bm25_index()
+    await start_reranker()
     logger.info("Application startup complete")
     
     yield
     
     # Shutdown
     logger.info("Application shutting down")
+    stop_reranker()
+    await stop_local_index()
+    await stop_write_behind()
+    await close_supabase()
 
 
 def create_app() -> FastAPI:
@@ -53,6 +67,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
     
     # Include routers
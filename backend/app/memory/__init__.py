@@ -7,6 +7,7 @@ from app.memory.short_term import ConversationMemory
 from app.memory.long_term import (
     save_message,
     get_session_messages,
+    get_context_history,
     get_session_summary,
     update_session_summary
 )
@@ -15,6 +16,7 @@ __all__ = [
     "ConversationMemory",
     "save_message",
     "get_session_messages",
+    "get_context_history",
     "get_session_summary",
     "update_session_summary"
 ]
\ No newline at end of file
@@ -5,14 +5,19 @@ Persistent storage of conversation history in Supabase.
 
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import asyncio
 import uuid
-import time
 
-from app.db.supabase import get_supabase_client, get_service_client
+from app.db.pagination import decode_cursor
+from app.db.repository import SessionRepository, MessageRepository
 from app.utils.logger import logger
 
 
-def save_message(
+_sessions = SessionRepository()
+_messages = MessageRepository()
+
+
+async def save_message(
     session_id: str,
     role: str,
     content: str,
@@ -20,21 +25,19 @@ def save_message(
 ) -> str:
     """
     Save a message to the database.
-    
+
     Args:
         session_id: Chat session ID
         role: Message role (user/assistant)
         content: Message content
         metadata: Optional metadata
-        
+
     Returns:
         Message ID
     """
     try:
-        client = get_service_client()
-        
         message_id = str(uuid.uuid4())
-        
+
         record = {
             "id": message_id,
             "session_id": session_id,
@@ -43,154 +46,227 @@ def save_message(
             "metadata": metadata or {},
             "created_at": datetime.utcnow().isoformat()
         }
-        
-        client.table("chat_messages").insert(record).execute()
-        
+
+        await _messages.insert(record)
+
         logger.debug(f"Saved message {message_id} to session {session_id}")
-        
+
         return message_id
-        
+
     except Exception as e:
         logger.error(f"Save message error: {str(e)}")
         raise
 
 
-def get_session_messages(
+def build_message(
+    role: str,
+    content: str,
+    metadata: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Build a message record with a client-generated ID and timestamp.
+    Used for batched writes, where the ID makes retries idempotent.
+    """
+    return {
+        "id": str(uuid.uuid4()),
+        "role": role,
+        "content": content,
+        "metadata": metadata or {},
+        "created_at": datetime.utcnow().isoformat()
+    }
+
+
+async def save_chat_turn(
+    session_id: str,
+    messages: List[Dict[str, Any]]
+) -> int:
+    """
+    Save all messages of a chat turn and touch the session in one call.
+
+    Args:
+        session_id: Chat session ID
+        messages: Records built with build_message, in order
+
+    Returns:
+        Number of messages inserted
+    """
+    try:
+        result = await _sessions.persist_turn(session_id, messages)
+
+        logger.debug(f"Saved {len(messages)} messages to session {session_id}")
+
+        return result.get("inserted", 0)
+
+    except Exception as e:
+        logger.error(f"Save chat turn error: {str(e)}")
+        raise
+
+
+async def get_session_messages(
     session_id: str,
     limit: int = 50,
-    offset: int = 0
+    offset: int = 0,
+    cursor: Optional[str] = None,
+    since: Optional[str] = None
 ) -> List[Dict[str, Any]]:
     """
     Get messages for a session.
-    
+
     Args:
         session_id: Chat session ID
         limit: Maximum messages to return
-        offset: Offset for pagination
-        
+        offset: Offset for pagination (ignored when cursor is given)
+        cursor: Opaque cursor of the last message already seen
+        since: Only return messages created after this timestamp
+
     Returns:
         List of messages
+
+    Raises:
+        ValueError: If the cursor is malformed
     """
+    after = decode_cursor(cursor) if cursor else None
+
     max_retries = 3
     for attempt in range(max_retries):
         try:
-            client = get_service_client()
-            
-            result = client.table("chat_messages").select(
-                "id, role, content, metadata, created_at"
-            ).eq(
-                "session_id", session_id
-            ).order(
-                "created_at", desc=False
-            ).range(offset, offset + limit - 1).execute()
-            
-            return result.data or []
-            
+            return await _messages.list_for_session(
+                session_id,
+                limit=limit,
+                offset=offset,
+                after=after,
+                since=since
+            )
+
         except Exception as e:
             if attempt < max_retries - 1:
                 logger.warning(f"Get messages attempt {attempt + 1} failed: {str(e)}")
-                time.sleep(0.5)
+                await asyncio.sleep(0.5)
             else:
                 logger.error(f"Get messages final error: {str(e)}")
                 return []
     return []
 
 
-def get_session_summary(session_id: str) -> Optional[str]:
+async def get_context_history(
+    session_id: str,
+    limit: int = 10
+) -> List[Dict[str, Any]]:
+    """
+    Get the agent context for a session: the newest messages in
+    chronological order, preceded by the stored summary if there is one.
+
+    Args:
+        session_id: Chat session ID
+        limit: Number of most recent messages to include
+
+    Returns:
+        List of messages
+    """
+    try:
+        window = await _sessions.get_context_window(session_id, limit=limit)
+    except Exception as e:
+        logger.error(f"Get context window error: {str(e)}")
+        return []
+
+    if not window:
+        return []
+
+    return with_summary(window.get("messages") or [], window.get("summary"))
+
+
+def with_summary(
+    messages: List[Dict[str, Any]],
+    summary: Optional[str]
+) -> List[Dict[str, Any]]:
+    """Prepend the session summary to messages as a system message."""
+    if not summary:
+        return messages
+
+    return [{
+        "role": "system",
+        "content": f"Previous conversation summary: {summary}",
+        "created_at": datetime.utcnow().isoformat()
+    }] + messages
+
+
+async def get_session_summary(session_id: str) -> Optional[str]:
     """
     Get the summary for a session.
-    
+
     Args:
         session_id: Chat session ID
-        
+
     Returns:
         Session summary or None
     """
     try:
-        client = get_service_client()
-        
-        result = client.table("chat_sessions").select(
-            "summary"
-        ).eq("id", session_id).single().execute()
-        
-        if result.data:
-            return result.data.get("summary")
+        session = await _sessions.get(session_id, columns="summary")
+
+        if session:
+            return session.get("summary")
         return None
-        
+
     except Exception as e:
         logger.error(f"Get summary error: {str(e)}")
         return None
 
 
-def update_session_summary(session_id: str, summary: str) -> bool:
+async def update_session_summary(session_id: str, summary: str) -> bool:
     """
     Update the summary for a session.
-    
+
     Args:
         session_id: Chat session ID
         summary: New summary text
-        
+
     Returns:
         Success status
     """
     try:
-        client = get_service_client()
-        
-        client.table("chat_sessions").update({
+        await _sessions.update(session_id, {
             "summary": summary,
             "updated_at": datetime.utcnow().isoformat()
-        }).eq("id", session_id).execute()
-        
+        })
+
         return True
-        
+
     except Exception as e:
         logger.error(f"Update summary error: {str(e)}")
         return False
 
 
-def delete_session_messages(session_id: str) -> int:
+async def delete_session_messages(session_id: str) -> int:
     """
     Delete all messages for a session.
-    
+
     Args:
         session_id: Chat session ID
-        
+
     Returns:
         Number of deleted messages
     """
     try:
-        client = get_service_client()
-        
-        result = client.table("chat_messages").delete().eq(
-            "session_id", session_id
-        ).execute()
-        
-        return len(result.data) if result.data else 0
-        
+        return await _messages.delete_for_session(session_id)
+
     except Exception as e:
         logger.error(f"Delete messages error: {str(e)}")
         return 0
 
 
-def get_message_count(session_id: str) -> int:
+async def get_message_count(session_id: str) -> int:
     """
     Get the number of messages in a session.
-    
+
     Args:
         session_id: Chat session ID
-        
+
     Returns:
         Message count
     """
     try:
-        client = get_service_client()
-        
-        result = client.table("chat_messages").select(
-            "id, count='exact'"
-        ).eq("session_id", session_id).execute()
-        
-        return result.count or 0
-        
+        return await _messages.count(session_id)
+
     except Exception as e:
         logger.error(f"Get message count error: {str(e)}")
-        return 0
\ No newline at end of file
+        return 0
@@ -0,0 +1,463 @@
+"""
+Write-behind Message Persistence
+Lets the chat endpoint return before its messages reach Supabase.
+
+Turns are appended to a local spool file (fsync'd) before being queued,
+and a background task batch-flushes them to chat_messages. On startup the
+spool is replayed, so unflushed turns survive crashes and Supabase outages.
+Message IDs are client-generated, which makes replays idempotent.
+
+Every worker process owns its own spool file next to the configured path
+and holds an fcntl lock on it while running. On startup a worker also
+claims spools whose owner is gone. Outages (transport errors, timeouts,
+5xx) are retried with backoff for as long as they last. A turn the
+database rejects for its data is retried on its own, and after
+max_attempts rejections it is moved to a dead-letter file in the same
+line format, so it can be replayed by hand once the cause is fixed.
+"""
+
+from typing import List, Dict, Any, Optional, TextIO
+import asyncio
+import glob
+import json
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from postgrest.exceptions import APIError
+
+from app.config import settings
+from app.db.repository import MessageRepository
+from app.utils.logger import logger
+
+
+# SQLSTATE classes a retry cannot fix: data exceptions and integrity
+# constraint violations. Every other failure is treated as an outage.
+REJECTED_DATA_SQLSTATES = ("22", "23")
+
+
+def _is_rejected_data(error: Exception) -> bool:
+    """Whether the database refused the batch because of its contents."""
+    if not isinstance(error, APIError):
+        return False
+    return str(error.code or "")[:2] in REJECTED_DATA_SQLSTATES
+
+
+class WriteBehindQueue:
+    """
+    Durable queue of chat turns waiting to be written to the database.
+    """
+
+    def __init__(
+        self,
+        spool_path: str,
+        flush_interval: float = 1.0,
+        batch_size: int = 100,
+        max_attempts: int = 10,
+        worker_id: Optional[str] = None
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            spool_path: Base path of the spool files shared by all workers
+            flush_interval: Seconds between background flushes
+            batch_size: Maximum messages written per database call
+            max_attempts: Rejections of a turn's data before it is dead-lettered
+            worker_id: Suffix of this worker's spool file (defaults to the pid)
+        """
+        self.base_path = spool_path
+        self.spool_path = f"{spool_path}.worker-{worker_id or os.getpid()}"
+        self.dead_letter_path = f"{spool_path}.dead"
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+
+        self._repository = MessageRepository()
+        self._turns: List[Dict[str, Any]] = []
+        self._spool_lock = asyncio.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._owner_lock: Optional[TextIO] = None
+        self._consecutive_failures = 0
+        # Head turns still to be written one at a time after a rejected batch
+        self._isolate_turns = 0
+
+        # Metrics
+        self.enqueued_total = 0
+        self.flushed_total = 0
+        self.flush_failures = 0
+        self.dead_lettered_total = 0
+        self.last_flush_lag_ms = 0.0
+        self.max_flush_lag_ms = 0.0
+        self.last_flush_at: Optional[float] = None
+
+    async def start(self):
+        """Claim orphaned spools, replay them and start the background flusher."""
+        directory = os.path.dirname(self.spool_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._owner_lock = await asyncio.to_thread(self._lock_file, self.spool_path, True)
+        self._turns = await asyncio.to_thread(self._read_spool)
+        claimed = await asyncio.to_thread(self._claim_orphans)
+        if claimed:
+            self._turns.extend(claimed)
+        if self._turns:
+            logger.info(f"Replaying {len(self._turns)} unflushed chat turns from spool")
+
+        self._running = True
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Write-behind message queue started (spool: {self.spool_path})")
+
+    async def enqueue(self, session_id: str, messages: List[Dict[str, Any]]):
+        """
+        Durably queue a chat turn for persistence.
+
+        Args:
+            session_id: Chat session ID
+            messages: Records built with long_term.build_message, in order
+        """
+        turn = {
+            "session_id": session_id,
+            "messages": [{**message, "session_id": session_id} for message in messages],
+            "enqueued_at": time.time()
+        }
+
+        async with self._spool_lock:
+            await asyncio.to_thread(self._append_spool, turn)
+            self._turns.append(turn)
+
+        self.enqueued_total += len(messages)
+
+        # While writes are failing, leave the flusher to its backoff
+        if self.pending_count() >= self.batch_size and not self._consecutive_failures:
+            self._wakeup.set()
+
+    def pending_for(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Messages of a session that have not been flushed yet.
+        Only this worker's queue is visible; turns queued on other workers
+        show up once they reach the database.
+        """
+        return [
+            message
+            for turn in self._turns
+            if turn["session_id"] == session_id
+            for message in turn["messages"]
+        ]
+
+    def pending_count(self) -> int:
+        """Number of messages waiting to be flushed."""
+        return sum(len(turn["messages"]) for turn in self._turns)
+
+    async def flush(self) -> int:
+        """
+        Write queued turns to the database, oldest first.
+        Turns stay queued (and spooled) if the write fails. A batch rejected
+        for its data is narrowed down by writing its turns one at a time.
+
+        Returns:
+            Number of messages flushed
+        """
+        async with self._flush_lock:
+            flushed = 0
+
+            while self._turns:
+                batch = self._take_batch()
+                messages = [
+                    message
+                    for turn in batch
+                    for message in turn["messages"]
+                ]
+
+                try:
+                    await self._repository.persist_batch(messages)
+                except Exception as e:
+                    self.flush_failures += 1
+                    self._consecutive_failures += 1
+                    logger.warning(
+                        f"Write-behind flush failed, {self.pending_count()} messages "
+                        f"kept in spool: {str(e)}"
+                    )
+
+                    if not _is_rejected_data(e):
+                        break
+
+                    if len(batch) > 1:
+                        self._isolate_turns = len(batch)
+                        continue
+
+                    if await self._record_rejection(batch[0], e):
+                        continue
+                    break
+
+                self._consecutive_failures = 0
+                self._isolate_turns = max(self._isolate_turns - len(batch), 0)
+
+                now = time.time()
+                lag_ms = (now - batch[0]["enqueued_at"]) * 1000
+                self.last_flush_lag_ms = lag_ms
+                self.max_flush_lag_ms = max(self.max_flush_lag_ms, lag_ms)
+                self.last_flush_at = now
+                self.flushed_total += len(messages)
+                flushed += len(messages)
+
+                async with self._spool_lock:
+                    del self._turns[:len(batch)]
+                    await asyncio.to_thread(self._rewrite_spool, list(self._turns))
+
+            return flushed
+
+    async def drain(self):
+        """Stop the background flusher and flush everything still queued."""
+        self._running = False
+        self._wakeup.set()
+
+        if self._task:
+            await self._task
+            self._task = None
+
+        await self.flush()
+
+        remaining = self.pending_count()
+        if remaining:
+            logger.warning(f"Write-behind drain left {remaining} messages in spool for next start")
+        else:
+            await asyncio.to_thread(self._remove_spool)
+            logger.info("Write-behind message queue drained")
+
+        if self._owner_lock is not None:
+            self._owner_lock.close()
+            self._owner_lock = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue and flush-lag metrics."""
+        oldest_age_ms = 0.0
+        if self._turns:
+            oldest_age_ms = (time.time() - self._turns[0]["enqueued_at"]) * 1000
+
+        return {
+            "pending_messages": self.pending_count(),
+            "pending_turns": len(self._turns),
+            "enqueued_total": self.enqueued_total,
+            "flushed_total": self.flushed_total,
+            "flush_failures": self.flush_failures,
+            "dead_lettered_total": self.dead_lettered_total,
+            "oldest_pending_age_ms": round(oldest_age_ms, 1),
+            "last_flush_lag_ms": round(self.last_flush_lag_ms, 1),
+            "max_flush_lag_ms": round(self.max_flush_lag_ms, 1),
+            "last_flush_at": self.last_flush_at
+        }
+
+    async def _run(self):
+        """Background loop: flush every interval or when a batch fills up."""
+        while self._running:
+            # Back off while the database keeps rejecting writes
+            timeout = min(self.flush_interval * 2 ** self._consecutive_failures, 60.0)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            if not self._running:
+                break
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Write-behind loop error: {str(e)}")
+
+    async def _record_rejection(self, turn: Dict[str, Any], error: Exception) -> bool:
+        """
+        Count a rejection of a turn written on its own, and dead-letter the
+        turn once it reaches max_attempts so it stops blocking the queue.
+
+        Returns:
+            True if the turn was dead-lettered
+        """
+        turn["attempts"] = turn.get("attempts", 0) + 1
+        if turn["attempts"] < self.max_attempts:
+            return False
+
+        async with self._spool_lock:
+            await asyncio.to_thread(self._append_dead_letters, [turn], str(error))
+            self._turns = [queued for queued in self._turns if queued is not turn]
+            await asyncio.to_thread(self._rewrite_spool, list(self._turns))
+
+        self._isolate_turns = max(self._isolate_turns - 1, 0)
+        self.dead_lettered_total += len(turn["messages"])
+        logger.error(
+            f"Moved {len(turn['messages'])} messages to {self.dead_letter_path} "
+            f"after {self.max_attempts} rejected writes"
+        )
+        return True
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        """Oldest turns totalling at most batch_size messages (at least one turn)."""
+        if self._isolate_turns:
+            return self._turns[:1]
+
+        batch = []
+        count = 0
+        for turn in self._turns:
+            if batch and count + len(turn["messages"]) > self.batch_size:
+                break
+            batch.append(turn)
+            count += len(turn["messages"])
+        return batch
+
+    def _append_spool(self, turn: Dict[str, Any]):
+        with open(self.spool_path, "a", encoding="utf-8") as spool:
+            spool.write(json.dumps(turn) + "\n")
+            spool.flush()
+            os.fsync(spool.fileno())
+
+    def _rewrite_spool(self, turns: List[Dict[str, Any]]):
+        tmp_path = f"{self.spool_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as spool:
+            for turn in turns:
+                spool.write(json.dumps(turn) + "\n")
+            spool.flush()
+            os.fsync(spool.fileno())
+        os.replace(tmp_path, self.spool_path)
+
+    def _append_dead_letters(self, turns: List[Dict[str, Any]], error: str):
+        # Shared by all workers, so appends are serialized with a lock
+        lock = self._lock_file(self.dead_letter_path, True)
+        try:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as dead:
+                for turn in turns:
+                    dead.write(json.dumps({**turn, "error": error}) + "\n")
+                dead.flush()
+                os.fsync(dead.fileno())
+        finally:
+            lock.close()
+
+    def _remove_spool(self):
+        for path in (self.spool_path, f"{self.spool_path}.lock"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def _lock_file(path: str, blocking: bool) -> Optional[TextIO]:
+        """
+        Take an exclusive lock on path's companion .lock file.
+        A separate file is locked because _rewrite_spool replaces the spool inode.
+
+        Returns:
+            The open lock file (closing it releases the lock),
+            or None if blocking is False and another process holds it
+        """
+        handle = open(f"{path}.lock", "a")
+        if fcntl is None:
+            return handle
+
+        flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+        try:
+            fcntl.flock(handle, flags)
+        except BlockingIOError:
+            handle.close()
+            return None
+        return handle
+
+    def _claim_orphans(self) -> List[Dict[str, Any]]:
+        """
+        Move turns from spools whose worker has exited into this worker's spool.
+        A spool is orphaned when nobody holds its lock. The pre-worker-spool
+        file at the base path is claimed the same way.
+
+        Without fcntl (Windows) every other spool is treated as orphaned,
+        which is only safe with a single worker.
+        """
+        candidates = [self.base_path] + glob.glob(f"{glob.escape(self.base_path)}.worker-*")
+        claimed = []
+
+        for path in candidates:
+            if path == self.spool_path or path.endswith((".tmp", ".lock")):
+                continue
+            if not os.path.exists(path):
+                continue
+
+            lock = self._lock_file(path, False)
+            if lock is None:
+                continue
+
+            try:
+                # Another worker may have claimed it while we waited
+                if os.fstat(lock.fileno()).st_nlink == 0 or not os.path.exists(path):
+                    continue
+
+                turns = self._read_spool(path)
+                for turn in turns:
+                    self._append_spool(turn)
+                os.remove(path)
+                os.remove(f"{path}.lock")
+                claimed.extend(turns)
+            finally:
+                lock.close()
+
+        if claimed:
+            logger.info(f"Claimed {len(claimed)} chat turns from orphaned spools")
+        return claimed
+
+    def _read_spool(self, path: Optional[str] = None) -> List[Dict[str, Any]]:
+        path = path or self.spool_path
+        if not os.path.exists(path):
+            return []
+
+        turns = []
+        with open(path, "r", encoding="utf-8") as spool:
+            for line in spool:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    turns.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write
+                    logger.warning("Skipping corrupt line in message spool")
+        return turns
+
+
+_write_behind: Optional[WriteBehindQueue] = None
+
+
+def get_write_behind() -> Optional[WriteBehindQueue]:
+    """Get the write-behind queue, or None when write-behind mode is disabled."""
+    return _write_behind
+
+
+async def start_write_behind() -> Optional[WriteBehindQueue]:
+    """Create and start the write-behind queue if enabled in settings."""
+    global _write_behind
+
+    if not settings.write_behind_enabled:
+        return None
+
+    _write_behind = WriteBehindQueue(
+        spool_path=settings.write_behind_spool_path,
+        flush_interval=settings.write_behind_flush_interval,
+        batch_size=settings.write_behind_batch_size,
+        max_attempts=settings.write_behind_max_attempts
+    )
+    await _write_behind.start()
+    return _write_behind
+
+
+async def stop_write_behind():
+    """Drain the write-behind queue during shutdown."""
+    global _write_behind
+
+    if _write_behind is not None:
+        await _write_behind.drain()
+        _write_behind = None
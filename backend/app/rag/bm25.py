@@ -0,0 +1,356 @@
+"""
+Local BM25 Index
+In-process keyword index over chunk content, usable without a database.
+
+Postings are stored in compressed-sparse-row form: for term t, the
+documents containing it are doc_ids[offsets[t]:offsets[t + 1]] with
+matching counts in term_freqs, so a query touches only the postings of
+its own terms. The index is built from DocumentLoader -> TextChunker
+output or from an embedding snapshot, and saved as a single .npz file.
+VectorStore answers from it when both vector search and the full-text
+fallback are unavailable; LegalDocumentRetriever can also query it
+directly (mode "bm25") with no database at all.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+from collections import Counter
+import json
+import os
+import re
+import uuid
+
+import numpy as np
+
+from app.config import settings
+from app.utils.logger import logger
+
+
+FORMAT_VERSION = 1
+
+DOCUMENT_COLUMNS = ("id", "content", "act_name", "section", "chapter", "source_url", "domain", "metadata")
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Common English function words; legal terms such as "act" are kept
+STOPWORDS = frozenset("""
+a an and are as at be been but by can do does for from had has have how i if in
+into is it its me my no not of on or our so such than that the their them then
+there these they this to under was we were what when where which who whom why
+will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens with stopwords removed."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over an immutable set of chunks.
+    """
+
+    def __init__(
+        self,
+        vocabulary: Dict[str, int],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        term_freqs: np.ndarray,
+        doc_lengths: np.ndarray,
+        documents: Dict[str, List[Any]],
+        k1: float = 1.2,
+        b: float = 0.75
+    ):
+        """
+        Initialize from prebuilt postings (see build, load).
+
+        Args:
+            vocabulary: Term to term id
+            offsets: int64[terms + 1] postings offsets per term
+            doc_ids: int32 document index per posting
+            term_freqs: Term count per posting
+            doc_lengths: Tokens per document
+            documents: Column name to per-document values
+            k1: Term frequency saturation
+            b: Length normalization strength
+        """
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+        self.documents = documents
+        self.k1 = k1
+        self.b = b
+
+        rows = len(doc_lengths)
+        self.average_length = float(doc_lengths.mean()) if rows else 0.0
+
+        # Lucene's BM25 idf, which stays positive for very common terms
+        document_frequency = np.diff(offsets).astype(np.float32)
+        self.idf = np.log1p((rows - document_frequency + 0.5) / (document_frequency + 0.5))
+
+        self.domains: Dict[Optional[str], int] = {}
+        codes = [self.domains.setdefault(domain, len(self.domains)) for domain in documents["domain"]]
+        self.domain_codes = np.asarray(codes, dtype=np.int32)
+
+        self.queries = 0
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    @classmethod
+    def build(cls, chunks: Iterable[Dict[str, Any]], k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        """
+        Index chunk documents.
+
+        Args:
+            chunks: Chunks with content and act_name, section, chapter,
+                source_url, domain and metadata fields (TextChunker output
+                or legal_chunks rows)
+            k1: Term frequency saturation
+            b: Length normalization strength
+
+        Returns:
+            The built index
+        """
+        vocabulary: Dict[str, int] = {}
+        documents: Dict[str, List[Any]] = {column: [] for column in DOCUMENT_COLUMNS}
+        posting_terms: List[int] = []
+        posting_docs: List[int] = []
+        posting_freqs: List[int] = []
+        doc_lengths: List[int] = []
+
+        for index, chunk in enumerate(chunks):
+            content = chunk.get("content") or ""
+
+            # Act and section text is indexed with the body, as in content_tsv
+            heading = " ".join(
+                str(chunk[field]) for field in ("act_name", "section", "chapter") if chunk.get(field)
+            )
+            counts = Counter(tokenize(f"{heading} {content}"))
+
+            for term, count in counts.items():
+                posting_terms.append(vocabulary.setdefault(term, len(vocabulary)))
+                posting_docs.append(index)
+                posting_freqs.append(count)
+            doc_lengths.append(sum(counts.values()))
+
+            documents["id"].append(str(chunk.get("id") or _chunk_id(chunk)))
+            documents["content"].append(content)
+            documents["metadata"].append(_metadata_text(chunk))
+            for column in ("act_name", "section", "chapter", "source_url", "domain"):
+                value = chunk.get(column)
+                documents[column].append(str(value) if value is not None else None)
+
+        terms = np.asarray(posting_terms, dtype=np.int64)
+        order = np.argsort(terms, kind="stable")
+
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(terms, minlength=len(vocabulary)))
+
+        return cls(
+            vocabulary,
+            offsets,
+            np.asarray(posting_docs, dtype=np.int32)[order],
+            np.minimum(np.asarray(posting_freqs, dtype=np.int64), np.iinfo(np.uint16).max).astype(np.uint16)[order],
+            np.asarray(doc_lengths, dtype=np.float32),
+            documents,
+            k1=k1,
+            b=b
+        )
+
+    @classmethod
+    def from_snapshot(cls, path: str, k1: float = 1.2, b: float = 0.75) -> "BM25Index":
+        """
+        Index the chunks stored in an embedding snapshot.
+
+        Raises:
+            SnapshotError: If the file is not a readable snapshot
+        """
+        from app.rag.snapshot import Snapshot
+
+        snapshot = Snapshot(path)
+        columns = snapshot.columns
+
+        def rows():
+            for index in range(snapshot.header["rows"]):
+                yield {
+                    "id": snapshot.ids[index],
+                    **{column: columns[column][index] for column in DOCUMENT_COLUMNS if column != "id"}
+                }
+
+        return cls.build(rows(), k1=k1, b=b)
+
+    def search(
+        self,
+        query: str,
+        k: int = 5,
+        filter_domain: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank chunks against a query.
+
+        Args:
+            query: Search query
+            k: Number of results to return
+            filter_domain: Optional domain filter
+
+        Returns:
+            Documents in the same shape as VectorStore.search. score is
+            bm25 / (bm25 + 1), the raw value is in bm25_score
+        """
+        self.queries += 1
+
+        term_ids = {self.vocabulary[term] for term in tokenize(query) if term in self.vocabulary}
+        if not term_ids or len(self) == 0:
+            return []
+
+        scores = np.zeros(len(self), dtype=np.float32)
+        length_norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / max(self.average_length, 1e-9))
+
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.doc_ids[start:end]
+            freqs = self.term_freqs[start:end].astype(np.float32)
+            # Each document appears once per term, so fancy-index add is safe
+            scores[docs] += self.idf[term_id] * freqs * (self.k1 + 1) / (freqs + length_norm[docs])
+
+        if filter_domain is not None:
+            code = self.domains.get(filter_domain)
+            if code is None:
+                return []
+            scores[self.domain_codes != code] = 0.0
+
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) == 0:
+            return []
+
+        k = min(k, len(matched))
+        top = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+
+        documents = []
+        for index in top:
+            raw = float(scores[index])
+            metadata = self.documents["metadata"][index]
+            documents.append({
+                "id": self.documents["id"][index],
+                "content": self.documents["content"][index],
+                "score": raw / (raw + 1.0),
+                "bm25_score": raw,
+                "act_name": self.documents["act_name"][index],
+                "section": self.documents["section"][index],
+                "chapter": self.documents["chapter"][index],
+                "source_url": self.documents["source_url"][index],
+                "domain": self.documents["domain"][index],
+                "metadata": json.loads(metadata) if metadata else {}
+            })
+
+        return documents
+
+    def save(self, path: str):
+        """Write the index to a .npz file (atomically, via a temporary file)."""
+        terms = [None] * len(self.vocabulary)
+        for term, term_id in self.vocabulary.items():
+            terms[term_id] = term
+
+        header = {
+            "format_version": FORMAT_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "terms": terms,
+            "documents": self.documents
+        }
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            header=np.frombuffer(json.dumps(header).encode("utf-8"), dtype=np.uint8),
+            offsets=self.offsets,
+            doc_ids=self.doc_ids,
+            term_freqs=self.term_freqs,
+            doc_lengths=self.doc_lengths
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """Read an index written by save."""
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(data["header"].tobytes().decode("utf-8"))
+            if header.get("format_version") != FORMAT_VERSION:
+                raise ValueError(f"Unsupported BM25 index format in {path}")
+
+            return cls(
+                {term: term_id for term_id, term in enumerate(header["terms"])},
+                data["offsets"],
+                data["doc_ids"],
+                data["term_freqs"],
+                data["doc_lengths"],
+                header["documents"],
+                k1=header["k1"],
+                b=header["b"]
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        """Size metrics."""
+        postings_bytes = (
+            self.offsets.nbytes + self.doc_ids.nbytes
+            + self.term_freqs.nbytes + self.doc_lengths.nbytes
+        )
+        return {
+            "chunks": len(self),
+            "terms": len(self.vocabulary),
+            "postings": len(self.doc_ids),
+            "postings_mb": round(postings_bytes / 1e6, 2),
+            "queries": self.queries
+        }
+
+
+def _chunk_id(chunk: Dict[str, Any]) -> str:
+    """Stable id for a chunk that has not been stored yet."""
+    key = "|".join(str(chunk.get(field) or "") for field in ("source", "act_name", "section", "chunk_index", "content"))
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, key))
+
+
+def _metadata_text(chunk: Dict[str, Any]) -> str:
+    metadata = chunk.get("metadata")
+    if metadata is None:
+        # TextChunker spreads metadata into the chunk itself
+        metadata = {
+            key: value for key, value in chunk.items()
+            if key not in DOCUMENT_COLUMNS and key != "embedding"
+        }
+    if isinstance(metadata, str):
+        return metadata
+    return json.dumps(metadata, default=str)
+
+
+_bm25_index: Optional[BM25Index] = None
+_bm25_loaded = False
+
+
+def get_bm25_index() -> Optional[BM25Index]:
+    """
+    Get the BM25 index at BM25_INDEX_PATH, loading it on first use.
+    Returns None if no index is configured or it cannot be read.
+    """
+    global _bm25_index, _bm25_loaded
+
+    if not _bm25_loaded:
+        _bm25_loaded = True
+        path = settings.bm25_index_path
+
+        if path and os.path.exists(path):
+            try:
+                _bm25_index = BM25Index.load(path)
+                logger.info(f"Loaded BM25 index {path} ({len(_bm25_index)} chunks)")
+            except Exception as e:
+                logger.error(f"BM25 index load error: {str(e)}")
+
+    return _bm25_index
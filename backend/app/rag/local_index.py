@@ -0,0 +1,429 @@
+"""
+Local Vector Index
+In-process mirror of legal_chunks for retrieval without a database round trip.
+
+All embeddings live in one contiguous, L2-normalized float32 (or float16)
+matrix, with chunk metadata in parallel columns, so a query is a single
+matrix-vector product. The mirror refreshes incrementally by paging in
+rows past a (created_at, id) watermark; when the row count stops matching
+(deletes, or late-committing bulk loads) it reloads in full.
+The index can also start from a memory-mapped snapshot (see
+app/rag/snapshot.py), in which case it only pulls rows newer than the
+snapshot. VectorStore falls back to the match_legal_chunks RPC whenever
+the mirror is disabled, not yet loaded, or fails.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+
+from app.config import settings
+from app.db.repository import ChunkRepository
+from app.rag.snapshot import Snapshot, write_snapshot
+from app.utils.logger import logger
+
+
+METADATA_COLUMNS = ("content", "act_name", "section", "chapter", "source_url", "domain", "metadata")
+
+
+class _IndexState:
+    """Immutable snapshot of the mirror; replaced wholesale on refresh."""
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        ids: Sequence[str],
+        columns: Dict[str, Sequence[Any]],
+        domain_table: Optional[List[Optional[str]]] = None,
+        domain_codes: Optional[np.ndarray] = None
+    ):
+        self.embeddings = embeddings
+        self.ids = ids
+        self.columns = columns
+
+        # Integer domain codes make per-domain masks a single comparison
+        if domain_codes is not None:
+            self.domains = {domain: code for code, domain in enumerate(domain_table)}
+            self.domain_codes = domain_codes
+        else:
+            self.domains: Dict[Optional[str], int] = {}
+            codes = [self.domains.setdefault(domain, len(self.domains)) for domain in columns["domain"]]
+            self.domain_codes = np.asarray(codes, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row(self, index: int) -> Dict[str, Any]:
+        return {column: values[index] for column, values in self.columns.items()}
+
+
+class LocalVectorIndex:
+    """
+    Brute-force cosine search over an in-memory copy of legal_chunks.
+    """
+
+    def __init__(self, dtype: str = "float32", page_size: int = 1000):
+        """
+        Initialize an empty index.
+
+        Args:
+            dtype: Storage type of the embedding matrix ("float32" or "float16")
+            page_size: Rows fetched per request while loading
+        """
+        self.dtype = np.dtype(dtype)
+        self.page_size = page_size
+
+        self._repository = ChunkRepository()
+        self._state: Optional[_IndexState] = None
+        self.snapshot_path: Optional[str] = None
+        self._watermark: Optional[Tuple[str, str]] = None
+        self._refresh_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+        # Metrics
+        self.queries = 0
+        self.refreshes = 0
+        self.full_reloads = 0
+        self.last_refresh_ms = 0.0
+        self.last_refresh_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the index has been loaded."""
+        return self._state is not None
+
+    def __len__(self) -> int:
+        return len(self._state) if self._state else 0
+
+    @classmethod
+    def from_snapshot(cls, path: str, page_size: int = 1000) -> "LocalVectorIndex":
+        """
+        Open a snapshot without copying it into process memory.
+        The embedding matrix stays backed by the shared page cache
+        until a refresh adds rows.
+
+        Raises:
+            SnapshotError: If the file is not a readable snapshot
+        """
+        snapshot = Snapshot(path)
+
+        index = cls(dtype=snapshot.embeddings.dtype.name, page_size=page_size)
+        domain_column = snapshot.columns["domain"]
+        index._state = _IndexState(
+            snapshot.embeddings,
+            snapshot.ids,
+            snapshot.columns,
+            domain_table=domain_column.table,
+            domain_codes=domain_column.codes
+        )
+        index._watermark = snapshot.watermark
+        index.snapshot_path = path
+
+        logger.info(
+            f"Local vector index opened snapshot {path} "
+            f"({snapshot.header['rows']} chunks, created {snapshot.header['created_at']})"
+        )
+        return index
+
+    def export_snapshot(self, path: str) -> Dict[str, Any]:
+        """
+        Write the loaded index to a snapshot file.
+
+        Returns:
+            The snapshot header
+        """
+        state = self._state
+        if state is None:
+            raise RuntimeError("Local vector index is not loaded")
+
+        return write_snapshot(path, state.embeddings, state.ids, state.columns, self._watermark)
+
+    async def load(self) -> int:
+        """
+        Load every chunk from the database, replacing the current contents.
+
+        Returns:
+            Number of chunks loaded
+        """
+        async with self._refresh_lock:
+            start_time = time.perf_counter()
+
+            rows = await self._fetch_after(None)
+            # Parsing and normalizing is O(rows x dims); keep it off the event loop
+            self._state = await asyncio.to_thread(self._build_state, rows)
+            self._watermark = self._last_key(rows)
+            self.snapshot_path = None
+            self.full_reloads += 1
+
+            self._record_refresh(start_time)
+            logger.info(
+                f"Local vector index loaded {len(self._state)} chunks "
+                f"({self._state.embeddings.nbytes / 1e6:.1f} MB, {self.dtype.name})"
+            )
+            return len(self._state)
+
+    async def refresh(self) -> int:
+        """
+        Pull chunks added since the last load or refresh.
+        Falls back to a full reload if the row count no longer matches.
+
+        Returns:
+            Number of chunks added
+        """
+        if not self.ready:
+            return await self.load()
+
+        async with self._refresh_lock:
+            start_time = time.perf_counter()
+
+            rows = await self._fetch_after(self._watermark)
+            if rows:
+                self._state = await asyncio.to_thread(
+                    lambda: self._merge_states(self._state, self._build_state(rows))
+                )
+                self._watermark = self._last_key(rows)
+
+            # Rows without an embedding are never loaded, so they are not counted
+            expected = await self._repository.count(embedded_only=True)
+            self._record_refresh(start_time)
+
+        if expected != len(self._state):
+            logger.info(
+                f"Local vector index has {len(self._state)} chunks, database has "
+                f"{expected}; reloading"
+            )
+            await self.load()
+            return 0
+
+        if rows:
+            logger.info(f"Local vector index added {len(rows)} chunks")
+        return len(rows)
+
+    def search(
+        self,
+        query_embedding: List[float],
+        k: int = 5,
+        filter_domain: Optional[str] = None,
+        threshold: float = 0.5
+    ) -> List[Dict[str, Any]]:
+        """
+        Find the chunks most similar to a query embedding.
+
+        Args:
+            query_embedding: Query vector
+            k: Number of results to return
+            filter_domain: Optional domain filter
+            threshold: Minimum cosine similarity
+
+        Returns:
+            Documents in the same shape as VectorStore.similarity_search
+        """
+        state = self._state
+        if state is None:
+            raise RuntimeError("Local vector index is not loaded")
+
+        self.queries += 1
+
+        if len(state) == 0:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+
+        if filter_domain is not None:
+            code = state.domains.get(filter_domain)
+            if code is None:
+                return []
+            candidates = np.flatnonzero(state.domain_codes == code)
+            scores = state.embeddings[candidates] @ query.astype(self.dtype)
+        else:
+            candidates = None
+            scores = state.embeddings @ query.astype(self.dtype)
+
+        scores = scores.astype(np.float32)
+        if len(scores) == 0:
+            return []
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        documents = []
+        for position in top:
+            score = float(scores[position])
+            if score <= threshold:
+                break
+
+            index = int(candidates[position]) if candidates is not None else int(position)
+            row = state.row(index)
+            metadata = row.get("metadata")
+            documents.append({
+                "id": state.ids[index],
+                "content": row["content"],
+                "score": score,
+                "act_name": row.get("act_name"),
+                "section": row.get("section"),
+                "chapter": row.get("chapter"),
+                "source_url": row.get("source_url"),
+                "domain": row.get("domain"),
+                "metadata": json.loads(metadata) if isinstance(metadata, str) else (metadata or {})
+            })
+
+        return documents
+
+    async def start(self, refresh_interval: float):
+        """
+        Load the index (or top up an opened snapshot) and keep it fresh
+        in the background. If the initial load fails, the next refresh
+        retries it.
+        """
+        try:
+            await self.refresh()
+        except Exception as e:
+            # Retrieval keeps working through the RPC
+            logger.error(f"Local vector index load error: {str(e)}")
+
+        if refresh_interval > 0:
+            self._running = True
+            self._task = asyncio.create_task(self._run(refresh_interval))
+
+    async def stop(self):
+        """Stop background refreshes."""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Size and refresh metrics."""
+        state = self._state
+        return {
+            "ready": state is not None,
+            "chunks": len(state) if state else 0,
+            "domains": len(state.domains) if state else 0,
+            "dtype": self.dtype.name,
+            "snapshot": self.snapshot_path,
+            "matrix_mb": round(state.embeddings.nbytes / 1e6, 2) if state else 0.0,
+            "queries": self.queries,
+            "refreshes": self.refreshes,
+            "full_reloads": self.full_reloads,
+            "last_refresh_ms": round(self.last_refresh_ms, 1),
+            "last_refresh_at": self.last_refresh_at
+        }
+
+    async def _run(self, refresh_interval: float):
+        """Background loop: refresh every interval."""
+        while self._running:
+            await asyncio.sleep(refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Local vector index refresh error: {str(e)}")
+
+    async def _fetch_after(self, after: Optional[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """All rows after a keyset watermark."""
+        rows: List[Dict[str, Any]] = []
+        while True:
+            page = await self._repository.list_page(after=after, limit=self.page_size)
+            rows.extend(row for row in page if row.get("embedding") is not None)
+            if len(page) < self.page_size:
+                return rows
+            after = (page[-1]["created_at"], page[-1]["id"])
+
+    def _build_state(self, rows: List[Dict[str, Any]]) -> _IndexState:
+        if rows:
+            embeddings = np.asarray(
+                [_parse_embedding(row["embedding"]) for row in rows],
+                dtype=np.float32
+            )
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms > 0, norms, 1.0)
+        else:
+            embeddings = np.empty((0, 0), dtype=np.float32)
+
+        return _IndexState(
+            np.ascontiguousarray(embeddings, dtype=self.dtype),
+            [row["id"] for row in rows],
+            {column: [row.get(column) for row in rows] for column in METADATA_COLUMNS}
+        )
+
+    def _merge_states(self, current: _IndexState, added: _IndexState) -> _IndexState:
+        if len(current) == 0:
+            return added
+
+        return _IndexState(
+            np.concatenate([current.embeddings, added.embeddings.astype(current.embeddings.dtype)]),
+            list(current.ids) + list(added.ids),
+            {
+                column: list(current.columns[column]) + added.columns[column]
+                for column in METADATA_COLUMNS
+            }
+        )
+
+    def _last_key(self, rows: List[Dict[str, Any]]) -> Optional[Tuple[str, str]]:
+        if not rows:
+            return self._watermark
+        return rows[-1]["created_at"], rows[-1]["id"]
+
+    def _record_refresh(self, start_time: float):
+        self.refreshes += 1
+        self.last_refresh_ms = (time.perf_counter() - start_time) * 1000
+        self.last_refresh_at = time.time()
+
+
+def _parse_embedding(value: Any) -> List[float]:
+    """PostgREST returns vector columns as "[0.1,0.2,...]" strings."""
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
+
+_local_index: Optional[LocalVectorIndex] = None
+
+
+def get_local_index() -> Optional[LocalVectorIndex]:
+    """Get the local index if it is enabled and loaded, else None."""
+    if _local_index is not None and _local_index.ready:
+        return _local_index
+    return None
+
+
+async def start_local_index() -> Optional[LocalVectorIndex]:
+    """Create and load the local index if enabled in settings."""
+    global _local_index
+
+    if not settings.local_index_enabled:
+        return None
+
+    snapshot_path = settings.local_index_snapshot_path
+    if snapshot_path and os.path.exists(snapshot_path):
+        try:
+            _local_index = LocalVectorIndex.from_snapshot(snapshot_path)
+        except Exception as e:
+            logger.error(f"Snapshot open error, loading from database: {str(e)}")
+
+    if _local_index is None:
+        _local_index = LocalVectorIndex(dtype=settings.local_index_dtype)
+
+    await _local_index.start(settings.local_index_refresh_interval)
+    return _local_index
+
+
+async def stop_local_index():
+    """Stop background refreshes during shutdown."""
+    global _local_index
+
+    if _local_index is not None:
+        await _local_index.stop()
+        _local_index = None
@@ -0,0 +1,236 @@
+"""
+Cross-Encoder Reranker
+Reorders retrieved chunks by scoring (query, chunk) pairs jointly.
+
+Retrieval over-fetches RERANK_CANDIDATES chunks and the reranker scores
+all uncached pairs in one batched forward pass on its own single-thread
+executor, so reranking never competes with query embedding for the
+default pool. If scoring misses RERANK_TIMEOUT the candidates keep their
+retrieval order; the pass still finishes in the background and caches
+its scores for the next identical query. Scores are cached per
+(query, chunk id). Documents keep score (cosine similarity) for
+confidence estimation and gain rerank_score.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import asyncio
+import time
+
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.logger import logger
+
+
+class CrossEncoderReranker:
+    """
+    Batched CPU cross-encoder with a latency budget and score cache.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        batch_size: int = 32,
+        timeout: float = 1.0,
+        cache_size: int = 8192,
+        max_length: int = 512
+    ):
+        """
+        Initialize the reranker. The model loads on first use.
+
+        Args:
+            model_name: sentence-transformers CrossEncoder model
+            batch_size: Pairs per forward pass
+            timeout: Seconds to wait for scores before keeping retrieval order
+            cache_size: Maximum cached (query, chunk) scores
+            max_length: Token limit per pair
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self.max_length = max_length
+
+        self._model = None
+        self._cache = TTLCache(max_size=cache_size)
+        # One worker: passes are batched, so parallel passes only contend for cores
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+
+        # Metrics
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.pairs_scored = 0
+        self.last_latency_ms = 0.0
+
+    @property
+    def model(self):
+        """Lazy load the model."""
+        if self._model is None:
+            try:
+                from sentence_transformers import CrossEncoder
+                logger.info(f"Loading reranker model: {self.model_name}")
+                self._model = CrossEncoder(self.model_name, max_length=self.max_length)
+            except ImportError:
+                logger.error("sentence-transformers not installed. Please run: pip install sentence-transformers")
+                raise
+        return self._model
+
+    async def warm_up(self):
+        """Load the model on the reranker thread without blocking startup."""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, lambda: self.model)
+        except Exception as e:
+            logger.error(f"Reranker load error: {str(e)}")
+
+    async def rerank(
+        self,
+        query: str,
+        documents: List[Dict[str, Any]],
+        top_k: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Reorder documents by cross-encoder relevance.
+
+        Args:
+            query: Search query
+            documents: Retrieved candidates, best first
+            top_k: Number of documents to return (all if None)
+
+        Returns:
+            Reranked documents with rerank_score, or the first top_k
+            candidates in retrieval order if scoring failed or timed out
+        """
+        top_k = len(documents) if top_k is None else top_k
+        if len(documents) <= 1:
+            return documents[:top_k]
+
+        self.calls += 1
+        start_time = time.perf_counter()
+        normalized = " ".join(query.lower().split())
+
+        scores: Dict[int, float] = {}
+        pending: List[int] = []
+        for position, doc in enumerate(documents):
+            cached = self._cache.get((normalized, doc.get("id")))
+            if cached is not None:
+                scores[position] = cached
+            else:
+                pending.append(position)
+
+        if pending:
+            pairs = [(query, documents[position].get("content", "")) for position in pending]
+            keys = [(normalized, documents[position].get("id")) for position in pending]
+
+            loop = asyncio.get_running_loop()
+            job = loop.run_in_executor(self._executor, self._score, pairs, keys)
+            try:
+                computed = await asyncio.wait_for(asyncio.shield(job), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                # The pass completes in the background and fills the cache
+                self.timeouts += 1
+                logger.warning(f"Reranking {len(pairs)} pairs exceeded {self.timeout}s, keeping retrieval order")
+                job.add_done_callback(_consume_exception)
+                return documents[:top_k]
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Reranking error: {str(e)}")
+                return documents[:top_k]
+
+            scores.update(zip(pending, computed))
+
+        for position, doc in enumerate(documents):
+            doc["rerank_score"] = scores[position]
+
+        self.last_latency_ms = (time.perf_counter() - start_time) * 1000
+        return sorted(documents, key=lambda doc: doc["rerank_score"], reverse=True)[:top_k]
+
+    def stats(self) -> Dict[str, Any]:
+        """Latency, timeout and cache counters."""
+        return {
+            "model": self.model_name,
+            "loaded": self._model is not None,
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "pairs_scored": self.pairs_scored,
+            "last_latency_ms": round(self.last_latency_ms, 1),
+            "score_cache": self._cache.stats()
+        }
+
+    def shutdown(self):
+        """Stop the reranker thread."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _score(self, pairs: List[tuple], keys: List[tuple]) -> List[float]:
+        """One batched forward pass; runs on the reranker thread."""
+        scores = self.model.predict(
+            pairs,
+            batch_size=self.batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True
+        )
+        scores = [float(score) for score in scores]
+
+        for key, score in zip(keys, scores):
+            self._cache.set(key, score)
+        self.pairs_scored += len(pairs)
+        return scores
+
+
+def _consume_exception(future: asyncio.Future):
+    """Log failures of abandoned background passes."""
+    if not future.cancelled() and future.exception() is not None:
+        logger.error(f"Background reranking error: {str(future.exception())}")
+
+
+_reranker: Optional[CrossEncoderReranker] = None
+
+
+def get_reranker() -> Optional[CrossEncoderReranker]:
+    """Get the reranker if enabled in settings, else None."""
+    global _reranker
+
+    if not settings.rerank_enabled:
+        return None
+
+    if _reranker is None:
+        _reranker = CrossEncoderReranker(
+            model_name=settings.rerank_model,
+            batch_size=settings.rerank_batch_size,
+            timeout=settings.rerank_timeout,
+            cache_size=settings.rerank_cache_size
+        )
+
+    return _reranker
+
+
+def candidate_count(k: int) -> int:
+    """Number of chunks to retrieve so reranking can choose the best k."""
+    if not settings.rerank_enabled:
+        return k
+    return max(k, settings.rerank_candidates)
+
+
+async def rerank_documents(query: str, documents: List[Dict[str, Any]], k: int) -> List[Dict[str, Any]]:
+    """Rerank candidates if reranking is enabled, else keep the first k."""
+    reranker = get_reranker()
+    if reranker is None:
+        return documents[:k]
+    return await reranker.rerank(query, documents, top_k=k)
+
+
+async def start_reranker():
+    """Start loading the model in the background if reranking is enabled."""
+    reranker = get_reranker()
+    if reranker is not None:
+        asyncio.create_task(reranker.warm_up())
+
+
+def stop_reranker():
+    """Stop the reranker thread during shutdown."""
+    global _reranker
+
+    if _reranker is not None:
+        _reranker.shutdown()
+        _reranker = None
@@ -0,0 +1,136 @@
+"""
+Retrieval Result Cache
+Caches search results per (query, filters), invalidated by corpus version.
+
+Ingestion bumps a version counter in the corpus_state table. Each worker
+re-reads the counter at most every RETRIEVAL_CACHE_VERSION_CHECK_SECONDS
+and drops its cached results when it has moved, so results never outlive
+a corpus change by more than that interval (the writing worker drops
+them immediately).
+"""
+
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import asyncio
+import copy
+import time
+
+from app.config import settings
+from app.db.repository import ChunkRepository
+from app.utils.cache import TTLCache
+from app.utils.logger import logger
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query for cache keys."""
+    return " ".join(query.lower().split())
+
+
+class RetrievalCache:
+    """
+    LRU+TTL cache of retrieval results tied to a corpus version.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 2048,
+        ttl: float = 600.0,
+        version_check_seconds: float = 30.0
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum cached result lists
+            ttl: Seconds a result list is kept
+            version_check_seconds: Seconds between corpus version reads
+        """
+        self.version_check_seconds = version_check_seconds
+
+        self._cache = TTLCache(max_size=max_size, ttl=ttl)
+        self._repository = ChunkRepository()
+        self._version: Optional[int] = None
+        self._version_checked_at = 0.0
+        self._version_lock = asyncio.Lock()
+
+        self.invalidations = 0
+
+    @staticmethod
+    def key(namespace: str, query: str, *filters: Hashable) -> Tuple:
+        """Cache key for a query and its filters."""
+        return (namespace, normalize_query(query)) + filters
+
+    async def get(self, key: Tuple) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get cached results, or None on a miss.
+        Returns a copy, since callers post-process documents in place.
+        """
+        await self._check_version()
+
+        documents = self._cache.get(key)
+        return copy.deepcopy(documents) if documents is not None else None
+
+    async def set(self, key: Tuple, documents: List[Dict[str, Any]]):
+        """Cache results for a key."""
+        self._cache.set(key, copy.deepcopy(documents))
+
+    def invalidate(self, version: Optional[int] = None):
+        """
+        Drop all cached results.
+
+        Args:
+            version: New corpus version, if the caller just bumped it
+        """
+        self._cache.clear()
+        self.invalidations += 1
+        self._version = version
+        self._version_checked_at = time.monotonic() if version is not None else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Size, hit-rate and invalidation counters."""
+        return {
+            **self._cache.stats(),
+            "corpus_version": self._version,
+            "invalidations": self.invalidations
+        }
+
+    async def _check_version(self):
+        """Clear the cache if another writer moved the corpus version."""
+        if time.monotonic() - self._version_checked_at < self.version_check_seconds:
+            return
+
+        async with self._version_lock:
+            if time.monotonic() - self._version_checked_at < self.version_check_seconds:
+                return
+
+            try:
+                version = await self._repository.corpus_version()
+            except Exception as e:
+                # Keep serving; the TTL still bounds staleness
+                logger.warning(f"Corpus version check failed: {str(e)}")
+                self._version_checked_at = time.monotonic()
+                return
+
+            if self._version is not None and version != self._version:
+                logger.info(f"Corpus version {self._version} -> {version}, clearing retrieval cache")
+                self._cache.clear()
+                self.invalidations += 1
+
+            self._version = version
+            self._version_checked_at = time.monotonic()
+
+
+_retrieval_cache: Optional[RetrievalCache] = None
+
+
+def get_retrieval_cache() -> RetrievalCache:
+    """Get the process-wide retrieval cache."""
+    global _retrieval_cache
+
+    if _retrieval_cache is None:
+        _retrieval_cache = RetrievalCache(
+            max_size=settings.retrieval_cache_size,
+            ttl=settings.retrieval_cache_ttl,
+            version_check_seconds=settings.retrieval_cache_version_check_seconds
+        )
+
+    return _retrieval_cache
@@ -5,7 +5,11 @@ High-level retriever for legal documents.
 
 from typing import List, Dict, Any, Optional
 
+from app.config import settings
 from app.db.vector import VectorStore
+from app.rag.bm25 import BM25Index
+from app.rag.reranker import candidate_count, rerank_documents
+from app.rag.result_cache import get_retrieval_cache
 from app.utils.logger import logger
 
 
@@ -15,15 +19,24 @@ class LegalDocumentRetriever:
     Provides domain-aware retrieval with filtering.
     """
     
-    def __init__(self):
+    def __init__(self, bm25_index: Optional[BM25Index] = None):
+        """
+        Initialize the retriever.
+        
+        Args:
+            bm25_index: Local index to answer from without a database
+                (benchmarks, offline use); every query then uses it
+        """
         self.vector_store = VectorStore()
+        self.bm25_index = bm25_index
     
     async def retrieve(
         self,
         query: str,
         domain: Optional[str] = None,
         k: int = 5,
-        min_score: float = 0.5
+        min_score: float = 0.5,
+        mode: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant legal documents.
@@ -33,21 +46,44 @@ class LegalDocumentRetriever:
             domain: Optional domain filter
             k: Number of documents to retrieve
             min_score: Minimum similarity score
+            mode: "vector", "keyword", "hybrid" or "bm25" (defaults to settings)
             
         Returns:
             List of relevant documents
         """
+        if self.bm25_index is not None:
+            # No database: skip the version-checked result cache too
+            documents = self.bm25_index.search(query, candidate_count(k), domain)
+            documents = await rerank_documents(query, documents, k)
+            return self._post_process(documents)
+        
+        cache = get_retrieval_cache()
+        mode = mode or settings.retrieval_mode
+        cache_key = cache.key("retrieve", query, domain, k, min_score, mode)
+        
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            documents = await self.vector_store.similarity_search(
+            # Over-fetch when reranking so it can promote lower-ranked chunks
+            documents = await self.vector_store.search(
                 query=query,
-                k=k,
+                k=candidate_count(k),
                 filter_domain=domain,
-                threshold=min_score
+                threshold=min_score,
+                mode=mode
             )
+            documents = await rerank_documents(query, documents, k)
             
             # Post-process and rank
             documents = self._post_process(documents)
             
+            # Results left in retrieval order by a rerank timeout are not cached
+            reranked = all("rerank_score" in doc for doc in documents)
+            if reranked or len(documents) <= 1 or candidate_count(k) == k:
+                await cache.set(cache_key, documents)
+            
             logger.info(f"Retrieved {len(documents)} documents for: {query[:50]}...")
             
             return documents
@@ -99,6 +135,12 @@ class LegalDocumentRetriever:
         Returns:
             Act information or None
         """
+        # Exact key lookup first; search only if the act or section is unknown
+        if self.bm25_index is None:
+            found = await self.vector_store.lookup_sections([(act_name, section)])
+            if found:
+                return self._post_process(list(found.values()))[0]
+        
         query = act_name
         if section:
             query = f"{act_name} section {section}"
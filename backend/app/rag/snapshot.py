@@ -0,0 +1,254 @@
+"""
+Embedding Snapshot Format
+Single-file, memory-mappable export of legal_chunks for LocalVectorIndex.
+
+Layout (all sections 64-byte aligned, little-endian):
+    magic "LCSNAP" + 2-byte format version
+    uint32 header length, JSON header (counts, dtype, section offsets,
+        string tables, watermark)
+    embeddings        rows x dim matrix, L2-normalized
+    ids               rows x 16-byte UUIDs
+    content offsets   int64[rows + 1] into the content blob
+    content blob      UTF-8 text
+    metadata offsets  int64[rows + 1] into the metadata blob
+    metadata blob     UTF-8 JSON
+    code columns      int32[rows] per act_name, section, chapter, domain,
+                      source_url, indexing the header's string tables
+
+Readers map the file read-only, so every worker on a host shares the
+same page-cache-backed vectors instead of holding its own copy.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from datetime import datetime
+import json
+import mmap
+import os
+import struct
+import uuid
+
+import numpy as np
+
+
+MAGIC = b"LCSNAP"
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+
+# Low-cardinality columns stored as codes into a string table
+CODED_COLUMNS = ("act_name", "section", "chapter", "domain", "source_url")
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is missing, truncated or incompatible."""
+
+
+class BlobColumn:
+    """Read-only sequence of strings packed in a blob with offsets."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[index] for index in range(len(self)))
+
+
+class CodedColumn:
+    """Read-only sequence of values stored as codes into a table."""
+
+    def __init__(self, codes: np.ndarray, table: List[Optional[str]]):
+        self.codes = codes
+        self.table = table
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> Optional[str]:
+        return self.table[self.codes[index]]
+
+    def __iter__(self) -> Iterator[Optional[str]]:
+        return (self.table[code] for code in self.codes)
+
+
+class UuidColumn:
+    """Read-only sequence of UUID strings stored as 16-byte values."""
+
+    def __init__(self, raw: np.ndarray):
+        self._raw = raw
+
+    def __len__(self) -> int:
+        return len(self._raw)
+
+    def __getitem__(self, index: int) -> str:
+        return str(uuid.UUID(bytes=self._raw[index].tobytes()))
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[index] for index in range(len(self)))
+
+
+class Snapshot:
+    """An opened snapshot; arrays are views into the mapped file."""
+
+    def __init__(self, path: str):
+        """
+        Map a snapshot file.
+
+        Raises:
+            SnapshotError: If the file is not a readable snapshot
+        """
+        self.path = path
+
+        try:
+            with open(path, "rb") as handle:
+                self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise SnapshotError(f"Cannot open snapshot {path}: {str(e)}")
+
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise SnapshotError(f"{path} is not an embedding snapshot")
+
+        version, header_length = struct.unpack_from("<HI", self._mmap, len(MAGIC))
+        if version != FORMAT_VERSION:
+            raise SnapshotError(f"Unsupported snapshot format version {version}")
+
+        start = len(MAGIC) + 6
+        self.header = json.loads(self._mmap[start:start + header_length].decode("utf-8"))
+
+        rows = self.header["rows"]
+        dim = self.header["dim"]
+
+        self.embeddings = self._section("embeddings", self.header["dtype"], rows * dim).reshape(rows, dim)
+        self.ids = UuidColumn(self._section("ids", "u1", rows * 16).reshape(rows, 16))
+        self.columns: Dict[str, Sequence] = {
+            "content": BlobColumn(
+                self._section("content_blob", "u1"),
+                self._section("content_offsets", "<i8", rows + 1)
+            ),
+            "metadata": BlobColumn(
+                self._section("metadata_blob", "u1"),
+                self._section("metadata_offsets", "<i8", rows + 1)
+            ),
+        }
+        for column in CODED_COLUMNS:
+            self.columns[column] = CodedColumn(
+                self._section(f"{column}_codes", "<i4", rows),
+                self.header["tables"][column]
+            )
+
+    @property
+    def watermark(self) -> Optional[Tuple[str, str]]:
+        """(created_at, id) of the newest row in the snapshot."""
+        watermark = self.header.get("watermark")
+        return tuple(watermark) if watermark else None
+
+    def _section(self, name: str, dtype: str, count: int = -1) -> np.ndarray:
+        offset, length = self.header["sections"][name]
+        if offset + length > len(self._mmap):
+            raise SnapshotError(f"Snapshot {self.path} is truncated")
+        if count == -1:
+            count = length // np.dtype(dtype).itemsize
+        return np.frombuffer(self._mmap, dtype=np.dtype(dtype), count=count, offset=offset)
+
+
+def write_snapshot(
+    path: str,
+    embeddings: np.ndarray,
+    ids: Sequence[str],
+    columns: Dict[str, Sequence[Any]],
+    watermark: Optional[Tuple[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Write a snapshot atomically (to a temporary file, then renamed).
+
+    Args:
+        path: Destination file
+        embeddings: L2-normalized rows x dim matrix (float32 or float16)
+        ids: Chunk UUIDs
+        columns: content, metadata and the coded columns, one value per row
+        watermark: (created_at, id) of the newest row
+
+    Returns:
+        The snapshot header
+    """
+    rows = len(ids)
+    dim = embeddings.shape[1] if rows else 0
+
+    sections: Dict[str, bytes] = {
+        "embeddings": np.ascontiguousarray(embeddings).astype(embeddings.dtype.newbyteorder("<")).tobytes(),
+        "ids": b"".join(uuid.UUID(row_id).bytes for row_id in ids),
+    }
+
+    for column, default in (("content", ""), ("metadata", "{}")):
+        encoded = [_as_text(value, default).encode("utf-8") for value in columns[column]]
+        offsets = np.zeros(rows + 1, dtype="<i8")
+        offsets[1:] = np.cumsum([len(value) for value in encoded])
+        sections[f"{column}_offsets"] = offsets.tobytes()
+        sections[f"{column}_blob"] = b"".join(encoded)
+
+    tables: Dict[str, List[Optional[str]]] = {}
+    for column in CODED_COLUMNS:
+        lookup: Dict[Optional[str], int] = {}
+        codes = np.asarray(
+            [lookup.setdefault(value, len(lookup)) for value in columns[column]],
+            dtype="<i4"
+        )
+        tables[column] = list(lookup)
+        sections[f"{column}_codes"] = codes.tobytes()
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "created_at": datetime.utcnow().isoformat(),
+        "rows": rows,
+        "dim": dim,
+        "dtype": embeddings.dtype.newbyteorder("<").str,
+        "watermark": list(watermark) if watermark else None,
+        "tables": tables,
+        "sections": {},
+    }
+
+    # Section offsets depend on the header length, which depends on the
+    # offsets; reserve room for them by sizing with placeholder values first
+    for name in sections:
+        header["sections"][name] = [2 ** 40, 2 ** 40]
+    offset = _align(len(MAGIC) + 6 + len(json.dumps(header).encode("utf-8")))
+    for name, data in sections.items():
+        header["sections"][name] = [offset, len(data)]
+        offset = _align(offset + len(data))
+
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    tmp_path = f"{path}.tmp"
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(tmp_path, "wb") as handle:
+        handle.write(MAGIC + struct.pack("<HI", FORMAT_VERSION, len(header_bytes)))
+        handle.write(header_bytes)
+        for name, data in sections.items():
+            handle.write(b"\0" * (header["sections"][name][0] - handle.tell()))
+            handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+
+    os.replace(tmp_path, path)
+    return header
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _as_text(value: Any, default: str) -> str:
+    if value is None:
+        return default
+    if isinstance(value, str):
+        return value
+    return json.dumps(value)
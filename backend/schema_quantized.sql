@@ -0,0 +1,111 @@
+-- Opt-in quantized embedding storage for VECTOR_STORAGE=halfvec or bit.
+-- Apply after schema.sql, then run scripts/migrate_quantized_embeddings.py
+-- before switching VECTOR_STORAGE. Requires pgvector >= 0.7 (halfvec and
+-- binary_quantize); check with:
+--   SELECT extversion FROM pg_extension WHERE extname = 'vector';
+-- Not needed with the default float32 storage: the trigger below computes
+-- and stores two extra copies of every embedding written. To stop paying
+-- for them, DROP TRIGGER legal_chunks_quantize ON legal_chunks.
+
+-- Quantized embedding copies: halfvec halves index
+-- size; bit(384) (sign of each dimension) shrinks it 32x and serves as a
+-- Hamming-distance prefilter whose candidates are re-scored exactly
+-- against the float32 embedding. The trigger keeps the copies in sync;
+-- scripts/migrate_quantized_embeddings.py backfills existing rows and
+-- builds the indexes concurrently.
+ALTER TABLE legal_chunks ADD COLUMN IF NOT EXISTS embedding_half halfvec(384);
+ALTER TABLE legal_chunks ADD COLUMN IF NOT EXISTS embedding_bit bit(384);
+
+CREATE OR REPLACE FUNCTION quantize_legal_chunk()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.embedding_half := NEW.embedding::halfvec(384);
+    NEW.embedding_bit := binary_quantize(NEW.embedding)::bit(384);
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS legal_chunks_quantize ON legal_chunks;
+CREATE TRIGGER legal_chunks_quantize
+    BEFORE INSERT OR UPDATE OF embedding ON legal_chunks
+    FOR EACH ROW EXECUTE FUNCTION quantize_legal_chunk();
+
+-- Approximate search on a quantized column, then exact cosine re-scoring
+-- of the top rescore_candidates rows. storage is 'halfvec' or 'bit'.
+CREATE OR REPLACE FUNCTION match_legal_chunks_quantized(
+    query_embedding vector(384),
+    match_threshold float DEFAULT 0.5,
+    match_count int DEFAULT 5,
+    filter_domain text DEFAULT NULL,
+    storage text DEFAULT 'bit',
+    rescore_candidates int DEFAULT 100,
+    hnsw_ef_search int DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    content TEXT,
+    act_name TEXT,
+    section TEXT,
+    chapter TEXT,
+    source_url TEXT,
+    domain TEXT,
+    metadata JSONB,
+    similarity float
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_candidates int := GREATEST(rescore_candidates, match_count);
+    v_ids uuid[];
+BEGIN
+    -- HNSW returns at most ef_search rows per scan
+    PERFORM set_config(
+        'hnsw.ef_search',
+        -- 1000 is the largest value pgvector accepts
+        LEAST(GREATEST(COALESCE(hnsw_ef_search, 40), v_candidates), 1000)::text,
+        true
+    );
+
+    IF storage = 'halfvec' THEN
+        SELECT array_agg(c.id) INTO v_ids
+        FROM (
+            SELECT lc.id
+            FROM legal_chunks lc
+            WHERE filter_domain IS NULL OR lc.domain = filter_domain
+            ORDER BY lc.embedding_half <=> query_embedding::halfvec(384)
+            LIMIT v_candidates
+        ) c;
+    ELSIF storage = 'bit' THEN
+        SELECT array_agg(c.id) INTO v_ids
+        FROM (
+            SELECT lc.id
+            FROM legal_chunks lc
+            WHERE filter_domain IS NULL OR lc.domain = filter_domain
+            ORDER BY lc.embedding_bit <~> binary_quantize(query_embedding)::bit(384)
+            LIMIT v_candidates
+        ) c;
+    ELSE
+        RAISE EXCEPTION 'Unknown embedding storage: %', storage;
+    END IF;
+
+    RETURN QUERY
+    SELECT
+        lc.id,
+        lc.content,
+        lc.act_name,
+        lc.section,
+        lc.chapter,
+        lc.source_url,
+        lc.domain,
+        lc.metadata,
+        1 - (lc.embedding <=> query_embedding) AS similarity
+    FROM legal_chunks lc
+    WHERE
+        lc.id = ANY(v_ids)
+        AND 1 - (lc.embedding <=> query_embedding) > match_threshold
+    ORDER BY lc.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
@@ -0,0 +1,196 @@
+"""
+Domain-Filtered Search Benchmark
+Compares recall and latency of domain-filtered vector search on the
+global index (filter applied after the scan) and on per-domain partial
+indexes (created by manage_vector_index.py partition).
+
+Usage:
+    python scripts/benchmark_domain_search.py [--queries 50] [--k 5] [--accuracy balanced] [--domain <domain>]
+
+Query vectors are embeddings of randomly sampled chunks from any domain.
+Ground truth is an exact scan with index scans disabled. The global
+layout is measured by filtering on (domain || ''), which the planner
+cannot match to a partial index. Requires DATABASE_URL and psycopg2.
+"""
+
+import sys
+import os
+import argparse
+import re
+import statistics
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.db.vector_index import search_params
+from app.utils.logger import setup_logger, logger
+
+
+LAYOUT_FILTERS = {
+    "global": "(domain || '') = %s",
+    "partitioned": "domain = %s",
+}
+
+
+def connect():
+    """Open an autocommit connection."""
+    try:
+        import psycopg2
+    except ImportError:
+        raise ImportError("The benchmark requires psycopg2 (pip install psycopg2-binary)")
+
+    if not settings.database_url:
+        raise ValueError("DATABASE_URL is required for the benchmark")
+
+    connection = psycopg2.connect(settings.database_url)
+    connection.autocommit = True
+    return connection
+
+
+def nearest_sql(layout: str) -> str:
+    return (
+        "SELECT id FROM legal_chunks "
+        f"WHERE {LAYOUT_FILTERS[layout]} "
+        "ORDER BY embedding <=> %s::vector LIMIT %s"
+    )
+
+
+def exact_neighbors(cursor, domain: str, query: str, k: int) -> list:
+    """Exact top-k with index scans disabled."""
+    cursor.execute("BEGIN")
+    try:
+        cursor.execute("SET LOCAL enable_indexscan = off")
+        cursor.execute("SET LOCAL enable_bitmapscan = off")
+        cursor.execute(nearest_sql("partitioned"), (domain, query, k))
+        return [row[0] for row in cursor.fetchall()]
+    finally:
+        cursor.execute("COMMIT")
+
+
+def index_used(cursor, layout: str, domain: str, query: str, k: int) -> str:
+    """Name of the index the planner picks for a layout, or a seq scan."""
+    cursor.execute("EXPLAIN " + nearest_sql(layout), (domain, query, k))
+    plan = "\n".join(row[0] for row in cursor.fetchall())
+    match = re.search(r"using (\S+) on legal_chunks", plan)
+    return match.group(1) if match else "seq scan"
+
+
+def benchmark_domain(cursor, domain: str, row_count: int, queries: list, k: int, probes: dict) -> list:
+    """
+    Measure each layout for one domain.
+
+    Args:
+        probes: ivfflat.probes per layout, sized to the index it scans
+
+    Returns:
+        (layout, index, recall, short results, p50 ms, p95 ms) rows
+    """
+    expected = min(k, row_count)
+    truths = [set(exact_neighbors(cursor, domain, query, k)) for query in queries]
+
+    results = []
+    for layout in LAYOUT_FILTERS:
+        cursor.execute(f"SET ivfflat.probes = {probes[layout]}")
+        recalls = []
+        latencies = []
+        short = 0
+
+        for query, truth in zip(queries, truths):
+            start_time = time.perf_counter()
+            cursor.execute(nearest_sql(layout), (domain, query, k))
+            found = [row[0] for row in cursor.fetchall()]
+            latencies.append((time.perf_counter() - start_time) * 1000)
+
+            recalls.append(len(truth.intersection(found)) / expected if expected else 1.0)
+            if len(found) < expected:
+                short += 1
+
+        latencies.sort()
+        results.append((
+            layout,
+            index_used(cursor, layout, domain, queries[0], k),
+            statistics.mean(recalls),
+            short,
+            statistics.median(latencies),
+            latencies[int(0.95 * (len(latencies) - 1))]
+        ))
+
+    return results
+
+
+def run_benchmark(queries: int = 50, k: int = 5, accuracy: str = "balanced", domain: str = None):
+    """
+    Benchmark filtered search per domain and print a comparison.
+
+    Args:
+        queries: Query vectors per domain
+        k: Neighbors per query
+        accuracy: Search accuracy level (sets probes / ef_search)
+        domain: Benchmark only this domain
+    """
+    connection = connect()
+    try:
+        with connection.cursor() as cursor:
+            params = search_params(accuracy, settings.vector_index_lists)
+            cursor.execute(f"SET hnsw.ef_search = {params['hnsw_ef_search']}")
+
+            # Partial indexes have their own list counts, as in VectorStore
+            cursor.execute("SELECT domain, lists FROM legal_chunks_domain_index_lists()")
+            domain_lists = dict(cursor.fetchall())
+
+            cursor.execute(
+                "SELECT domain, count(*) FROM legal_chunks "
+                "WHERE domain IS NOT NULL GROUP BY domain ORDER BY count(*) DESC"
+            )
+            domains = cursor.fetchall()
+            if domain:
+                domains = [(name, count) for name, count in domains if name == domain]
+
+            cursor.execute(
+                "SELECT embedding::text FROM legal_chunks "
+                "WHERE embedding IS NOT NULL ORDER BY random() LIMIT %s",
+                (queries,)
+            )
+            query_vectors = [row[0] for row in cursor.fetchall()]
+
+            if not domains or not query_vectors:
+                logger.warning("Nothing to benchmark")
+                return
+
+            print("\n" + "="*100)
+            print(f"k={k}, accuracy={accuracy} ({params}), {len(query_vectors)} queries per domain")
+            print(f"{'domain':<24}{'rows':>8}  {'layout':<12}{'index':<44}{'recall':>8}{'short':>7}{'p50 ms':>9}{'p95 ms':>9}")
+
+            for name, row_count in domains:
+                logger.info(f"Benchmarking {name} ({row_count} rows)")
+                probes = {
+                    "global": params["ivfflat_probes"],
+                    "partitioned": search_params(
+                        accuracy, domain_lists.get(name, settings.vector_index_lists)
+                    )["ivfflat_probes"]
+                }
+                for layout, index, recall, short, p50, p95 in benchmark_domain(
+                    cursor, name, row_count, query_vectors, k, probes
+                ):
+                    print(
+                        f"{name[:23]:<24}{row_count:>8}  {layout:<12}{index[:43]:<44}"
+                        f"{recall:>8.3f}{short:>7}{p50:>9.2f}{p95:>9.2f}"
+                    )
+            print("="*100 + "\n")
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    setup_logger()
+
+    parser = argparse.ArgumentParser(description="Benchmark domain-filtered vector search layouts")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--accuracy", choices=["fast", "balanced", "accurate"], default=settings.vector_search_accuracy)
+    parser.add_argument("--domain", help="Benchmark only this domain")
+    args = parser.parse_args()
+
+    run_benchmark(args.queries, args.k, args.accuracy, args.domain)
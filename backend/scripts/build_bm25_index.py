@@ -0,0 +1,99 @@
+"""
+BM25 Index Build Script
+Builds the local BM25 keyword index used for offline and degraded retrieval.
+
+Usage:
+    python scripts/build_bm25_index.py --from-directory <path> [--domain <domain>] [output_path]
+    python scripts/build_bm25_index.py --from-snapshot <snapshot> [output_path]
+    python scripts/build_bm25_index.py ... --query "consumer complaint deadline"
+
+--from-directory chunks documents exactly as ingest_documents.py does, so
+no database or embedding calls are needed. --from-snapshot indexes the
+chunks in a file written by export_snapshot.py, keeping the ids of the
+stored rows. Point BM25_INDEX_PATH at the output file.
+"""
+
+import sys
+import os
+import argparse
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.rag.bm25 import BM25Index
+from app.rag.loader import DocumentLoader
+from app.rag.chunker import TextChunker
+from app.utils.logger import setup_logger, logger
+
+
+def build_from_directory(directory: str, domain: str = None) -> BM25Index:
+    """
+    Load, chunk and index the documents in a directory.
+
+    Args:
+        directory: Path to directory with documents
+        domain: Optional domain to assign to all documents
+
+    Returns:
+        The built index
+    """
+    loader = DocumentLoader()
+    documents = loader.load_directory(directory)
+
+    if domain:
+        for doc in documents:
+            doc["metadata"]["domain"] = domain
+            doc["domain"] = domain
+
+    # Same chunking as ingest_documents.py
+    chunker = TextChunker(chunk_size=800, chunk_overlap=100)
+    chunks = chunker.chunk_documents(documents)
+
+    return BM25Index.build(chunks)
+
+
+if __name__ == "__main__":
+    setup_logger()
+
+    parser = argparse.ArgumentParser(description="Build the local BM25 keyword index")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--from-directory", help="Directory of legal documents")
+    source.add_argument("--from-snapshot", help="Snapshot written by export_snapshot.py")
+    parser.add_argument("--domain", help="Domain to assign (with --from-directory)")
+    parser.add_argument(
+        "path",
+        nargs="?",
+        default=settings.bm25_index_path,
+        help="Output file (default: BM25_INDEX_PATH)"
+    )
+    parser.add_argument("--query", help="Run a sample query against the built index")
+    args = parser.parse_args()
+
+    if not args.path:
+        parser.error("an output path or BM25_INDEX_PATH is required")
+
+    start_time = time.perf_counter()
+    if args.from_directory:
+        index = build_from_directory(args.from_directory, args.domain)
+    else:
+        index = BM25Index.from_snapshot(args.from_snapshot)
+    elapsed = time.perf_counter() - start_time
+
+    index.save(args.path)
+
+    stats = index.stats()
+    logger.info(
+        f"Wrote BM25 index {args.path}: {stats['chunks']} chunks, {stats['terms']} terms, "
+        f"{stats['postings']} postings ({stats['postings_mb']} MB) in {elapsed:.2f}s"
+    )
+
+    if args.query:
+        start_time = time.perf_counter()
+        results = index.search(args.query, k=5)
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+        print(f"\n{len(results)} results in {elapsed_ms:.2f} ms")
+        for doc in results:
+            print(f"  {doc['bm25_score']:.3f}  {doc.get('act_name')} s.{doc.get('section')}: {doc['content'][:80]}")
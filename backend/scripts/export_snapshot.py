@@ -0,0 +1,61 @@
+"""
+Export Snapshot Script
+Writes legal_chunks to a memory-mapped snapshot for LocalVectorIndex.
+
+Usage:
+    python scripts/export_snapshot.py [output_path] [--dtype float32|float16]
+
+Point LOCAL_INDEX_SNAPSHOT_PATH at the file (e.g. on a shared volume) so
+API workers open it instead of pulling the corpus from Supabase.
+"""
+
+import sys
+import os
+import argparse
+import asyncio
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.rag.local_index import LocalVectorIndex
+from app.utils.logger import setup_logger, logger
+
+
+async def export_snapshot(path: str, dtype: str = "float32"):
+    """
+    Load every chunk from the database and write a snapshot.
+    
+    Args:
+        path: Output file
+        dtype: Storage type of the embedding matrix
+    """
+    index = LocalVectorIndex(dtype=dtype)
+    await index.load()
+    
+    header = index.export_snapshot(path)
+    
+    size_mb = os.path.getsize(path) / 1e6
+    logger.info(
+        f"Wrote snapshot {path}: {header['rows']} chunks, dim {header['dim']}, "
+        f"{dtype}, {size_mb:.1f} MB"
+    )
+
+
+if __name__ == "__main__":
+    setup_logger()
+    
+    parser = argparse.ArgumentParser(description="Export legal_chunks to an embedding snapshot")
+    parser.add_argument(
+        "path",
+        nargs="?",
+        default=settings.local_index_snapshot_path,
+        help="Output file (default: LOCAL_INDEX_SNAPSHOT_PATH)"
+    )
+    parser.add_argument("--dtype", choices=["float32", "float16"], default=settings.local_index_dtype)
+    args = parser.parse_args()
+    
+    if not args.path:
+        parser.error("an output path or LOCAL_INDEX_SNAPSHOT_PATH is required")
+    
+    asyncio.run(export_snapshot(args.path, args.dtype))
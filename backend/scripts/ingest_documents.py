@@ -5,9 +5,11 @@ Ingests legal documents into the vector store.
 
 import sys
 import os
+import argparse
 import asyncio
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -15,17 +17,83 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.rag.loader import DocumentLoader
 from app.rag.chunker import TextChunker
 from app.rag.embedder import DocumentEmbedder
+from app.db.bulk_loader import CopyBulkLoader
 from app.db.vector import VectorStore
 from app.utils.logger import setup_logger, logger
 
 
-async def ingest_directory(directory: str, domain: Optional[str] = None):
+BENCHMARK_DOMAIN = "__ingest_benchmark__"
+
+
+async def store_chunks(
+    chunks: List[Dict[str, Any]],
+    backend: str = "rest",
+    copy_format: str = "binary"
+) -> int:
+    """
+    Write embedded chunks with the selected ingestion backend.
+    
+    Args:
+        chunks: Chunks with embeddings
+        backend: "rest" (PostgREST bulk inserts) or "copy" (direct COPY)
+        copy_format: COPY format for the copy backend ("binary" or "text")
+        
+    Returns:
+        Number of chunks added
+    """
+    if backend == "copy":
+        loader = CopyBulkLoader(copy_format=copy_format)
+        return await asyncio.to_thread(loader.load, chunks)
+    
+    vector_store = VectorStore()
+    return await vector_store.add_documents(chunks)
+
+
+async def benchmark_backends(chunks: List[Dict[str, Any]]):
+    """
+    Load the same chunks with each backend and compare throughput.
+    Rows are written under a scratch domain and deleted afterwards.
+    """
+    scratch = [{**chunk, "domain": BENCHMARK_DOMAIN} for chunk in chunks]
+    vector_store = VectorStore()
+    
+    results = []
+    for backend, copy_format in (("rest", None), ("copy", "text"), ("copy", "binary")):
+        label = backend if not copy_format else f"{backend}/{copy_format}"
+        try:
+            start_time = time.perf_counter()
+            added = await store_chunks(scratch, backend, copy_format or "binary")
+            elapsed = time.perf_counter() - start_time
+            results.append((label, added, elapsed))
+        except Exception as e:
+            logger.error(f"Benchmark {label} failed: {str(e)}")
+        finally:
+            await vector_store.delete_by_domain(BENCHMARK_DOMAIN)
+    
+    print("\n" + "="*60)
+    print(f"{'backend':<15}{'rows':>10}{'seconds':>12}{'rows/s':>14}")
+    for label, added, elapsed in results:
+        rate = added / elapsed if elapsed > 0 else 0.0
+        print(f"{label:<15}{added:>10}{elapsed:>12.2f}{rate:>14.1f}")
+    print("="*60 + "\n")
+
+
+async def ingest_directory(
+    directory: str,
+    domain: Optional[str] = None,
+    backend: str = "rest",
+    copy_format: str = "binary",
+    benchmark: bool = False
+):
     """
     Ingest all documents from a directory.
     
     Args:
         directory: Path to directory with documents
         domain: Optional domain to assign to all documents
+        backend: Ingestion backend ("rest" or "copy")
+        copy_format: COPY format for the copy backend
+        benchmark: Compare backends on these chunks instead of ingesting
     """
     logger.info(f"Starting ingestion from: {directory}")
     
@@ -62,14 +130,17 @@ async def ingest_directory(directory: str, domain: Optional[str] = None):
 
     logger.info(f"Successfully embedded {len(embedded_chunks)} chunks")
     
+    if benchmark:
+        await benchmark_backends(embedded_chunks)
+        return
+    
     # Store in vector database
-    vector_store = VectorStore()
-    added = await vector_store.add_documents(embedded_chunks)
+    added = await store_chunks(embedded_chunks, backend, copy_format)
     
     logger.info(f"Added {added} chunks to vector store")
 
 
-async def ingest_sample_data():
+async def ingest_sample_data(backend: str = "rest", copy_format: str = "binary"):
     """Ingest sample legal data for testing."""
     
     sample_documents = [
@@ -255,7 +326,6 @@ Complaint procedure:
     # Process documents
     chunker = TextChunker(chunk_size=800, chunk_overlap=100)
     embedder = DocumentEmbedder(batch_size=5)
-    vector_store = VectorStore()
     
     all_chunks = []
     for doc in sample_documents:
@@ -280,7 +350,7 @@ Complaint procedure:
     valid = [c for c in embedded if c.get("embedding")]
     
     # Store
-    added = await vector_store.add_documents(valid)
+    added = await store_chunks(valid, backend, copy_format)
     
     logger.info(f"Successfully ingested {added} sample documents")
 
@@ -291,10 +361,27 @@ Complaint procedure:
 if __name__ == "__main__":
     setup_logger()
     
-    if len(sys.argv) > 1:
-        directory = sys.argv[1]
-        domain = sys.argv[2] if len(sys.argv) > 2 else None
-        asyncio.run(ingest_directory(directory, domain))
+    parser = argparse.ArgumentParser(description="Ingest legal documents into the vector store")
+    parser.add_argument("directory", nargs="?", help="Directory with documents (default: scripts/Files)")
+    parser.add_argument("domain", nargs="?", help="Domain to assign to all documents")
+    parser.add_argument(
+        "--backend",
+        choices=["rest", "copy"],
+        default="rest",
+        help="rest: PostgREST bulk inserts; copy: COPY over DATABASE_URL"
+    )
+    parser.add_argument("--copy-format", choices=["binary", "text"], default="binary")
+    parser.add_argument(
+        "--benchmark",
+        action="store_true",
+        help="Compare ingestion backends on the directory's chunks without keeping them"
+    )
+    args = parser.parse_args()
+    
+    if args.directory:
+        asyncio.run(ingest_directory(
+            args.directory, args.domain, args.backend, args.copy_format, args.benchmark
+        ))
     else:
         # Default to Files directory in the same folder as this script
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -303,7 +390,9 @@ if __name__ == "__main__":
         if os.path.exists(files_dir):
             logger.info(f"Ingesting from default directory: {files_dir}")
             # Ensure the directory exists and pass it to the ingestion function
-            asyncio.run(ingest_directory(files_dir))
+            asyncio.run(ingest_directory(
+                files_dir, None, args.backend, args.copy_format, args.benchmark
+            ))
         else:
             logger.info("Files directory not found. Ingesting sample data...")
-            asyncio.run(ingest_sample_data())
\ No newline at end of file
+            asyncio.run(ingest_sample_data(args.backend, args.copy_format))
@@ -0,0 +1,249 @@
+"""
+Vector Index Management Script
+Sizes and rebuilds the pgvector index on legal_chunks.
+
+Usage:
+    python scripts/manage_vector_index.py status
+    python scripts/manage_vector_index.py rebuild [--method auto|ivfflat|hnsw] [--dry-run]
+    python scripts/manage_vector_index.py partition [--min-rows N] [--rebuild] [--dry-run]
+
+Rebuilds run CREATE INDEX CONCURRENTLY under a temporary name and swap it
+in afterwards, so similarity search keeps working during the build.
+partition maintains one partial index per domain (WHERE domain = ...),
+which nearest_legal_chunks routes domain-filtered searches to.
+Requires DATABASE_URL and psycopg2.
+"""
+
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.db.vector_index import DOMAIN_INDEX_PREFIX, INDEX_NAME, domain_index_name, plan_index
+from app.utils.logger import setup_logger, logger
+
+
+def connect():
+    """Open an autocommit connection (CONCURRENTLY cannot run in a transaction)."""
+    try:
+        import psycopg2
+    except ImportError:
+        raise ImportError("Index management requires psycopg2 (pip install psycopg2-binary)")
+
+    if not settings.database_url:
+        raise ValueError("DATABASE_URL is required for index management")
+
+    connection = psycopg2.connect(settings.database_url)
+    connection.autocommit = True
+    return connection
+
+
+def count_rows(cursor) -> int:
+    cursor.execute("SELECT count(*) FROM legal_chunks")
+    return cursor.fetchone()[0]
+
+
+def show_status():
+    """Print the current index and the recommended one."""
+    connection = connect()
+    try:
+        with connection.cursor() as cursor:
+            row_count = count_rows(cursor)
+
+            cursor.execute(
+                """
+                SELECT i.indexdef, pg_size_pretty(pg_relation_size(c.oid))
+                FROM pg_indexes i
+                JOIN pg_class c ON c.relname = i.indexname
+                WHERE i.tablename = 'legal_chunks' AND i.indexname = %s
+                """,
+                (INDEX_NAME,)
+            )
+            current = cursor.fetchone()
+
+            cursor.execute(
+                """
+                SELECT i.indexname, pg_size_pretty(pg_relation_size(c.oid))
+                FROM pg_indexes i
+                JOIN pg_class c ON c.relname = i.indexname
+                WHERE i.tablename = 'legal_chunks' AND i.indexname LIKE %s
+                ORDER BY i.indexname
+                """,
+                (DOMAIN_INDEX_PREFIX + "%",)
+            )
+            domain_indexes = cursor.fetchall()
+    finally:
+        connection.close()
+
+    plan = plan_index(row_count)
+
+    print("\n" + "="*60)
+    print(f"Rows:        {row_count}")
+    if current:
+        print(f"Index:       {current[0]}")
+        print(f"Index size:  {current[1]}")
+    else:
+        print("Index:       none")
+    print(f"Recommended: {plan.method} {plan.with_clause()}")
+    print(f"Domain indexes: {len(domain_indexes)}")
+    for name, size in domain_indexes:
+        print(f"  {name}  {size}")
+    print("="*60 + "\n")
+
+
+def rebuild_index(method: str = "auto", dry_run: bool = False, maintenance_work_mem: str = "512MB"):
+    """
+    Build a new embedding index concurrently and swap it in.
+
+    Args:
+        method: "ivfflat", "hnsw" or "auto"
+        dry_run: Print the statements without running them
+        maintenance_work_mem: Memory for the index build
+    """
+    connection = connect()
+    try:
+        with connection.cursor() as cursor:
+            row_count = count_rows(cursor)
+            plan = plan_index(row_count, method)
+            temp_name = f"{INDEX_NAME}_new"
+
+            statements = [
+                f"DROP INDEX CONCURRENTLY IF EXISTS {temp_name}",
+                f"SET maintenance_work_mem = '{maintenance_work_mem}'",
+                plan.create_sql(temp_name, concurrently=True),
+            ]
+            swap = [
+                "BEGIN",
+                f"DROP INDEX IF EXISTS {INDEX_NAME}",
+                f"ALTER INDEX {temp_name} RENAME TO {INDEX_NAME}",
+                "COMMIT",
+            ]
+
+            logger.info(f"Planned {plan.method} index for {row_count} rows: {plan.with_clause()}")
+
+            if dry_run:
+                print("\n".join(statement + ";" for statement in statements + swap))
+                return
+
+            for statement in statements:
+                logger.info(statement)
+                cursor.execute(statement)
+
+            # Swap is a quick catalog change
+            for statement in swap:
+                cursor.execute(statement)
+    finally:
+        connection.close()
+
+    logger.info(f"Index {INDEX_NAME} rebuilt")
+    if plan.lists:
+        logger.info(f"Set VECTOR_INDEX_LISTS={plan.lists} so search probes match the new index")
+
+
+def partition_indexes(
+    min_rows: int = 1000,
+    rebuild: bool = False,
+    dry_run: bool = False,
+    maintenance_work_mem: str = "512MB"
+):
+    """
+    Create a partial embedding index for every domain with at least
+    min_rows chunks, sized to that domain, and drop partial indexes of
+    domains that no longer qualify.
+
+    Args:
+        min_rows: Smallest domain worth its own index; smaller domains
+            keep using the global index with a filter
+        rebuild: Rebuild existing domain indexes (e.g. after large loads)
+        dry_run: Print the statements without running them
+        maintenance_work_mem: Memory for each index build
+    """
+    connection = connect()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT domain, count(*) FROM legal_chunks "
+                "WHERE domain IS NOT NULL GROUP BY domain"
+            )
+            domain_rows = dict(cursor.fetchall())
+
+            cursor.execute(
+                "SELECT indexname FROM pg_indexes "
+                "WHERE tablename = 'legal_chunks' AND indexname LIKE %s",
+                (DOMAIN_INDEX_PREFIX + "%",)
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+
+            statements = [f"SET maintenance_work_mem = '{maintenance_work_mem}'"]
+            wanted = set()
+
+            for domain, row_count in sorted(domain_rows.items()):
+                if row_count < min_rows:
+                    continue
+
+                name = domain_index_name(domain)
+                wanted.add(name)
+                if name in existing and not rebuild:
+                    continue
+
+                # Domain indexes stay small, so ivfflat sized per domain is enough
+                plan = plan_index(row_count, "ivfflat")
+                logger.info(f"Planned {name} for {domain!r} ({row_count} rows): {plan.with_clause()}")
+
+                if name in existing:
+                    temp_name = f"{name[:56]}_new"
+                    statements += [
+                        f"DROP INDEX CONCURRENTLY IF EXISTS {temp_name}",
+                        plan.create_sql(temp_name, concurrently=True, domain=domain),
+                        f"DROP INDEX CONCURRENTLY {name}",
+                        f"ALTER INDEX {temp_name} RENAME TO {name}",
+                    ]
+                else:
+                    statements.append(plan.create_sql(name, concurrently=True, domain=domain))
+
+            for name in sorted(existing - wanted):
+                statements.append(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+            if dry_run:
+                print("\n".join(statement + ";" for statement in statements))
+                return
+
+            for statement in statements:
+                logger.info(statement)
+                cursor.execute(statement)
+    finally:
+        connection.close()
+
+    logger.info(f"{len(wanted)} domain indexes in place")
+
+
+if __name__ == "__main__":
+    setup_logger()
+
+    parser = argparse.ArgumentParser(description="Manage the legal_chunks vector index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("status", help="Show the current and recommended index")
+
+    rebuild_parser = subparsers.add_parser("rebuild", help="Rebuild the index concurrently")
+    rebuild_parser.add_argument("--method", choices=["auto", "ivfflat", "hnsw"], default="auto")
+    rebuild_parser.add_argument("--maintenance-work-mem", default="512MB")
+    rebuild_parser.add_argument("--dry-run", action="store_true")
+
+    partition_parser = subparsers.add_parser("partition", help="Maintain per-domain partial indexes")
+    partition_parser.add_argument("--min-rows", type=int, default=1000)
+    partition_parser.add_argument("--rebuild", action="store_true")
+    partition_parser.add_argument("--maintenance-work-mem", default="512MB")
+    partition_parser.add_argument("--dry-run", action="store_true")
+
+    args = parser.parse_args()
+
+    if args.command == "status":
+        show_status()
+    elif args.command == "partition":
+        partition_indexes(args.min_rows, args.rebuild, args.dry_run, args.maintenance_work_mem)
+    else:
+        rebuild_index(args.method, args.dry_run, args.maintenance_work_mem)
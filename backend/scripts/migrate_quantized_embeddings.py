@@ -0,0 +1,252 @@
+"""
+Quantized Embedding Migration Script
+Backfills the halfvec and binary embedding copies on legal_chunks, builds
+their indexes, and reports recall versus latency for each storage.
+
+Usage:
+    python scripts/migrate_quantized_embeddings.py migrate [--batch-size 5000] [--dry-run]
+    python scripts/migrate_quantized_embeddings.py report [--queries 50] [--k 5] [--candidates 20,50,100,200]
+
+Apply schema_quantized.sql first (or the block printed by
+setup_database.py --quantized): the columns and the sync trigger. It needs
+pgvector >= 0.7. migrate backfills rows in batches, so the table stays
+writable, then builds the HNSW indexes concurrently. Switch search over
+with VECTOR_STORAGE=halfvec or bit once the report looks right.
+Requires DATABASE_URL and psycopg2.
+"""
+
+import sys
+import os
+import argparse
+import statistics
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.db.vector_index import INDEX_NAME, QUANTIZED_INDEXES, search_params
+from app.utils.logger import setup_logger, logger
+
+
+def connect():
+    """Open an autocommit connection (CONCURRENTLY cannot run in a transaction)."""
+    try:
+        import psycopg2
+    except ImportError:
+        raise ImportError("The migration requires psycopg2 (pip install psycopg2-binary)")
+
+    if not settings.database_url:
+        raise ValueError("DATABASE_URL is required for the migration")
+
+    connection = psycopg2.connect(settings.database_url)
+    connection.autocommit = True
+    return connection
+
+
+def check_pgvector(cursor):
+    """Fail early on pgvector versions without halfvec and binary_quantize."""
+    cursor.execute("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    row = cursor.fetchone()
+    version = tuple(int(part) for part in row[0].split(".")[:2]) if row else (0, 0)
+    if version < (0, 7):
+        raise RuntimeError(
+            f"Quantized storage requires pgvector >= 0.7 (installed: {row[0] if row else 'none'})"
+        )
+
+
+def migrate(batch_size: int = 5000, dry_run: bool = False, maintenance_work_mem: str = "512MB"):
+    """
+    Backfill quantized copies and build their indexes.
+
+    Args:
+        batch_size: Rows updated per statement
+        dry_run: Report pending rows and print the index statements only
+        maintenance_work_mem: Memory for the index builds
+    """
+    index_statements = [
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON legal_chunks {definition}"
+        for name, definition in QUANTIZED_INDEXES.values()
+    ]
+
+    connection = connect()
+    try:
+        with connection.cursor() as cursor:
+            check_pgvector(cursor)
+            cursor.execute(
+                "SELECT count(*) FROM legal_chunks "
+                "WHERE embedding IS NOT NULL AND (embedding_half IS NULL OR embedding_bit IS NULL)"
+            )
+            pending = cursor.fetchone()[0]
+            logger.info(f"{pending} rows need quantized embeddings")
+
+            if dry_run:
+                print("\n".join(statement + ";" for statement in index_statements))
+                return
+
+            start_time = time.perf_counter()
+            done = 0
+            while True:
+                # Setting the copies directly does not fire the UPDATE OF embedding trigger
+                cursor.execute(
+                    """
+                    UPDATE legal_chunks
+                    SET embedding_half = embedding::halfvec(384),
+                        embedding_bit = binary_quantize(embedding)::bit(384)
+                    WHERE id IN (
+                        SELECT id FROM legal_chunks
+                        WHERE embedding IS NOT NULL
+                          AND (embedding_half IS NULL OR embedding_bit IS NULL)
+                        LIMIT %s
+                    )
+                    """,
+                    (batch_size,)
+                )
+                if cursor.rowcount == 0:
+                    break
+                done += cursor.rowcount
+                logger.info(f"Backfilled {done}/{pending} rows")
+
+            logger.info(f"Backfill finished in {time.perf_counter() - start_time:.1f}s")
+
+            cursor.execute(f"SET maintenance_work_mem = '{maintenance_work_mem}'")
+            for statement in index_statements:
+                logger.info(statement)
+                cursor.execute(statement)
+    finally:
+        connection.close()
+
+    logger.info("Quantized embeddings ready")
+
+
+def _timed_ids(cursor, sql: str, params: tuple) -> tuple:
+    start_time = time.perf_counter()
+    cursor.execute(sql, params)
+    ids = [row[0] for row in cursor.fetchall()]
+    return ids, (time.perf_counter() - start_time) * 1000
+
+
+def report(queries: int = 50, k: int = 5, candidates: list = None, accuracy: str = "balanced"):
+    """
+    Print recall@k against an exact scan and p50/p95 latency for the
+    float32 index and each quantized storage at several re-score depths,
+    with index sizes.
+
+    Args:
+        queries: Query vectors (embeddings of randomly sampled chunks)
+        k: Neighbors per query
+        candidates: Re-score depths to try for the quantized storages
+        accuracy: Search accuracy level for the float32 index
+    """
+    candidates = candidates or [20, 50, 100, 200]
+    params = search_params(accuracy, settings.vector_index_lists)
+
+    connection = connect()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT embedding::text FROM legal_chunks "
+                "WHERE embedding IS NOT NULL ORDER BY random() LIMIT %s",
+                (queries,)
+            )
+            query_vectors = [row[0] for row in cursor.fetchall()]
+            if not query_vectors:
+                logger.warning("Nothing to benchmark")
+                return
+
+            truths = []
+            for query in query_vectors:
+                cursor.execute("BEGIN")
+                cursor.execute("SET LOCAL enable_indexscan = off")
+                cursor.execute("SET LOCAL enable_bitmapscan = off")
+                cursor.execute(
+                    "SELECT id FROM legal_chunks ORDER BY embedding <=> %s::vector LIMIT %s",
+                    (query, k)
+                )
+                truths.append({row[0] for row in cursor.fetchall()})
+                cursor.execute("COMMIT")
+
+            cursor.execute(f"SET ivfflat.probes = {params['ivfflat_probes']}")
+            cursor.execute(f"SET hnsw.ef_search = {params['hnsw_ef_search']}")
+
+            configurations = [(
+                "float32",
+                "-",
+                "SELECT id FROM legal_chunks ORDER BY embedding <=> %s::vector LIMIT %s",
+                lambda query: (query, k)
+            )]
+            for storage in ("halfvec", "bit"):
+                for depth in candidates:
+                    configurations.append((
+                        storage,
+                        str(depth),
+                        "SELECT id FROM match_legal_chunks_quantized(%s::vector, -2, %s, NULL, %s, %s)",
+                        lambda query, storage=storage, depth=depth: (query, k, storage, depth)
+                    ))
+
+            rows = []
+            for storage, depth, sql, arguments in configurations:
+                recalls = []
+                latencies = []
+                for query, truth in zip(query_vectors, truths):
+                    ids, elapsed = _timed_ids(cursor, sql, arguments(query))
+                    latencies.append(elapsed)
+                    recalls.append(len(truth.intersection(ids)) / len(truth) if truth else 1.0)
+
+                latencies.sort()
+                rows.append((
+                    storage,
+                    depth,
+                    statistics.mean(recalls),
+                    statistics.median(latencies),
+                    latencies[int(0.95 * (len(latencies) - 1))]
+                ))
+
+            index_names = [INDEX_NAME] + [name for name, _ in QUANTIZED_INDEXES.values()]
+            cursor.execute(
+                """
+                SELECT c.relname, pg_size_pretty(pg_relation_size(c.oid))
+                FROM pg_class c
+                WHERE c.relname = ANY(%s)
+                """,
+                (index_names,)
+            )
+            sizes = dict(cursor.fetchall())
+    finally:
+        connection.close()
+
+    print("\n" + "="*60)
+    print(f"k={k}, {len(query_vectors)} queries, float32 accuracy={accuracy}")
+    print(f"{'storage':<10}{'rescore':>9}{'recall':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for storage, depth, recall, p50, p95 in rows:
+        print(f"{storage:<10}{depth:>9}{recall:>10.3f}{p50:>10.2f}{p95:>10.2f}")
+    print("\nIndex sizes:")
+    for name in index_names:
+        print(f"  {name:<40}{sizes.get(name, 'missing')}")
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    setup_logger()
+
+    parser = argparse.ArgumentParser(description="Migrate legal_chunks to quantized embedding storage")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Backfill quantized copies and build indexes")
+    migrate_parser.add_argument("--batch-size", type=int, default=5000)
+    migrate_parser.add_argument("--maintenance-work-mem", default="512MB")
+    migrate_parser.add_argument("--dry-run", action="store_true")
+
+    report_parser = subparsers.add_parser("report", help="Recall versus latency per storage")
+    report_parser.add_argument("--queries", type=int, default=50)
+    report_parser.add_argument("--k", type=int, default=5)
+    report_parser.add_argument("--candidates", default="20,50,100,200")
+    report_parser.add_argument("--accuracy", choices=["fast", "balanced", "accurate"], default=settings.vector_search_accuracy)
+
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        migrate(args.batch_size, args.dry_run, args.maintenance_work_mem)
+    else:
+        depths = [int(value) for value in args.candidates.split(",")]
+        report(args.queries, args.k, depths, args.accuracy)
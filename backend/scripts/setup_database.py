@@ -5,10 +5,12 @@ Creates required tables in Supabase.
 
 import sys
 import os
+import argparse
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.config import settings
 from app.db.supabase import get_service_client
 from app.utils.logger import setup_logger, logger
 
@@ -83,11 +85,501 @@ CREATE TABLE IF NOT EXISTS agent_logs (
 CREATE INDEX IF NOT EXISTS idx_agent_logs_session_id ON agent_logs(session_id);
 CREATE INDEX IF NOT EXISTS idx_agent_logs_created_at ON agent_logs(created_at DESC);
 
--- Function for vector similarity search
+-- RLS Policies
+ALTER TABLE chat_sessions ENABLE ROW LEVEL SECURITY;
+ALTER TABLE chat_messages ENABLE ROW LEVEL SECURITY;
+
+-- Users can only see their own sessions
+CREATE POLICY "Users can view own sessions" ON chat_sessions
+    FOR SELECT USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own sessions" ON chat_sessions
+    FOR INSERT WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own sessions" ON chat_sessions
+    FOR UPDATE USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can delete own sessions" ON chat_sessions
+    FOR DELETE USING (auth.uid() = user_id);
+
+-- Users can only see messages in their sessions
+CREATE POLICY "Users can view own messages" ON chat_messages
+    FOR SELECT USING (
+        EXISTS (
+            SELECT 1 FROM chat_sessions 
+            WHERE chat_sessions.id = chat_messages.session_id 
+            AND chat_sessions.user_id = auth.uid()
+        )
+    );
+
+CREATE POLICY "Users can insert messages in own sessions" ON chat_messages
+    FOR INSERT WITH CHECK (
+        EXISTS (
+            SELECT 1 FROM chat_sessions 
+            WHERE chat_sessions.id = chat_messages.session_id 
+            AND chat_sessions.user_id = auth.uid()
+        )
+    );
+
+-- Legal chunks are readable by all authenticated users
+ALTER TABLE legal_chunks ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Authenticated users can read legal chunks" ON legal_chunks
+    FOR SELECT TO authenticated USING (true);
+"""
+
+
+# Keyset pagination indexes (list_user_sessions is defined in CHAT_TURN_SQL,
+# once the denormalized session stats exist)
+PAGINATION_SQL = """
+-- Keyset pagination: (updated_at, id) for sessions, (created_at, id) for messages
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_user_updated_id
+    ON chat_sessions(user_id, updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_chat_messages_session_created_id
+    ON chat_messages(session_id, created_at, id);
+"""
+
+
+# Tail-window history loader for agent context
+CONTEXT_WINDOW_SQL = """
+-- Context window: newest N messages (chronological) plus the session summary
+CREATE OR REPLACE FUNCTION get_context_window(
+    p_session_id UUID,
+    p_limit INT DEFAULT 10
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'summary', s.summary,
+        'messages', COALESCE((
+            SELECT jsonb_agg(to_jsonb(recent) ORDER BY recent.created_at, recent.id)
+            FROM (
+                SELECT m.id, m.role, m.content, m.metadata, m.created_at
+                FROM chat_messages m
+                WHERE m.session_id = s.id
+                ORDER BY m.created_at DESC, m.id DESC
+                LIMIT p_limit
+            ) recent
+        ), '[]'::jsonb)
+    )
+    FROM chat_sessions s
+    WHERE s.id = p_session_id;
+$$;
+"""
+
+
+# Single round-trip context load for /api/chat
+CHAT_CONTEXT_SQL = """
+-- Pre-run chat context: ownership check (or session creation), recent
+-- messages and summary in a single round trip
+CREATE OR REPLACE FUNCTION prepare_chat_context(
+    p_user_id UUID,
+    p_session_id UUID DEFAULT NULL,
+    p_limit INT DEFAULT 10
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_owner UUID;
+    v_session_id UUID := p_session_id;
+BEGIN
+    IF v_session_id IS NULL THEN
+        INSERT INTO chat_sessions (user_id, title)
+        VALUES (p_user_id, 'New Conversation')
+        RETURNING id INTO v_session_id;
+
+        RETURN jsonb_build_object(
+            'status', 'created',
+            'session_id', v_session_id,
+            'summary', NULL,
+            'messages', '[]'::jsonb
+        );
+    END IF;
+
+    SELECT s.user_id INTO v_owner
+    FROM chat_sessions s
+    WHERE s.id = v_session_id;
+
+    IF v_owner IS NULL THEN
+        RETURN jsonb_build_object('status', 'not_found', 'session_id', v_session_id);
+    END IF;
+
+    IF v_owner <> p_user_id THEN
+        RETURN jsonb_build_object('status', 'forbidden', 'session_id', v_session_id);
+    END IF;
+
+    RETURN get_context_window(v_session_id, p_limit)
+        || jsonb_build_object('status', 'ok', 'session_id', v_session_id);
+END;
+$$;
+"""
+
+
+# Batched turn persistence and denormalized session stats
+CHAT_TURN_SQL = """
+-- Denormalized per-session stats, maintained by statement-level triggers
+-- on chat_messages. The preview only moves forward in time, so replaying an
+-- older turn (write-behind spool) does not replace a newer preview.
+ALTER TABLE chat_sessions
+    ADD COLUMN IF NOT EXISTS message_count INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS last_message_preview TEXT,
+    ADD COLUMN IF NOT EXISTS last_message_at TIMESTAMPTZ;
+
+CREATE OR REPLACE FUNCTION maintain_session_message_stats()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE chat_sessions s
+        SET message_count = s.message_count + batch.inserted,
+            last_message_preview = CASE
+                WHEN s.last_message_at IS NULL OR batch.latest_at >= s.last_message_at
+                THEN batch.latest_preview
+                ELSE s.last_message_preview
+            END,
+            last_message_at = GREATEST(s.last_message_at, batch.latest_at)
+        FROM (
+            SELECT DISTINCT ON (n.session_id)
+                n.session_id,
+                count(*) OVER (PARTITION BY n.session_id) AS inserted,
+                n.created_at AS latest_at,
+                left(n.content, 100) AS latest_preview
+            FROM inserted_messages n
+            ORDER BY n.session_id, n.created_at DESC, n.id DESC
+        ) batch
+        WHERE s.id = batch.session_id;
+        RETURN NULL;
+    END IF;
+
+    UPDATE chat_sessions s
+    SET message_count = GREATEST(s.message_count - gone.deleted, 0),
+        last_message_preview = latest.preview,
+        last_message_at = latest.created_at
+    FROM (
+        SELECT o.session_id, count(*) AS deleted
+        FROM deleted_messages o
+        GROUP BY o.session_id
+    ) gone
+    LEFT JOIN LATERAL (
+        SELECT left(m.content, 100) AS preview, m.created_at
+        FROM chat_messages m
+        WHERE m.session_id = gone.session_id
+        ORDER BY m.created_at DESC, m.id DESC
+        LIMIT 1
+    ) latest ON TRUE
+    WHERE s.id = gone.session_id;
+    RETURN NULL;
+END;
+$$;
+
+-- Transition tables need one trigger per event
+DROP TRIGGER IF EXISTS trg_chat_messages_session_stats ON chat_messages;
+DROP TRIGGER IF EXISTS trg_chat_messages_session_stats_insert ON chat_messages;
+CREATE TRIGGER trg_chat_messages_session_stats_insert
+    AFTER INSERT ON chat_messages
+    REFERENCING NEW TABLE AS inserted_messages
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_session_message_stats();
+
+DROP TRIGGER IF EXISTS trg_chat_messages_session_stats_delete ON chat_messages;
+CREATE TRIGGER trg_chat_messages_session_stats_delete
+    AFTER DELETE ON chat_messages
+    REFERENCING OLD TABLE AS deleted_messages
+    FOR EACH STATEMENT EXECUTE FUNCTION maintain_session_message_stats();
+
+-- Backfill stats for sessions that predate the triggers
+UPDATE chat_sessions s
+SET message_count = (
+        SELECT count(*) FROM chat_messages m WHERE m.session_id = s.id
+    ),
+    last_message_preview = (
+        SELECT left(m.content, 100)
+        FROM chat_messages m
+        WHERE m.session_id = s.id
+        ORDER BY m.created_at DESC, m.id DESC
+        LIMIT 1
+    ),
+    last_message_at = (
+        SELECT max(m.created_at) FROM chat_messages m WHERE m.session_id = s.id
+    )
+-- Only sessions the triggers have not maintained yet, so reapplying the
+-- schema does not rewrite the whole table
+WHERE s.last_message_at IS NULL
+    AND EXISTS (SELECT 1 FROM chat_messages m WHERE m.session_id = s.id);
+
+-- Persist a whole chat turn (messages + session touch) in one transaction.
+-- Message IDs are client-generated, so replaying a turn is a no-op.
+CREATE OR REPLACE FUNCTION persist_chat_turn(
+    p_session_id UUID,
+    p_messages JSONB
+)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_inserted INT;
+    v_message_count INT;
+BEGIN
+    INSERT INTO chat_messages (id, session_id, role, content, metadata, created_at)
+    SELECT
+        COALESCE((m.value->>'id')::UUID, gen_random_uuid()),
+        p_session_id,
+        m.value->>'role',
+        m.value->>'content',
+        COALESCE(m.value->'metadata', '{}'::jsonb),
+        COALESCE((m.value->>'created_at')::TIMESTAMPTZ, NOW())
+    FROM jsonb_array_elements(p_messages) WITH ORDINALITY AS m(value, position)
+    ORDER BY m.position
+    ON CONFLICT (id) DO NOTHING;
+
+    GET DIAGNOSTICS v_inserted = ROW_COUNT;
+
+    -- Never move updated_at backwards when an older turn is replayed
+    UPDATE chat_sessions
+    SET updated_at = GREATEST(updated_at, (
+        SELECT max(COALESCE((m.value->>'created_at')::TIMESTAMPTZ, NOW()))
+        FROM jsonb_array_elements(p_messages) AS m(value)
+    ))
+    WHERE id = p_session_id
+    RETURNING message_count INTO v_message_count;
+
+    RETURN jsonb_build_object(
+        'inserted', v_inserted,
+        'message_count', v_message_count
+    );
+END;
+$$;
+
+-- List a user's sessions with message count and last message preview in
+-- one call, one keyset page at a time, from the denormalized columns.
+-- The one-argument signature predates pagination; dropping it keeps RPC
+-- calls with only p_user_id unambiguous on upgraded databases.
+DROP FUNCTION IF EXISTS list_user_sessions(UUID);
+
+CREATE OR REPLACE FUNCTION list_user_sessions(
+    p_user_id UUID,
+    p_limit INT DEFAULT 50,
+    p_cursor_updated_at TIMESTAMPTZ DEFAULT NULL,
+    p_cursor_id UUID DEFAULT NULL,
+    p_since TIMESTAMPTZ DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    message_count BIGINT,
+    last_message TEXT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        s.id,
+        s.title,
+        s.created_at,
+        s.updated_at,
+        s.message_count::BIGINT,
+        s.last_message_preview AS last_message
+    FROM chat_sessions s
+    WHERE s.user_id = p_user_id
+        AND (p_since IS NULL OR s.updated_at > p_since)
+        AND (
+            p_cursor_updated_at IS NULL
+            OR (s.updated_at, s.id) < (p_cursor_updated_at, p_cursor_id)
+        )
+    ORDER BY s.updated_at DESC, s.id DESC
+    LIMIT p_limit;
+$$;
+"""
+
+
+# Multi-session batch insert used by the write-behind message queue
+WRITE_BEHIND_SQL = """
+-- Write-behind flush: insert messages for many sessions at once and bump
+-- each session's updated_at. Messages of deleted sessions are dropped.
+CREATE OR REPLACE FUNCTION persist_chat_batch(p_messages JSONB)
+RETURNS JSONB
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_inserted INT;
+BEGIN
+    INSERT INTO chat_messages (id, session_id, role, content, metadata, created_at)
+    SELECT
+        (m.value->>'id')::UUID,
+        (m.value->>'session_id')::UUID,
+        m.value->>'role',
+        m.value->>'content',
+        COALESCE(m.value->'metadata', '{}'::jsonb),
+        COALESCE((m.value->>'created_at')::TIMESTAMPTZ, NOW())
+    FROM jsonb_array_elements(p_messages) WITH ORDINALITY AS m(value, position)
+    WHERE EXISTS (
+        SELECT 1 FROM chat_sessions s
+        WHERE s.id = (m.value->>'session_id')::UUID
+    )
+    ORDER BY m.position
+    ON CONFLICT (id) DO NOTHING;
+
+    GET DIAGNOSTICS v_inserted = ROW_COUNT;
+
+    UPDATE chat_sessions s
+    SET updated_at = GREATEST(s.updated_at, batch.last_message_at)
+    FROM (
+        SELECT
+            (value->>'session_id')::UUID AS session_id,
+            max(COALESCE((value->>'created_at')::TIMESTAMPTZ, NOW())) AS last_message_at
+        FROM jsonb_array_elements(p_messages)
+        GROUP BY 1
+    ) batch
+    WHERE s.id = batch.session_id;
+
+    RETURN jsonb_build_object('inserted', v_inserted);
+END;
+$$;
+"""
+
+
+# Vector search with ivfflat.probes / hnsw.ef_search parameters
+VECTOR_SEARCH_SQL = """
+-- Vector search with per-query recall/speed knobs. probes applies to an
+-- ivfflat index and ef_search to an HNSW one; both are transaction-local.
+-- The embedding index itself is managed by scripts/manage_vector_index.py.
+DROP FUNCTION IF EXISTS match_legal_chunks(vector, float, int, text);
+
 CREATE OR REPLACE FUNCTION match_legal_chunks(
     query_embedding vector(384),
     match_threshold float DEFAULT 0.5,
     match_count int DEFAULT 5,
+    filter_domain text DEFAULT NULL,
+    ivfflat_probes int DEFAULT NULL,
+    hnsw_ef_search int DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    content TEXT,
+    act_name TEXT,
+    section TEXT,
+    chapter TEXT,
+    source_url TEXT,
+    domain TEXT,
+    metadata JSONB,
+    similarity float
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF ivfflat_probes IS NOT NULL THEN
+        PERFORM set_config('ivfflat.probes', ivfflat_probes::text, true);
+    END IF;
+
+    IF hnsw_ef_search IS NOT NULL THEN
+        PERFORM set_config('hnsw.ef_search', hnsw_ef_search::text, true);
+    END IF;
+
+    -- nearest_legal_chunks routes domain filters to the domain's partial
+    -- index; the threshold then trims the top match_count rows
+    RETURN QUERY
+    SELECT
+        lc.id,
+        lc.content,
+        lc.act_name,
+        lc.section,
+        lc.chapter,
+        lc.source_url,
+        lc.domain,
+        lc.metadata,
+        1 - nearest.distance AS similarity
+    FROM nearest_legal_chunks(query_embedding, filter_domain, match_count) nearest
+    JOIN legal_chunks lc ON lc.id = nearest.id
+    WHERE 1 - nearest.distance > match_threshold
+    ORDER BY nearest.distance;
+END;
+$$;
+"""
+
+
+# Corpus version counter for retrieval cache invalidation
+CORPUS_VERSION_SQL = """
+-- Corpus version: bumped by ingestion and deletion so workers can drop
+-- cached retrieval results
+CREATE TABLE IF NOT EXISTS corpus_state (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO corpus_state (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+
+-- Readable by signed-in users; only the service role may change it
+ALTER TABLE corpus_state ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Authenticated users can read corpus state" ON corpus_state;
+CREATE POLICY "Authenticated users can read corpus state" ON corpus_state
+    FOR SELECT TO authenticated USING (true);
+
+CREATE OR REPLACE FUNCTION bump_corpus_version()
+RETURNS BIGINT
+LANGUAGE sql
+AS $$
+    UPDATE corpus_state
+    SET version = version + 1,
+        updated_at = NOW()
+    WHERE id
+    RETURNING version;
+$$;
+
+-- A bump drops every worker's caches, so it must not be callable with the anon key
+REVOKE EXECUTE ON FUNCTION bump_corpus_version() FROM PUBLIC, anon, authenticated;
+
+CREATE OR REPLACE FUNCTION get_corpus_version()
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT version FROM corpus_state WHERE id;
+$$;
+"""
+
+
+# Full-text index, keyword search and hybrid (RRF) search
+HYBRID_SEARCH_SQL = """
+-- Full-text search: weighted tsvector (act name and section rank above
+-- body text) with a GIN index
+ALTER TABLE legal_chunks
+    ADD COLUMN IF NOT EXISTS content_tsv tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(act_name, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(section, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(chapter, '')), 'B') ||
+        setweight(to_tsvector('english', content), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_legal_chunks_content_tsv
+    ON legal_chunks USING GIN (content_tsv);
+
+-- OR of the query's lexemes, so long enhanced queries still match chunks
+-- that contain only some of their words (ranking rewards those with more)
+CREATE OR REPLACE FUNCTION or_tsquery(query_text text)
+RETURNS tsquery
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT CASE
+        WHEN numnode(q) = 0 THEN q
+        ELSE replace(q::text, ' & ', ' | ')::tsquery
+    END
+    FROM plainto_tsquery('english', query_text) AS q;
+$$;
+
+-- Keyword search ranked by cover density; similarity is the rank
+-- normalized to 0..1
+CREATE OR REPLACE FUNCTION keyword_search_legal_chunks(
+    query_text text,
+    match_count int DEFAULT 5,
     filter_domain text DEFAULT NULL
 )
 RETURNS TABLE (
@@ -103,6 +595,8 @@ RETURNS TABLE (
 )
 LANGUAGE plpgsql
 AS $$
+DECLARE
+    v_query tsquery := or_tsquery(query_text);
 BEGIN
     RETURN QUERY
     SELECT
@@ -114,64 +608,436 @@ BEGIN
         lc.source_url,
         lc.domain,
         lc.metadata,
-        1 - (lc.embedding <=> query_embedding) AS similarity
+        ts_rank_cd(lc.content_tsv, v_query, 32)::float AS similarity
     FROM legal_chunks lc
-    WHERE 
-        (filter_domain IS NULL OR lc.domain = filter_domain)
-        AND 1 - (lc.embedding <=> query_embedding) > match_threshold
-    ORDER BY lc.embedding <=> query_embedding
+    WHERE
+        lc.content_tsv @@ v_query
+        AND (filter_domain IS NULL OR lc.domain = filter_domain)
+    ORDER BY ts_rank_cd(lc.content_tsv, v_query, 32) DESC
     LIMIT match_count;
 END;
 $$;
 
--- RLS Policies
-ALTER TABLE chat_sessions ENABLE ROW LEVEL SECURITY;
-ALTER TABLE chat_messages ENABLE ROW LEVEL SECURITY;
+-- Hybrid search: keyword and vector candidates fused with reciprocal rank
+-- fusion. similarity stays the cosine similarity so callers can compare
+-- it with vector-only results; rrf_score decides the order.
+CREATE OR REPLACE FUNCTION hybrid_search_legal_chunks(
+    query_text text,
+    query_embedding vector(384),
+    match_count int DEFAULT 5,
+    filter_domain text DEFAULT NULL,
+    match_threshold float DEFAULT 0.0,
+    full_text_weight float DEFAULT 1.0,
+    semantic_weight float DEFAULT 1.0,
+    rrf_k int DEFAULT 60,
+    ivfflat_probes int DEFAULT NULL,
+    hnsw_ef_search int DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    content TEXT,
+    act_name TEXT,
+    section TEXT,
+    chapter TEXT,
+    source_url TEXT,
+    domain TEXT,
+    metadata JSONB,
+    similarity float,
+    keyword_rank int,
+    semantic_rank int,
+    rrf_score float
+)
+LANGUAGE plpgsql
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_query tsquery := or_tsquery(query_text);
+    v_candidates int := GREATEST(match_count, 10) * 4;
+BEGIN
+    IF ivfflat_probes IS NOT NULL THEN
+        PERFORM set_config('ivfflat.probes', ivfflat_probes::text, true);
+    END IF;
 
--- Users can only see their own sessions
-CREATE POLICY "Users can view own sessions" ON chat_sessions
-    FOR SELECT USING (auth.uid() = user_id);
+    IF hnsw_ef_search IS NOT NULL THEN
+        PERFORM set_config('hnsw.ef_search', hnsw_ef_search::text, true);
+    END IF;
 
-CREATE POLICY "Users can insert own sessions" ON chat_sessions
-    FOR INSERT WITH CHECK (auth.uid() = user_id);
+    RETURN QUERY
+    WITH full_text AS (
+        SELECT
+            lc.id,
+            row_number() OVER (ORDER BY ts_rank_cd(lc.content_tsv, v_query, 32) DESC) AS rank_ix
+        FROM legal_chunks lc
+        WHERE
+            lc.content_tsv @@ v_query
+            AND (filter_domain IS NULL OR lc.domain = filter_domain)
+        ORDER BY rank_ix
+        LIMIT v_candidates
+    ),
+    semantic AS (
+        SELECT
+            nearest.id,
+            row_number() OVER (ORDER BY nearest.distance) AS rank_ix
+        FROM nearest_legal_chunks(query_embedding, filter_domain, v_candidates) nearest
+        WHERE 1 - nearest.distance > match_threshold
+    )
+    SELECT
+        lc.id,
+        lc.content,
+        lc.act_name,
+        lc.section,
+        lc.chapter,
+        lc.source_url,
+        lc.domain,
+        lc.metadata,
+        (1 - (lc.embedding <=> query_embedding))::float AS similarity,
+        ft.rank_ix::int AS keyword_rank,
+        sem.rank_ix::int AS semantic_rank,
+        (
+            COALESCE(full_text_weight / (rrf_k + ft.rank_ix), 0.0) +
+            COALESCE(semantic_weight / (rrf_k + sem.rank_ix), 0.0)
+        )::float AS rrf_score
+    FROM full_text ft
+    FULL OUTER JOIN semantic sem ON ft.id = sem.id
+    JOIN legal_chunks lc ON lc.id = COALESCE(ft.id, sem.id)
+    -- Keyword-only matches must clear the similarity threshold too
+    WHERE 1 - (lc.embedding <=> query_embedding) > match_threshold
+    ORDER BY rrf_score DESC
+    LIMIT match_count;
+END;
+$$;
+"""
 
-CREATE POLICY "Users can update own sessions" ON chat_sessions
-    FOR UPDATE USING (auth.uid() = user_id);
 
-CREATE POLICY "Users can delete own sessions" ON chat_sessions
-    FOR DELETE USING (auth.uid() = user_id);
+SECTION_LOOKUP_SQL = """
+-- Exact (act, section) lookup: normalized keys with a composite index, so
+-- citations resolve without embedding the query
+CREATE OR REPLACE FUNCTION normalize_act_key(act_name text)
+RETURNS text
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    -- "The Consumer Protection Act, 2019" -> "consumer protection act 2019"
+    SELECT nullif(
+        regexp_replace(
+            btrim(regexp_replace(lower(act_name), '[^a-z0-9]+', ' ', 'g')),
+            '^the ', ''
+        ),
+        ''
+    );
+$$;
 
--- Users can only see messages in their sessions
-CREATE POLICY "Users can view own messages" ON chat_messages
-    FOR SELECT USING (
-        EXISTS (
-            SELECT 1 FROM chat_sessions 
-            WHERE chat_sessions.id = chat_messages.session_id 
-            AND chat_sessions.user_id = auth.uid()
+CREATE OR REPLACE FUNCTION normalize_section_key(section text)
+RETURNS text
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    -- "Section 2 (7)" / "sec. 2(7)" / "S. 2(7)" -> "2(7)"
+    SELECT nullif(
+        regexp_replace(
+            regexp_replace(lower(section), '^\\s*(section|sec\\.?|s\\.)\\s*', ''),
+            '\\s+', '', 'g'
+        ),
+        ''
+    );
+$$;
+
+ALTER TABLE legal_chunks
+    ADD COLUMN IF NOT EXISTS act_key text
+    GENERATED ALWAYS AS (normalize_act_key(act_name)) STORED;
+
+ALTER TABLE legal_chunks
+    ADD COLUMN IF NOT EXISTS section_key text
+    GENERATED ALWAYS AS (normalize_section_key(section)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_legal_chunks_act_section
+    ON legal_chunks (act_key, section_key, created_at, id);
+
+-- Resolve many (act, section) pairs in one call. act_names and sections
+-- are parallel arrays; a NULL section matches the act's first chunk.
+-- Returns the first chunk of each matched pair, tagged with the
+-- requested values so callers can tell hits from misses
+CREATE OR REPLACE FUNCTION lookup_legal_sections(
+    act_names text[],
+    sections text[]
+)
+RETURNS TABLE (
+    requested_act text,
+    requested_section text,
+    id UUID,
+    content TEXT,
+    act_name TEXT,
+    section TEXT,
+    chapter TEXT,
+    source_url TEXT,
+    domain TEXT,
+    metadata JSONB
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        r.act,
+        r.section,
+        lc.id,
+        lc.content,
+        lc.act_name,
+        lc.section,
+        lc.chapter,
+        lc.source_url,
+        lc.domain,
+        lc.metadata
+    FROM unnest(act_names, sections) AS r(act, section)
+    CROSS JOIN LATERAL (
+        SELECT *
+        FROM legal_chunks c
+        WHERE c.act_key = normalize_act_key(r.act)
+          AND (r.section IS NULL OR c.section_key = normalize_section_key(r.section))
+        ORDER BY c.created_at, c.id
+        LIMIT 1
+    ) lc;
+$$;
+"""
+
+CORPUS_STATS_SQL = """
+-- Corpus statistics aggregated in one pass, for VectorStore.get_stats
+CREATE OR REPLACE FUNCTION legal_chunks_stats()
+RETURNS jsonb
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT jsonb_build_object(
+        'total_documents', (SELECT count(*) FROM legal_chunks),
+        'missing_embeddings', (SELECT count(*) FROM legal_chunks WHERE embedding IS NULL),
+        'avg_content_length', (SELECT round(avg(length(content)), 1) FROM legal_chunks),
+        'domains', (
+            SELECT coalesce(jsonb_object_agg(domain, n), '{}'::jsonb)
+            FROM (
+                SELECT coalesce(domain, 'unassigned') AS domain, count(*) AS n
+                FROM legal_chunks
+                GROUP BY 1
+            ) d
+        ),
+        'acts', (
+            SELECT coalesce(jsonb_object_agg(act_name, n), '{}'::jsonb)
+            FROM (
+                SELECT coalesce(act_name, 'unknown') AS act_name, count(*) AS n
+                FROM legal_chunks
+                GROUP BY 1
+            ) a
+        ),
+        'table_size_bytes', pg_table_size('legal_chunks'),
+        'index_size_bytes', pg_indexes_size('legal_chunks'),
+        'embedding_index_size_bytes', (
+            SELECT pg_relation_size(to_regclass('idx_legal_chunks_embedding'))
         )
     );
+$$;
+"""
 
-CREATE POLICY "Users can insert messages in own sessions" ON chat_messages
-    FOR INSERT WITH CHECK (
-        EXISTS (
-            SELECT 1 FROM chat_sessions 
-            WHERE chat_sessions.id = chat_messages.session_id 
-            AND chat_sessions.user_id = auth.uid()
+DOMAIN_ROUTING_SQL = """
+-- Nearest chunks by cosine distance, optionally within one domain.
+-- A domain filter is inlined as a literal through dynamic SQL, so the
+-- planner can pick that domain's partial index (created by
+-- scripts/manage_vector_index.py partition) and scan only its rows
+-- instead of post-filtering the global index. Domains without a partial
+-- index fall back to the global index plus a filter, as before.
+CREATE OR REPLACE FUNCTION nearest_legal_chunks(
+    query_embedding vector(384),
+    filter_domain text,
+    match_count int
+)
+RETURNS TABLE (
+    id UUID,
+    distance float
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+BEGIN
+    IF filter_domain IS NULL THEN
+        RETURN QUERY
+        SELECT lc.id, lc.embedding <=> query_embedding
+        FROM legal_chunks lc
+        ORDER BY lc.embedding <=> query_embedding
+        LIMIT match_count;
+    ELSE
+        RETURN QUERY EXECUTE format(
+            'SELECT id, embedding <=> $1 FROM legal_chunks '
+            'WHERE domain = %L ORDER BY embedding <=> $1 LIMIT $2',
+            filter_domain
         )
+        USING query_embedding, match_count;
+    END IF;
+END;
+$$;
+
+-- ivfflat list count of each domain's partial index. Search sizes
+-- ivfflat.probes from these for domain-filtered queries, since the
+-- partial indexes are built with fewer lists than the global index
+CREATE OR REPLACE FUNCTION legal_chunks_domain_index_lists()
+RETURNS TABLE (
+    domain text,
+    lists int
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT
+        -- Predicates deparse as (domain = 'name'::text), quotes doubled
+        replace(
+            (regexp_match(pg_get_expr(i.indpred, i.indrelid), '^[(]domain = ''(.*)''::text[)]$'))[1],
+            '''''', ''''
+        ),
+        (regexp_match(array_to_string(c.reloptions, ','), 'lists=([0-9]+)'))[1]::int
+    FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indexrelid
+    JOIN pg_am am ON am.oid = c.relam
+    WHERE i.indrelid = 'legal_chunks'::regclass
+      AND starts_with(c.relname, 'idx_legal_chunks_embedding_d_')
+      AND am.amname = 'ivfflat'
+$$;
+"""
+
+# Opt-in (schema_quantized.sql): only emitted for quantized VECTOR_STORAGE
+# or --quantized. Requires pgvector >= 0.7 for halfvec and binary_quantize.
+QUANTIZATION_SQL = """
+-- Quantized embedding copies: halfvec halves index
+-- size; bit(384) (sign of each dimension) shrinks it 32x and serves as a
+-- Hamming-distance prefilter whose candidates are re-scored exactly
+-- against the float32 embedding. The trigger keeps the copies in sync;
+-- scripts/migrate_quantized_embeddings.py backfills existing rows and
+-- builds the indexes concurrently.
+ALTER TABLE legal_chunks ADD COLUMN IF NOT EXISTS embedding_half halfvec(384);
+ALTER TABLE legal_chunks ADD COLUMN IF NOT EXISTS embedding_bit bit(384);
+
+CREATE OR REPLACE FUNCTION quantize_legal_chunk()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.embedding_half := NEW.embedding::halfvec(384);
+    NEW.embedding_bit := binary_quantize(NEW.embedding)::bit(384);
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS legal_chunks_quantize ON legal_chunks;
+CREATE TRIGGER legal_chunks_quantize
+    BEFORE INSERT OR UPDATE OF embedding ON legal_chunks
+    FOR EACH ROW EXECUTE FUNCTION quantize_legal_chunk();
+
+-- Approximate search on a quantized column, then exact cosine re-scoring
+-- of the top rescore_candidates rows. storage is 'halfvec' or 'bit'.
+CREATE OR REPLACE FUNCTION match_legal_chunks_quantized(
+    query_embedding vector(384),
+    match_threshold float DEFAULT 0.5,
+    match_count int DEFAULT 5,
+    filter_domain text DEFAULT NULL,
+    storage text DEFAULT 'bit',
+    rescore_candidates int DEFAULT 100,
+    hnsw_ef_search int DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    content TEXT,
+    act_name TEXT,
+    section TEXT,
+    chapter TEXT,
+    source_url TEXT,
+    domain TEXT,
+    metadata JSONB,
+    similarity float
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_candidates int := GREATEST(rescore_candidates, match_count);
+    v_ids uuid[];
+BEGIN
+    -- HNSW returns at most ef_search rows per scan
+    PERFORM set_config(
+        'hnsw.ef_search',
+        -- 1000 is the largest value pgvector accepts
+        LEAST(GREATEST(COALESCE(hnsw_ef_search, 40), v_candidates), 1000)::text,
+        true
     );
 
--- Legal chunks are readable by all authenticated users
-ALTER TABLE legal_chunks ENABLE ROW LEVEL SECURITY;
+    IF storage = 'halfvec' THEN
+        SELECT array_agg(c.id) INTO v_ids
+        FROM (
+            SELECT lc.id
+            FROM legal_chunks lc
+            WHERE filter_domain IS NULL OR lc.domain = filter_domain
+            ORDER BY lc.embedding_half <=> query_embedding::halfvec(384)
+            LIMIT v_candidates
+        ) c;
+    ELSIF storage = 'bit' THEN
+        SELECT array_agg(c.id) INTO v_ids
+        FROM (
+            SELECT lc.id
+            FROM legal_chunks lc
+            WHERE filter_domain IS NULL OR lc.domain = filter_domain
+            ORDER BY lc.embedding_bit <~> binary_quantize(query_embedding)::bit(384)
+            LIMIT v_candidates
+        ) c;
+    ELSE
+        RAISE EXCEPTION 'Unknown embedding storage: %', storage;
+    END IF;
 
-CREATE POLICY "Authenticated users can read legal chunks" ON legal_chunks
-    FOR SELECT TO authenticated USING (true);
+    RETURN QUERY
+    SELECT
+        lc.id,
+        lc.content,
+        lc.act_name,
+        lc.section,
+        lc.chapter,
+        lc.source_url,
+        lc.domain,
+        lc.metadata,
+        1 - (lc.embedding <=> query_embedding) AS similarity
+    FROM legal_chunks lc
+    WHERE
+        lc.id = ANY(v_ids)
+        AND 1 - (lc.embedding <=> query_embedding) > match_threshold
+    ORDER BY lc.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
 """
 
+# Statements in the order they must be applied
+SETUP_SQL = [
+    CREATE_TABLES_SQL,
+    PAGINATION_SQL,
+    CONTEXT_WINDOW_SQL,
+    CHAT_CONTEXT_SQL,
+    CHAT_TURN_SQL,
+    WRITE_BEHIND_SQL,
+    VECTOR_SEARCH_SQL,
+    CORPUS_VERSION_SQL,
+    HYBRID_SEARCH_SQL,
+    SECTION_LOOKUP_SQL,
+    CORPUS_STATS_SQL,
+    DOMAIN_ROUTING_SQL,
+]
+
+
+def setup_database(quantized: bool = False):
+    """
+    Set up database tables and functions.
 
-def setup_database():
-    """Set up database tables and functions."""
+    Args:
+        quantized: Also emit the quantized embedding storage block; implied
+            when VECTOR_STORAGE is halfvec or bit
+    """
     setup_logger()
     logger.info("Starting database setup...")
+
+    statements = list(SETUP_SQL)
+    if quantized or settings.vector_storage != "float32":
+        logger.info("Including quantized embedding storage (requires pgvector >= 0.7)")
+        statements.append(QUANTIZATION_SQL)
     
     try:
         # Note: In Supabase, you typically run SQL through the dashboard
@@ -180,7 +1046,8 @@ def setup_database():
         logger.info("Database setup SQL generated.")
         logger.info("Please run the following SQL in your Supabase SQL Editor:")
         print("\n" + "="*60)
-        print(CREATE_TABLES_SQL)
+        for statement in statements:
+            print(statement)
         print("="*60 + "\n")
         
         logger.info("Database setup instructions complete.")
@@ -191,4 +1058,12 @@ def setup_database():
 
 
 if __name__ == "__main__":
-    setup_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Print the database setup SQL")
+    parser.add_argument(
+        "--quantized",
+        action="store_true",
+        help="Include halfvec/bit embedding storage (pgvector >= 0.7)"
+    )
+    args = parser.parse_args()
+
+    setup_database(quantized=args.quantized)
\ No newline at end of file
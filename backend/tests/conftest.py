@@ -0,0 +1,11 @@
+"""
+Shared test configuration.
+Settings require Supabase credentials at import time; the unit tests
+never reach Supabase, so placeholders are enough.
+"""
+
+import os
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-anon-key")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-service-key")
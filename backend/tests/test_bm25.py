@@ -0,0 +1,77 @@
+"""Tests for the local BM25 index."""
+
+import pytest
+
+from app.rag.bm25 import BM25Index, tokenize
+
+
+CHUNKS = [
+    {
+        "id": "c1",
+        "content": "A consumer may file a complaint before the District Commission.",
+        "act_name": "Consumer Protection Act, 2019",
+        "section": "35",
+        "domain": "consumer",
+        "metadata": {"source": "cpa.pdf"}
+    },
+    {
+        "id": "c2",
+        "content": "Wages shall be paid before the expiry of the seventh day.",
+        "act_name": "Payment of Wages Act, 1936",
+        "section": "5",
+        "domain": "labour",
+        "source": "wages.pdf"
+    },
+    {
+        "id": "c3",
+        "content": "The complaint shall be decided within three months of notice.",
+        "act_name": "Consumer Protection Act, 2019",
+        "section": "38",
+        "domain": "consumer",
+        "metadata": '{"source": "cpa.pdf"}'
+    },
+]
+
+
+@pytest.fixture
+def index():
+    return BM25Index.build(CHUNKS)
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("The Consumer-Protection Act, 2019!") == ["consumer", "protection", "act", "2019"]
+
+
+def test_search_ranks_matching_chunks(index):
+    results = index.search("consumer complaint district commission", k=5)
+
+    assert [doc["id"] for doc in results] == ["c1", "c3"]
+    assert results[0]["bm25_score"] > results[1]["bm25_score"] > 0
+    assert 0 < results[0]["score"] < 1
+    assert results[0]["metadata"] == {"source": "cpa.pdf"}
+    assert index.search("unrelated arbitration", k=5) == []
+
+
+def test_act_and_section_are_indexed_with_the_body(index):
+    results = index.search("payment wages act", k=1)
+
+    assert results[0]["id"] == "c2"
+    # TextChunker output carries metadata as extra keys
+    assert results[0]["metadata"] == {"source": "wages.pdf"}
+
+
+def test_domain_filter(index):
+    assert [doc["id"] for doc in index.search("shall paid", filter_domain="consumer")] == ["c3"]
+    assert index.search("complaint", filter_domain="family") == []
+
+
+def test_save_and_load_round_trip(index, tmp_path):
+    path = str(tmp_path / "bm25" / "index.npz")
+    index.save(path)
+
+    loaded = BM25Index.load(path)
+
+    assert len(loaded) == len(index)
+    assert loaded.stats()["terms"] == index.stats()["terms"]
+    for query in ("consumer complaint", "wages seventh day"):
+        assert loaded.search(query) == index.search(query)
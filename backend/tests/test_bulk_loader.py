@@ -0,0 +1,79 @@
+"""Tests for the COPY row encoders."""
+
+from datetime import date
+import json
+import struct
+
+import numpy as np
+
+from app.db.bulk_loader import COPY_COLUMNS, encode_binary_rows, encode_text_rows
+from app.db.vector_index import metadata_json
+
+
+def make_doc(**fields):
+    return {
+        "content": "Line one\nTab\there \\ backslash",
+        "embedding": [0.1, -0.25, 1e-7],
+        "act_name": "Consumer Protection Act, 2019",
+        "section": "35",
+        "chapter": None,
+        "source_url": "https://example.com/cpa",
+        "domain": "consumer",
+        "metadata": {"source": "cpa.pdf", "enacted": date(2019, 8, 9)},
+        **fields
+    }
+
+
+def read_binary_rows(data: bytes):
+    assert data.startswith(b"PGCOPY\n\xff\r\n\x00")
+    offset = 19
+    rows = []
+    while True:
+        (field_count,) = struct.unpack_from("!h", data, offset)
+        offset += 2
+        if field_count == -1:
+            break
+        fields = []
+        for _ in range(field_count):
+            (length,) = struct.unpack_from("!i", data, offset)
+            offset += 4
+            if length == -1:
+                fields.append(None)
+            else:
+                fields.append(data[offset:offset + length])
+                offset += length
+        rows.append(fields)
+    assert offset == len(data)
+    return rows
+
+
+def test_text_rows_escape_values_and_mark_nulls():
+    fields = encode_text_rows([make_doc()]).rstrip("\n").split("\t")
+
+    assert len(fields) == len(COPY_COLUMNS)
+    assert fields[0] == "Line one\\nTab\\there \\\\ backslash"
+    assert fields[1] == "[0.1,-0.25,1e-07]"
+    assert fields[4] == "\\N"
+    assert json.loads(fields[7]) == {"source": "cpa.pdf", "enacted": "2019-08-09"}
+
+
+def test_binary_rows_use_pgvector_and_jsonb_encodings():
+    (row,) = read_binary_rows(encode_binary_rows([make_doc()]))
+
+    assert row[0].decode("utf-8") == make_doc()["content"]
+    dimensions, unused = struct.unpack_from("!hh", row[1])
+    assert (dimensions, unused) == (3, 0)
+    values = struct.unpack_from("!3f", row[1], 4)
+    assert np.allclose(values, np.float32(make_doc()["embedding"]))
+    assert row[4] is None
+    assert row[7][:1] == b"\x01"
+    assert json.loads(row[7][1:]) == {"source": "cpa.pdf", "enacted": "2019-08-09"}
+
+
+def test_both_formats_store_the_same_metadata_as_rest():
+    doc = make_doc(metadata=None)
+    text_metadata = encode_text_rows([doc]).rstrip("\n").split("\t")[7]
+    (row,) = read_binary_rows(encode_binary_rows([doc]))
+
+    assert text_metadata == metadata_json(None) == "{}"
+    assert row[7][1:].decode("utf-8") == metadata_json(None)
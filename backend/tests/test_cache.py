@@ -0,0 +1,57 @@
+"""Tests for the in-process TTL/LRU cache."""
+
+from app.utils import cache as cache_module
+from app.utils.cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    cache = TTLCache(max_size=10, ttl=5.0)
+
+    cache.set("default", 1)
+    cache.set("short", 2, ttl=1.0)
+    cache.set("forever", 3)
+    clock.now += 2.0
+
+    assert cache.get("short") is None
+    assert cache.get("default") == 1
+
+    clock.now += 4.0
+    assert cache.get("default") is None
+    assert cache.stats()["expirations"] == 2
+
+
+def test_stats_and_delete():
+    cache = TTLCache(max_size=10)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("missing", "fallback") == "fallback"
+    cache.delete("a")
+    assert len(cache) == 0
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
@@ -0,0 +1,16 @@
+"""Tests for settings validation."""
+
+from pydantic import ValidationError
+import pytest
+
+from app.config import Settings
+
+
+@pytest.mark.parametrize("candidates", [0, 1001])
+def test_rescore_candidates_stay_within_ef_search_limit(candidates):
+    with pytest.raises(ValidationError):
+        Settings(quantized_rescore_candidates=candidates)
+
+
+def test_rescore_candidates_default():
+    assert Settings().quantized_rescore_candidates == 100
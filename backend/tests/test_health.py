@@ -0,0 +1,49 @@
+"""Tests for the health endpoints."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import health
+from app.api.auth import get_current_user
+
+
+def make_client(monkeypatch):
+    class FakeVectorStore:
+        async def get_stats(self):
+            return {"total_chunks": 3}
+
+    monkeypatch.setattr(health, "VectorStore", FakeVectorStore)
+
+    app = FastAPI()
+    app.include_router(health.router)
+    return app, TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/health/corpus", "/health/metrics"])
+def test_internal_stats_require_a_user(monkeypatch, path):
+    _, client = make_client(monkeypatch)
+
+    assert client.get(path).status_code == 422
+    assert client.get(path, headers={"Authorization": "Basic abc"}).status_code == 401
+
+
+def test_corpus_stats_for_a_signed_in_user(monkeypatch):
+    app, client = make_client(monkeypatch)
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user-1"}
+
+    response = client.get("/health/corpus")
+
+    assert response.status_code == 200
+    assert response.json() == {"total_chunks": 3}
+
+
+def test_pool_metrics_for_a_signed_in_user(monkeypatch):
+    app, client = make_client(monkeypatch)
+    app.dependency_overrides[get_current_user] = lambda: {"id": "user-1"}
+    monkeypatch.setattr(health, "get_pool_stats", lambda: {"service": {"requests_total": 2}})
+
+    response = client.get("/health/metrics")
+
+    assert response.status_code == 200
+    assert response.json()["supabase_pools"] == {"service": {"requests_total": 2}}
@@ -0,0 +1,86 @@
+"""Tests for the in-process vector index mirror."""
+
+import pytest
+
+from app.rag.local_index import LocalVectorIndex
+
+
+class FakeChunkRepository:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def list_page(self, after=None, limit=1000):
+        rows = sorted(self.rows, key=lambda row: (row["created_at"], row["id"]))
+        if after:
+            rows = [row for row in rows if (row["created_at"], row["id"]) > tuple(after)]
+        return rows[:limit]
+
+    async def count(self, embedded_only=False):
+        if embedded_only:
+            return sum(1 for row in self.rows if row["embedding"] is not None)
+        return len(self.rows)
+
+
+def chunk(number, embedding, domain="consumer"):
+    return {
+        "id": f"chunk-{number:03d}",
+        "created_at": f"2024-01-01T00:00:{number:02d}+00:00",
+        "content": f"Chunk {number}",
+        "embedding": embedding,
+        "act_name": "Consumer Protection Act, 2019",
+        "section": str(number),
+        "chapter": None,
+        "source_url": None,
+        "domain": domain,
+        "metadata": '{"source": "cpa.pdf"}'
+    }
+
+
+@pytest.fixture
+def repository():
+    return FakeChunkRepository([
+        chunk(1, [1.0, 0.0, 0.0]),
+        chunk(2, "[0,1,0]", domain="labour"),
+        chunk(3, None)
+    ])
+
+
+@pytest.fixture
+def index(repository):
+    index = LocalVectorIndex(page_size=2)
+    index._repository = repository
+    return index
+
+
+@pytest.mark.asyncio
+async def test_load_skips_rows_without_embeddings(index):
+    assert await index.load() == 2
+
+    results = index.search([0.9, 0.1, 0.0], k=2, threshold=0.0)
+    assert [doc["id"] for doc in results] == ["chunk-001", "chunk-002"]
+    assert results[0]["metadata"] == {"source": "cpa.pdf"}
+    assert index.search([0.0, 1.0, 0.0], k=2, filter_domain="consumer", threshold=0.5) == []
+
+
+@pytest.mark.asyncio
+async def test_refresh_adds_new_rows_without_reloading(index, repository):
+    await index.load()
+
+    repository.rows.append(chunk(4, [0.0, 0.0, 2.0]))
+    assert await index.refresh() == 1
+    assert await index.refresh() == 0
+
+    assert len(index) == 3
+    assert index.full_reloads == 1
+    assert index.search([0.0, 0.0, 1.0], k=1)[0]["id"] == "chunk-004"
+
+
+@pytest.mark.asyncio
+async def test_refresh_reloads_after_deletes(index, repository):
+    await index.load()
+
+    repository.rows = [row for row in repository.rows if row["id"] != "chunk-001"]
+    await index.refresh()
+
+    assert len(index) == 1
+    assert index.full_reloads == 2
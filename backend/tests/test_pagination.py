@@ -0,0 +1,69 @@
+"""Tests for keyset pagination cursors and filters."""
+
+import pytest
+
+from app.db.pagination import decode_cursor, encode_cursor, keyset_filter, next_cursor
+
+
+def test_cursor_round_trip():
+    key = ("2024-05-01T10:00:00.123456+00:00", "6f1c1a52-0000-4000-8000-000000000001")
+
+    cursor = encode_cursor(*key)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == key
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", encode_cursor("a", "b")[:-3]])
+def test_decode_rejects_malformed_cursor(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_decode_rejects_non_string_key():
+    import base64
+    cursor = base64.urlsafe_b64encode(b"[1,2]").decode().rstrip("=")
+
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.parametrize("key", [
+    ("2024-05-01T10:00:00+00:00", 'x,id.gt.0'),
+    ('2024-05-01",id.neq."x', "6f1c1a52-0000-4000-8000-000000000001"),
+    ("yesterday", "6f1c1a52-0000-4000-8000-000000000001"),
+])
+def test_decode_rejects_decodable_but_invalid_key(key):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(*key))
+
+
+def test_decode_accepts_postgres_timestamp_forms():
+    row_id = "6f1c1a52-0000-4000-8000-000000000001"
+
+    for timestamp in ("2024-05-01T10:00:00.12345+00:00", "2024-05-01T10:00:00Z"):
+        assert decode_cursor(encode_cursor(timestamp, row_id)) == (timestamp, row_id)
+
+
+def test_keyset_filter_ascending_and_descending():
+    key = ("2024-05-01T10:00:00+00:00", "abc")
+
+    assert keyset_filter("created_at", key) == (
+        'created_at.gt."2024-05-01T10:00:00+00:00",'
+        'and(created_at.eq."2024-05-01T10:00:00+00:00",id.gt."abc")'
+    )
+    assert keyset_filter("created_at", key, descending=True).startswith('created_at.lt.')
+    assert 'id.lt."abc"' in keyset_filter("created_at", key, descending=True)
+
+
+def test_next_cursor_only_for_full_pages():
+    rows = [
+        {"id": f"6f1c1a52-0000-4000-8000-00000000000{i}", "created_at": f"2024-05-01T10:00:0{i}+00:00"}
+        for i in range(3)
+    ]
+
+    assert next_cursor(rows, 4, "created_at") is None
+    assert next_cursor([], 0, "created_at") is None
+    assert decode_cursor(next_cursor(rows, 3, "created_at")) == (
+        "2024-05-01T10:00:02+00:00", "6f1c1a52-0000-4000-8000-000000000002"
+    )
@@ -0,0 +1,70 @@
+"""Tests for the cross-encoder reranker's latency budget and score cache."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.rag.reranker import CrossEncoderReranker
+
+
+class SlowModel:
+    """Stands in for CrossEncoder; scores by content length after a delay."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.calls = 0
+
+    def predict(self, pairs, **kwargs):
+        self.calls += 1
+        time.sleep(self.delay)
+        return [float(len(content)) for _, content in pairs]
+
+
+def make_documents():
+    return [
+        {"id": "a", "content": "x", "score": 0.9},
+        {"id": "b", "content": "xxx", "score": 0.8},
+        {"id": "c", "content": "xx", "score": 0.7},
+    ]
+
+
+@pytest.fixture
+def reranker():
+    reranker = CrossEncoderReranker(timeout=0.05)
+    yield reranker
+    reranker.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_timeout_keeps_retrieval_order_then_serves_from_cache(reranker):
+    model = SlowModel(delay=0.3)
+    reranker._model = model
+    documents = make_documents()
+
+    result = await reranker.rerank("bail application", documents, top_k=2)
+
+    assert result == make_documents()[:2]
+    assert reranker.timeouts == 1
+
+    # Wait for the abandoned pass to finish on the reranker thread
+    await asyncio.get_running_loop().run_in_executor(reranker._executor, lambda: None)
+    assert model.calls == 1
+
+    result = await reranker.rerank("Bail application", make_documents(), top_k=2)
+
+    assert [doc["id"] for doc in result] == ["b", "c"]
+    assert [doc["rerank_score"] for doc in result] == [3.0, 2.0]
+    assert model.calls == 1
+    assert reranker.timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_single_document_is_not_scored(reranker):
+    model = SlowModel(delay=0.0)
+    reranker._model = model
+
+    result = await reranker.rerank("bail application", make_documents()[:1], top_k=5)
+
+    assert [doc["id"] for doc in result] == ["a"]
+    assert model.calls == 0
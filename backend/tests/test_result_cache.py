@@ -0,0 +1,101 @@
+"""Tests for the corpus-versioned retrieval result cache."""
+
+import pytest
+
+from app.rag import result_cache as result_cache_module
+from app.rag import retriever as retriever_module
+from app.rag.result_cache import RetrievalCache
+from app.rag.retriever import LegalDocumentRetriever
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeChunkRepository:
+    def __init__(self, version=1):
+        self.version = version
+
+    async def corpus_version(self):
+        return self.version
+
+
+class CountingVectorStore:
+    def __init__(self):
+        self.calls = 0
+
+    async def search(self, query, k, filter_domain, threshold, mode):
+        self.calls += 1
+        return [{"id": "c1", "content": "Section 1", "score": 0.9}]
+
+
+def make_cache(repository, version_check_seconds=30.0):
+    cache = RetrievalCache(max_size=10, ttl=600.0, version_check_seconds=version_check_seconds)
+    cache._repository = repository
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_version_bump_drops_entries_after_check_interval(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(result_cache_module.time, "monotonic", clock)
+    repository = FakeChunkRepository(version=1)
+    cache = make_cache(repository)
+    key = cache.key("retrieve", "bail application", None, 5)
+
+    assert await cache.get(key) is None
+    await cache.set(key, [{"id": "c1"}])
+
+    # Another worker bumps the version; it is only read after the interval
+    repository.version = 2
+    clock.now += 10.0
+    assert await cache.get(key) == [{"id": "c1"}]
+
+    clock.now += 25.0
+    assert await cache.get(key) is None
+    assert cache.invalidations == 1
+    assert cache.stats()["corpus_version"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cached_documents_are_copies():
+    cache = make_cache(FakeChunkRepository())
+    key = cache.key("retrieve", "bail application", None, 5)
+    documents = [{"id": "c1", "metadata": {"act": "CrPC"}}]
+
+    await cache.set(key, documents)
+    documents[0]["metadata"]["act"] = "changed by caller"
+
+    returned = await cache.get(key)
+    returned[0]["metadata"]["act"] = "changed again"
+    returned.append({"id": "c2"})
+
+    assert await cache.get(key) == [{"id": "c1", "metadata": {"act": "CrPC"}}]
+
+
+def test_key_normalizes_query_text():
+    assert RetrievalCache.key("retrieve", "  Bail   APPLICATION ", "criminal", 5) == \
+        RetrievalCache.key("retrieve", "bail application", "criminal", 5)
+
+
+@pytest.mark.asyncio
+async def test_retrieve_key_covers_k_mode_and_domain(monkeypatch):
+    cache = make_cache(FakeChunkRepository())
+    monkeypatch.setattr(retriever_module, "get_retrieval_cache", lambda: cache)
+    monkeypatch.setattr(retriever_module.settings, "rerank_enabled", False)
+    retriever = LegalDocumentRetriever()
+    retriever.vector_store = CountingVectorStore()
+
+    await retriever.retrieve("bail application", domain="criminal", k=5, mode="vector")
+    await retriever.retrieve("Bail  application", domain="criminal", k=5, mode="vector")
+    assert retriever.vector_store.calls == 1
+
+    await retriever.retrieve("bail application", domain="criminal", k=3, mode="vector")
+    await retriever.retrieve("bail application", domain="criminal", k=5, mode="hybrid")
+    await retriever.retrieve("bail application", domain="civil", k=5, mode="vector")
+    await retriever.retrieve("bail application", domain=None, k=5, mode="vector")
+    assert retriever.vector_store.calls == 5
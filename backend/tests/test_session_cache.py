@@ -0,0 +1,55 @@
+"""Tests for the session metadata cache."""
+
+import pytest
+
+from app.db.session_cache import MemorySessionCacheBackend, SessionCache
+
+
+class CountingBackend(MemorySessionCacheBackend):
+    def __init__(self):
+        super().__init__(max_size=100, ttl=60)
+        self.writes = 0
+
+    async def set(self, session_id, entry):
+        self.writes += 1
+        await super().set(session_id, entry)
+
+    async def set_many(self, entries):
+        self.writes += 1
+        await super().set_many(entries)
+
+
+def session_row(session_id, **fields):
+    return {
+        "id": session_id,
+        "user_id": "user-1",
+        "title": f"Session {session_id}",
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "message_count": 3,
+        **fields
+    }
+
+
+@pytest.mark.asyncio
+async def test_remember_many_writes_a_page_in_one_call():
+    backend = CountingBackend()
+    cache = SessionCache(backend, repository=object())
+
+    await cache.remember_many([session_row("a"), session_row("b"), session_row("c", title=None)])
+
+    assert backend.writes == 1
+    assert await cache.peek("a") == {
+        "user_id": "user-1",
+        "title": "Session a",
+        "created_at": "2024-01-01T00:00:00+00:00"
+    }
+    assert await cache.peek("b") is not None
+    assert await cache.peek("c") is None
+
+
+@pytest.mark.asyncio
+async def test_remember_many_skips_empty_pages():
+    backend = CountingBackend()
+    await SessionCache(backend, repository=object()).remember_many([])
+
+    assert backend.writes == 0
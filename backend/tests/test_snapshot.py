@@ -0,0 +1,80 @@
+"""Tests for the embedding snapshot format."""
+
+import uuid
+
+import numpy as np
+import pytest
+
+from app.rag.local_index import LocalVectorIndex
+from app.rag.snapshot import Snapshot, SnapshotError, write_snapshot
+
+
+IDS = [str(uuid.UUID(int=number)) for number in range(1, 4)]
+WATERMARK = ("2024-01-01T00:00:03+00:00", IDS[-1])
+
+
+def columns():
+    return {
+        "content": ["Section 35 complaint", "Wages are due", "Unicode: धारा 35"],
+        "metadata": ['{"source": "cpa.pdf"}', {"source": "wages.pdf"}, None],
+        "act_name": ["Consumer Protection Act, 2019", "Payment of Wages Act", "Consumer Protection Act, 2019"],
+        "section": ["35", "5", None],
+        "chapter": [None, None, None],
+        "domain": ["consumer", "labour", "consumer"],
+        "source_url": [None, "https://example.com/wages", None],
+    }
+
+
+def embeddings(dtype="float32"):
+    matrix = np.asarray([[1, 0, 0], [0, 1, 0], [0.6, 0.8, 0]], dtype=dtype)
+    return matrix
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float16"])
+def test_snapshot_round_trip(tmp_path, dtype):
+    path = str(tmp_path / "chunks.snap")
+    header = write_snapshot(path, embeddings(dtype), IDS, columns(), WATERMARK)
+
+    snapshot = Snapshot(path)
+
+    assert header["rows"] == snapshot.header["rows"] == 3
+    assert snapshot.embeddings.dtype == np.dtype(dtype)
+    assert np.array_equal(snapshot.embeddings, embeddings(dtype))
+    assert list(snapshot.ids) == IDS
+    assert snapshot.watermark == WATERMARK
+    assert list(snapshot.columns["content"]) == columns()["content"]
+    assert list(snapshot.columns["metadata"]) == ['{"source": "cpa.pdf"}', '{"source": "wages.pdf"}', "{}"]
+    for column in ("act_name", "section", "chapter", "domain", "source_url"):
+        assert list(snapshot.columns[column]) == columns()[column]
+
+
+def test_local_index_searches_an_exported_snapshot(tmp_path):
+    path = str(tmp_path / "chunks.snap")
+    write_snapshot(path, embeddings(), IDS, columns(), WATERMARK)
+
+    index = LocalVectorIndex.from_snapshot(path)
+    results = index.search([0.0, 1.0, 0.0], k=2, threshold=0.0)
+
+    assert [doc["id"] for doc in results] == [IDS[1], IDS[2]]
+    assert results[0]["metadata"] == {"source": "wages.pdf"}
+    assert [doc["id"] for doc in index.search([0.1, 1.0, 0.0], k=3, filter_domain="consumer", threshold=0.0)] == [IDS[2], IDS[0]]
+
+    copy_path = str(tmp_path / "copy.snap")
+    index.export_snapshot(copy_path)
+    copy = Snapshot(copy_path)
+    assert list(copy.ids) == IDS
+    assert copy.watermark == WATERMARK
+
+
+def test_invalid_and_truncated_files_are_rejected(tmp_path):
+    path = tmp_path / "chunks.snap"
+    write_snapshot(str(path), embeddings(), IDS, columns())
+
+    data = path.read_bytes()
+    path.write_bytes(data[:-8])
+    with pytest.raises(SnapshotError):
+        Snapshot(str(path))
+
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(SnapshotError):
+        Snapshot(str(path))
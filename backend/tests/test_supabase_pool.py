@@ -0,0 +1,54 @@
+"""Tests for the pooled Supabase client registry."""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.db.supabase import SERVICE_ROLE, SupabaseClientRegistry
+
+
+@pytest.mark.asyncio
+async def test_attach_async_pool_closes_replaced_session():
+    registry = SupabaseClientRegistry()
+    original = httpx.AsyncClient(base_url="http://localhost:54321/rest/v1")
+    client = SimpleNamespace(postgrest=SimpleNamespace(session=original))
+
+    await registry._attach_async_pool(SERVICE_ROLE, client)
+
+    assert original.is_closed
+    assert client.postgrest.session is not original
+    assert client.postgrest.session._transport is registry._async_transports[SERVICE_ROLE]
+
+    # Already pooled: the session is kept
+    pooled = client.postgrest.session
+    await registry._attach_async_pool(SERVICE_ROLE, client)
+    assert client.postgrest.session is pooled
+
+    await pooled.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_async_creates_one_client_under_concurrency(monkeypatch):
+    registry = SupabaseClientRegistry()
+    created = []
+
+    async def fake_acreate_client(url, key):
+        await asyncio.sleep(0)
+        client = SimpleNamespace(postgrest=SimpleNamespace(
+            session=httpx.AsyncClient(base_url="http://localhost:54321/rest/v1")
+        ))
+        created.append(client)
+        return client
+
+    monkeypatch.setattr("app.db.supabase.acreate_client", fake_acreate_client)
+
+    clients = await asyncio.gather(*(
+        registry.get_async(SERVICE_ROLE) for _ in range(5)
+    ))
+
+    assert len(created) == 1
+    assert all(client is created[0] for client in clients)
+
+    await registry.close()
@@ -0,0 +1,145 @@
+"""Tests for local JWT verification and the revocation check."""
+
+from types import SimpleNamespace
+import time
+
+import pytest
+from gotrue.errors import AuthApiError
+from jose import jwt
+
+from app.api import token_verifier as verifier_module
+from app.api.token_verifier import InvalidTokenError, TokenVerifier, is_trusted_jwt_secret
+from app.config import settings
+
+
+SECRET = "Ux3f9Qk2LmZp7Rv1Tn8Wc5Yh0Jd4Bg6Es2Ha7Kq9"
+
+
+def make_token_with(secret, **claims):
+    payload = {
+        "sub": "user-1",
+        "email": "user@example.com",
+        "aud": "authenticated",
+        "exp": int(time.time()) + 3600,
+        **claims
+    }
+    return jwt.encode(payload, secret, algorithm="HS256")
+
+
+def make_token(**claims):
+    return make_token_with(SECRET, **claims)
+
+
+class FakeAuth:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+
+    async def get_user(self, token):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return SimpleNamespace(user=SimpleNamespace(
+            id="user-1", email="user@example.com", user_metadata={"full_name": "Test User"}
+        ))
+
+
+@pytest.fixture
+def auth(monkeypatch):
+    fake = FakeAuth()
+
+    async def get_client():
+        return SimpleNamespace(auth=fake)
+
+    async def no_sleep(seconds):
+        return None
+
+    monkeypatch.setattr(settings, "jwt_secret", SECRET)
+    monkeypatch.setattr(settings, "auth_revocation_check_seconds", 300)
+    monkeypatch.setattr(verifier_module, "get_async_supabase_client", get_client)
+    monkeypatch.setattr(verifier_module.asyncio, "sleep", no_sleep)
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_valid_token_is_checked_once_then_cached(auth):
+    verifier = TokenVerifier()
+    token = make_token()
+
+    user = await verifier.verify(token)
+    again = await verifier.verify(token)
+
+    assert user == again
+    assert user["id"] == "user-1"
+    assert user["full_name"] == "Test User"
+    assert auth.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_logged_out_token_is_checked_again(auth):
+    verifier = TokenVerifier()
+    token = make_token()
+    await verifier.verify(token)
+
+    verifier.forget(token)
+    auth.error = AuthApiError("Session not found", 403, "session_not_found")
+
+    with pytest.raises(InvalidTokenError):
+        await verifier.verify(token)
+    assert auth.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_revoked_token_is_rejected(auth):
+    auth.error = AuthApiError("Session not found", 403, "session_not_found")
+
+    with pytest.raises(InvalidTokenError):
+        await TokenVerifier().verify(make_token())
+
+    # A rejection is final, not retried as a network failure
+    assert auth.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_auth_outage_falls_back_to_local_verification(auth):
+    auth.error = AuthApiError("Service unavailable", 503, None)
+    verifier = TokenVerifier()
+
+    user = await verifier.verify(make_token())
+
+    assert user["id"] == "user-1"
+    assert verifier.remote_failures == 1
+
+
+@pytest.mark.asyncio
+async def test_expired_and_tampered_tokens_are_rejected(auth):
+    verifier = TokenVerifier()
+
+    with pytest.raises(InvalidTokenError):
+        await verifier.verify(make_token(exp=int(time.time()) - 10))
+
+    with pytest.raises(InvalidTokenError):
+        await verifier.verify(make_token()[:-4] + "abcd")
+
+    assert auth.calls == 0
+
+
+def test_placeholder_and_weak_secrets_are_untrusted():
+    assert is_trusted_jwt_secret(SECRET)
+    assert not is_trusted_jwt_secret("X" * 64)
+    assert not is_trusted_jwt_secret("dev-secret-change-in-prod")
+    assert not is_trusted_jwt_secret("short-secret")
+    assert not is_trusted_jwt_secret("")
+
+
+@pytest.mark.asyncio
+async def test_placeholder_secret_gets_no_local_fallback(auth, monkeypatch):
+    placeholder = "X" * 64
+    monkeypatch.setattr(settings, "jwt_secret", placeholder)
+    auth.error = AuthApiError("Service unavailable", 503, None)
+
+    # Signed with the public placeholder: only Supabase Auth could vouch for it
+    with pytest.raises(InvalidTokenError):
+        await TokenVerifier().verify(make_token_with(placeholder))
+
+    assert auth.calls == 3
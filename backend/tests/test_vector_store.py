@@ -0,0 +1,46 @@
+"""Tests for VectorStore search parameter selection."""
+
+import pytest
+
+from app.config import settings
+from app.db import vector
+from app.db.vector import VectorStore
+
+
+class FakeChunkRepository:
+    def __init__(self, lists=None, error=None):
+        self.lists = lists or {}
+        self.error = error
+        self.calls = 0
+
+    async def domain_index_lists(self):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return self.lists
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(settings, "vector_index_lists", 1000)
+    vector._domain_lists_cache.clear()
+    store = VectorStore.__new__(VectorStore)
+    store.repository = FakeChunkRepository({"consumer": 40})
+    yield store
+    vector._domain_lists_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_probes_follow_the_partial_index_of_the_domain(store):
+    assert (await store._search_params("balanced", "consumer"))["ivfflat_probes"] == 2
+    assert (await store._search_params("balanced", "labour"))["ivfflat_probes"] == 50
+    assert (await store._search_params("balanced", None))["ivfflat_probes"] == 50
+    # Looked up once, then cached
+    assert store.repository.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_lookup_failure_falls_back_to_global_lists(store):
+    store.repository = FakeChunkRepository(error=RuntimeError("rpc missing"))
+
+    assert (await store._search_params("accurate", "consumer"))["ivfflat_probes"] == 150
@@ -0,0 +1,179 @@
+"""Tests for the write-behind message spool."""
+
+import json
+
+import pytest
+from postgrest.exceptions import APIError
+
+from app.memory.write_behind import WriteBehindQueue
+
+
+class RecordingRepository:
+    """
+    Stands in for MessageRepository; optionally fails the next writes and
+    rejects batches containing one of the given message IDs.
+    """
+
+    def __init__(self, failures: int = 0, rejected_ids=()):
+        self.failures = failures
+        self.rejected_ids = set(rejected_ids)
+        self.batches = []
+
+    async def persist_batch(self, messages):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        if any(m["id"] in self.rejected_ids for m in messages):
+            raise APIError({"code": "22P02", "message": "invalid input syntax for type uuid"})
+        self.batches.append(messages)
+        return len(messages)
+
+
+def make_queue(path, repository, batch_size=100, worker_id="w1", max_attempts=10):
+    queue = WriteBehindQueue(
+        str(path),
+        flush_interval=60.0,
+        batch_size=batch_size,
+        max_attempts=max_attempts,
+        worker_id=worker_id
+    )
+    queue._repository = repository
+    return queue
+
+
+@pytest.mark.asyncio
+async def test_unflushed_turns_are_replayed_after_restart(tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    first = make_queue(spool, RecordingRepository(failures=1))
+
+    await first.enqueue("s1", [{"id": "m1", "role": "user"}, {"id": "m2", "role": "assistant"}])
+    assert await first.flush() == 0
+    assert first.pending_count() == 2
+
+    # New process: the orphaned spool is claimed, replayed and flushed
+    repository = RecordingRepository()
+    second = make_queue(spool, repository, worker_id="w2")
+    await second.start()
+    try:
+        assert [m["id"] for m in second.pending_for("s1")] == ["m1", "m2"]
+        assert await second.flush() == 2
+    finally:
+        await second.drain()
+
+    assert [m["id"] for m in repository.batches[0]] == ["m1", "m2"]
+    assert all(m["session_id"] == "s1" for m in repository.batches[0])
+    assert sorted(p.name for p in tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_replay_skips_torn_last_line(tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    queue = make_queue(spool, RecordingRepository())
+    await queue.enqueue("s1", [{"id": "m1"}])
+
+    with open(spool, "a", encoding="utf-8") as handle:
+        handle.write('{"session_id": "s1", "messa')
+
+    assert len(queue._read_spool()) == 1
+
+
+@pytest.mark.asyncio
+async def test_flush_batches_whole_turns(tmp_path):
+    repository = RecordingRepository()
+    queue = make_queue(tmp_path / "spool.jsonl", repository, batch_size=3)
+
+    await queue.enqueue("s1", [{"id": "a"}, {"id": "b"}])
+    await queue.enqueue("s2", [{"id": "c"}, {"id": "d"}])
+
+    assert await queue.flush() == 4
+    assert [len(batch) for batch in repository.batches] == [2, 2]
+    assert queue.pending_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_workers_sharing_a_path_keep_each_others_turns(tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    first_repository = RecordingRepository()
+    first = make_queue(spool, first_repository, worker_id="w1")
+    second = make_queue(spool, RecordingRepository(failures=1), worker_id="w2")
+    await first.start()
+    await second.start()
+
+    try:
+        await first.enqueue("s1", [{"id": "a"}])
+        await second.enqueue("s2", [{"id": "b"}])
+
+        # The first worker's rewrite must not drop the second worker's turn
+        assert await first.flush() == 1
+        assert await second.flush() == 0
+
+        # A live worker's spool is not claimed by a third one
+        third = make_queue(spool, RecordingRepository(), worker_id="w3")
+        await third.start()
+        assert third.pending_count() == 0
+        await third.drain()
+    finally:
+        await first.drain()
+        # Simulate the second worker crashing with its turn unflushed
+        second._task.cancel()
+        second._owner_lock.close()
+
+    assert [m["id"] for m in first_repository.batches[0]] == ["a"]
+
+    # Once its worker is gone, the unflushed turn is replayed exactly once
+    repository = RecordingRepository()
+    fourth = make_queue(spool, repository, worker_id="w4")
+    await fourth.start()
+    try:
+        assert [m["id"] for m in fourth.pending_for("s2")] == ["b"]
+        assert await fourth.flush() == 1
+    finally:
+        await fourth.drain()
+    assert len(repository.batches) == 1
+
+
+@pytest.mark.asyncio
+async def test_outage_never_dead_letters(tmp_path):
+    repository = RecordingRepository(failures=25)
+    queue = make_queue(tmp_path / "spool.jsonl", repository, batch_size=1, max_attempts=2)
+
+    await queue.enqueue("s1", [{"id": "a"}])
+    for _ in range(25):
+        assert await queue.flush() == 0
+
+    # Enqueueing during the outage leaves the flusher to its backoff
+    queue._wakeup.clear()
+    await queue.enqueue("s1", [{"id": "b"}])
+    assert not queue._wakeup.is_set()
+
+    assert queue.dead_lettered_total == 0
+    assert not (tmp_path / "spool.jsonl.dead").exists()
+    assert await queue.flush() == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_turn_is_dead_lettered(tmp_path):
+    spool = tmp_path / "spool.jsonl"
+    repository = RecordingRepository(rejected_ids={"bad"})
+    queue = make_queue(spool, repository, max_attempts=2)
+
+    await queue.enqueue("s1", [{"id": "before"}])
+    await queue.enqueue("s1", [{"id": "bad"}])
+    await queue.enqueue("s2", [{"id": "after"}])
+
+    # The rejected batch is narrowed down; the healthy turn ahead still lands
+    assert await queue.flush() == 1
+    assert await queue.flush() == 1
+    assert queue.pending_count() == 0
+    assert queue.dead_lettered_total == 1
+    assert [[m["id"] for m in batch] for batch in repository.batches] == [["before"], ["after"]]
+
+    dead = [json.loads(line) for line in (tmp_path / "spool.jsonl.dead").read_text().splitlines()]
+    assert [turn["messages"][0]["id"] for turn in dead] == ["bad"]
+    assert dead[0]["attempts"] == 2
+
+    # Back to whole batches once the bad turn is gone
+    await queue.enqueue("s1", [{"id": "c"}])
+    await queue.enqueue("s1", [{"id": "d"}])
+    assert await queue.flush() == 2
+    assert [m["id"] for m in repository.batches[-1]] == ["c", "d"]